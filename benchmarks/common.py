@@ -0,0 +1,83 @@
+"""Helpers shared by benchmarks that run the integration in a Home Assistant test instance."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import AbstractAsyncContextManager, AsyncExitStack, asynccontextmanager
+import json
+from pathlib import Path
+import sys
+import tempfile
+
+from homeassistant import loader
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import async_test_home_assistant
+
+ROOT = Path(__file__).resolve().parents[1]
+MANIFEST = ROOT / "custom_components" / "cyclepay" / "manifest.json"
+
+# Home Assistant resolves custom integrations by importing the custom_components package.
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# pylint: disable=wrong-import-position
+from custom_components.cyclepay.const import DATA_RATE_LIMITER  # noqa: E402
+from custom_components.cyclepay.metrics import RollingHistogram  # noqa: E402
+from custom_components.cyclepay.ratelimit import RateLimiter  # noqa: E402
+
+# Token bucket that never makes a request wait. Used by default so results show
+# integration cost rather than the limiter's pacing.
+UNLIMITED_RATE = 1_000_000.0
+
+
+@asynccontextmanager
+async def async_test_instance(rate_limit: bool = False) -> AsyncIterator[HomeAssistant]:
+    """
+    Run a Home Assistant test instance that loads this repository's integration.
+
+    Storage is written to a temporary config directory that is removed afterwards.
+    """
+
+    with tempfile.TemporaryDirectory(prefix="cyclepay-benchmark-") as config_dir:
+        async with AsyncExitStack() as stack:
+            started = async_test_home_assistant(asyncio.get_running_loop())
+
+            # Newer versions of pytest-homeassistant-custom-component return an async
+            # context manager. Older ones return a coroutine.
+            if isinstance(started, AbstractAsyncContextManager):
+                hass = await stack.enter_async_context(started)
+            else:
+                hass = await started
+
+            hass.config.config_dir = config_dir
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+
+            if not rate_limit:
+                hass.data[DATA_RATE_LIMITER] = RateLimiter(
+                    rate=UNLIMITED_RATE, burst=int(UNLIMITED_RATE)
+                )
+
+            try:
+                yield hass
+            finally:
+                await hass.async_stop(force=True)
+
+
+def integration_version() -> str:
+    """Return integration version from the manifest."""
+
+    return str(json.loads(MANIFEST.read_text(encoding="utf-8"))["version"])
+
+
+def percentiles(histogram: RollingHistogram) -> dict[str, float | None]:
+    """Return p50, p95 and p99 of a histogram in milliseconds."""
+
+    p50, p95, p99 = histogram.percentiles(50, 95, 99)
+
+    return {"p50": ms(p50), "p95": ms(p95), "p99": ms(p99)}
+
+
+def ms(seconds: float | None) -> float | None:
+    """Convert seconds to rounded milliseconds."""
+
+    return None if seconds is None else round(seconds * 1000, 3)
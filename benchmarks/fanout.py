@@ -0,0 +1,332 @@
+"""
+Entity fan-out benchmark with synthetic rooms.
+
+Sets up the integration in a Home Assistant test instance with an in-memory Laundry of
+N machines, then times platform setup, coordinator ticks and vend-event dispatch and
+measures memory allocated during a tick. No network access is needed. Run from the
+repository root:
+
+    python -m benchmarks.fanout --sizes 10 100 1000 5000 --save
+
+Saved results are keyed by integration version in benchmarks/results/fanout.json. Each
+run is compared against the most recent other version stored there.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import replace
+from datetime import datetime, timezone
+from functools import partial
+import json
+import logging
+from pathlib import Path
+import platform
+from time import perf_counter
+import tracemalloc
+from typing import Any
+from unittest.mock import patch
+
+import aiohttp
+from homeassistant.const import __version__ as HA_VERSION
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from pylaundry import Laundry, LaundryMachine, LaundryProfile, MachineType
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from .common import async_test_instance, integration_version, ms, percentiles
+
+# isort: split
+# Importable once .common has put the repository on sys.path.
+from custom_components.cyclepay.const import DOMAIN, OPT_FULL_LOAD, SIGNAL_VEND_BEGIN
+from custom_components.cyclepay.coordinator import CyclePayCoordinator
+from custom_components.cyclepay.metrics import RollingHistogram, Stage
+
+log = logging.getLogger(__name__)
+
+DEFAULT_SIZES = [10, 100, 1000, 5000]
+RESULTS_FILE = Path(__file__).resolve().parent / "results" / "fanout.json"
+
+# Cycle lengths for busy machines in the synthetic room cycle through 1 to this many
+# minutes, so some machines finish on every tick.
+MAX_MINUTES_REMAINING = 60
+
+
+class SyntheticLaundry(Laundry):  # type: ignore
+    """Laundry with a generated room that never sends requests."""
+
+    def __init__(self, websession: aiohttp.ClientSession, machines: int) -> None:
+        """Initialize synthetic laundry."""
+
+        super().__init__(websession)
+
+        self._machine_count = machines
+
+    async def async_login(self, username: str, password: str) -> None:
+        """Generate profile and room."""
+
+        self._username = username
+        self._password = password
+        self._auth_token = "synthetic-auth-token"  # nosec
+        self._first_request_id = "synthetic-first-request-id"
+
+        self.profile = LaundryProfile(
+            location_address="Synthetic Room",
+            card_balance=10_000.0,
+            user_id="synthetic-user",
+            user_token="synthetic-user-token",  # nosec
+            location_id="synthetic-location",
+            database_id="synthetic-db",
+            card_serial="synthetic-card",
+        )
+
+        self.machines = {}
+
+        for index in range(self._machine_count):
+            minutes_remaining = (
+                0 if index % 3 == 0 else index % MAX_MINUTES_REMAINING + 1
+            )
+
+            self.machines[f"machine-{index:05d}"] = LaundryMachine(
+                id_=f"machine-{index:05d}",
+                type=MachineType.DRYER if index % 2 else MachineType.WASHER,
+                number=str(index + 1),
+                busy=minutes_remaining > 0,
+                minutes_remaining=minutes_remaining,
+                base_price=2.0,
+                topoff_price=None,
+                topoff_time_min=None,
+                online=index % 50 != 49,
+                reader_serial=f"serial-{index:05d}",
+            )
+
+    async def async_refresh(self) -> None:
+        """Advance every running machine by a minute.
+
+        Like pylaundry, builds new machine objects rather than updating them in place.
+        """
+
+        self.machines = {
+            machine_id: replace(
+                machine,
+                minutes_remaining=(minutes := max(0, machine.minutes_remaining - 1)),
+                busy=minutes > 0,
+            )
+            for machine_id, machine in self.machines.items()
+        }
+
+    async def async_get_topoff_data(self, machine_id: str) -> dict | None:
+        """Return fixed topoff price for dryers."""
+
+        if (machine := self.machines[machine_id]).type is not MachineType.DRYER:
+            return None
+
+        machine.topoff_price = 0.25
+        machine.topoff_time_min = 0
+
+        return {"price": 0.25, "time": 0}
+
+    async def async_vend(self, machine_id: str) -> None:
+        """Accept every vend without changing the room."""
+
+
+async def async_run_scenario(machines: int, ticks: int, vends: int) -> dict[str, Any]:
+    """Benchmark one room size. Returns results in milliseconds and KiB."""
+
+    async with async_test_instance() as hass:
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={"username": "bench@example.com", "password": "bench"},
+            options={OPT_FULL_LOAD: 3},
+        )
+        entry.add_to_hass(hass)
+
+        try:
+            with patch(
+                "custom_components.cyclepay.Laundry",
+                partial(SyntheticLaundry, machines=machines),
+            ):
+                return await _async_measure(hass, entry, machines, ticks, vends)
+        finally:
+            await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def _async_measure(
+    hass: HomeAssistant, entry: MockConfigEntry, machines: int, ticks: int, vends: int
+) -> dict[str, Any]:
+    """Set up entry, then time ticks and vend dispatches."""
+
+    started_at = perf_counter()
+
+    if not await hass.config_entries.async_setup(entry.entry_id):
+        raise RuntimeError("Config entry failed to set up with the synthetic room.")
+
+    await hass.async_block_till_done()
+
+    setup_s = perf_counter() - started_at
+
+    coordinator: CyclePayCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    tick_times = RollingHistogram(max(1, ticks))
+
+    for _ in range(ticks):
+        started_at = perf_counter()
+        await _async_tick(hass, coordinator)
+        tick_times.record(perf_counter() - started_at)
+
+    dispatch_times = RollingHistogram(max(1, vends))
+
+    for machine_id in list(coordinator.data.machines)[:vends]:
+        started_at = perf_counter()
+        async_dispatcher_send(hass, SIGNAL_VEND_BEGIN.format(machine_id))
+        await hass.async_block_till_done()
+        dispatch_times.record(perf_counter() - started_at)
+
+    # Reverts machines from the vending state before allocations are measured.
+    await _async_tick(hass, coordinator)
+
+    tracemalloc.start()
+
+    try:
+        await _async_tick(hass, coordinator)
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "machines": machines,
+        "entities": len(hass.states.async_entity_ids()),
+        "setup_ms": ms(setup_s),
+        "tick_ms": percentiles(tick_times),
+        "tick_fanout_ms": percentiles(coordinator.metrics.stages[Stage.FANOUT]),
+        "vend_dispatch_ms": percentiles(dispatch_times),
+        "tick_alloc_kib": {
+            "peak": round(peak / 1024, 1),
+            "retained": round(retained / 1024, 1),
+        },
+    }
+
+
+async def _async_tick(hass: HomeAssistant, coordinator: CyclePayCoordinator) -> None:
+    """Refresh the coordinator and wait for every entity to write its state."""
+
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+
+def load_results() -> dict[str, Any]:
+    """Return stored results keyed by integration version."""
+
+    if not RESULTS_FILE.exists():
+        return {}
+
+    results: dict[str, Any] = json.loads(RESULTS_FILE.read_text(encoding="utf-8"))
+
+    return results
+
+
+def save_results(version: str, results: list[dict[str, Any]]) -> None:
+    """Store results for an integration version, replacing earlier results for it."""
+
+    stored = load_results()
+    stored.pop(version, None)
+    stored[version] = {
+        "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "homeassistant": HA_VERSION,
+        "sizes": {str(result["machines"]): result for result in results},
+    }
+
+    RESULTS_FILE.parent.mkdir(exist_ok=True)
+    RESULTS_FILE.write_text(json.dumps(stored, indent=2) + "\n", encoding="utf-8")
+
+
+def _print_summary(
+    results: list[dict[str, Any]], baseline: dict[str, Any] | None
+) -> None:
+    """Print one line per room size, with change against baseline where available."""
+
+    print(
+        f"{'machines':>8} {'entities':>8} {'setup ms':>9} {'tick p50':>9}"
+        f" {'tick p95':>9} {'fanout p50':>10} {'dispatch p50':>12} {'peak KiB':>9}"
+        f" {'vs baseline':>11}"
+    )
+
+    for result in results:
+        change = ""
+
+        if baseline and (previous := baseline["sizes"].get(str(result["machines"]))):
+            change = f"{_change(result['tick_ms']['p50'], previous['tick_ms']['p50'])}"
+
+        print(
+            f"{result['machines']:>8} {result['entities']:>8} {result['setup_ms']:>9}"
+            f" {result['tick_ms']['p50']!s:>9} {result['tick_ms']['p95']!s:>9}"
+            f" {result['tick_fanout_ms']['p50']!s:>10}"
+            f" {result['vend_dispatch_ms']['p50']!s:>12}"
+            f" {result['tick_alloc_kib']['peak']:>9} {change:>11}"
+        )
+
+
+def _change(current: float | None, previous: float | None) -> str:
+    """Return relative change between two timings."""
+
+    if not current or not previous:
+        return ""
+
+    return f"{(current - previous) / previous:+.0%}"
+
+
+async def _async_main(args: argparse.Namespace) -> list[dict[str, Any]]:
+    """Run every requested room size in turn."""
+
+    results = []
+
+    for machines in args.sizes:
+        log.info("Benchmarking room with %s machines.", machines)
+
+        results.append(await async_run_scenario(machines, args.ticks, args.vends))
+
+    return results
+
+
+def main() -> None:
+    """Run fan-out benchmark from the command line."""
+
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n", maxsplit=1)[0].strip()
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--vends", type=int, default=20)
+    parser.add_argument(
+        "--save",
+        action="store_true",
+        help="Store results under the integration's current version.",
+    )
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    # Warns that cyclepay is a custom integration every time a scenario loads it.
+    logging.getLogger("homeassistant.loader").setLevel(logging.ERROR)
+
+    version = integration_version()
+    baseline = next(
+        (
+            stored
+            for stored_version, stored in reversed(load_results().items())
+            if stored_version != version
+        ),
+        None,
+    )
+
+    results = asyncio.run(_async_main(args))
+
+    _print_summary(results, baseline)
+
+    if args.save:
+        save_results(version, results)
+
+
+if __name__ == "__main__":
+    main()
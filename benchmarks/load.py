@@ -0,0 +1,223 @@
+"""
+Load harness that runs the integration against the offline CyclePay stand-in.
+
+Each scenario starts a stand-in room, sets up a config entry in a Home Assistant test
+instance with pylaundry pointed at the stand-in, then measures setup time, coordinator
+refreshes and button-press vends. Requires pytest-homeassistant-custom-component for the
+test instance. Run from the repository root:
+
+    python -m benchmarks.load --machines 10 100 1000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from .common import async_test_instance, ms, percentiles
+from .standin import RoomConfig, StandinServer, build_parser, room_config_from_args
+
+# isort: split
+# Importable once .common has put the repository on sys.path.
+from custom_components.cyclepay.const import DOMAIN, OPT_FULL_LOAD
+from custom_components.cyclepay.coordinator import CyclePayCoordinator
+from custom_components.cyclepay.metrics import RollingHistogram, Stage
+
+log = logging.getLogger(__name__)
+
+DEFAULT_SIZES = [10, 100, 1000]
+
+
+async def async_run_scenario(
+    config: RoomConfig, refreshes: int, vends: int, rate_limit: bool
+) -> dict[str, Any]:
+    """Benchmark one room size. Returns results in milliseconds."""
+
+    server = StandinServer(config)
+    url = await server.async_start()
+
+    try:
+        async with async_test_instance(rate_limit) as hass:
+            entry = MockConfigEntry(
+                domain=DOMAIN,
+                data={"username": "bench@example.com", "password": "bench"},
+                options={OPT_FULL_LOAD: 3},
+            )
+            entry.add_to_hass(hass)
+
+            try:
+                with patch("pylaundry.API_ENDPOINT_URL", url):
+                    return await _async_measure(hass, entry, server, refreshes, vends)
+            finally:
+                await hass.config_entries.async_unload(entry.entry_id)
+    finally:
+        await server.async_stop()
+
+
+async def _async_measure(
+    hass: HomeAssistant,
+    entry: MockConfigEntry,
+    server: StandinServer,
+    refreshes: int,
+    vends: int,
+) -> dict[str, Any]:
+    """Set up entry, then time refreshes and vends."""
+
+    started_at = perf_counter()
+
+    if not await hass.config_entries.async_setup(entry.entry_id):
+        raise RuntimeError("Config entry failed to set up against the stand-in.")
+
+    await hass.async_block_till_done()
+
+    setup_s = perf_counter() - started_at
+
+    coordinator: CyclePayCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    requests_before = sum(server.stats.requests.values())
+    refresh_times = RollingHistogram(max(1, refreshes))
+
+    for _ in range(refreshes):
+        started_at = perf_counter()
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+        refresh_times.record(perf_counter() - started_at)
+
+    refresh_requests = sum(server.stats.requests.values()) - requests_before
+
+    press_times = RollingHistogram(max(1, vends))
+
+    for entity_id in _idle_swipe_buttons(hass, coordinator, vends):
+        started_at = perf_counter()
+        await hass.services.async_call(
+            "button", "press", {"entity_id": entity_id}, blocking=True
+        )
+        press_times.record(perf_counter() - started_at)
+
+    return {
+        "machines": len(server.machines),
+        "entities": len(hass.states.async_entity_ids()),
+        "setup_ms": ms(setup_s),
+        "refresh_ms": percentiles(refresh_times),
+        "requests_per_refresh": (
+            round(refresh_requests / refreshes, 2) if refreshes else None
+        ),
+        "press_ms": percentiles(press_times),
+        "stages_ms": {
+            stage.value: percentiles(coordinator.metrics.stages[stage])
+            for stage in (Stage.LOGIN, Stage.REFRESH, Stage.TOPOFF, Stage.VEND)
+        },
+        "fanout_ms": percentiles(coordinator.metrics.stages[Stage.FANOUT]),
+        "failures": coordinator.metrics.failures,
+        "server": {
+            "requests": dict(server.stats.requests),
+            "injected_errors": server.stats.injected_errors,
+            "dropped": server.stats.dropped,
+            "bytes_sent": server.stats.bytes_sent,
+        },
+    }
+
+
+def _idle_swipe_buttons(
+    hass: HomeAssistant, coordinator: CyclePayCoordinator, count: int
+) -> list[str]:
+    """Return entity IDs of single swipe buttons for up to count idle, online machines."""
+
+    registry = er.async_get(hass)
+    user_id = coordinator.data.user_id
+    entity_ids = []
+
+    for machine in coordinator.data.machines.values():
+        if len(entity_ids) >= count:
+            break
+
+        if machine.busy or not machine.online:
+            continue
+
+        if entity_id := registry.async_get_entity_id(
+            "button", DOMAIN, f"{user_id}_{machine.id_}_single_swipe"
+        ):
+            entity_ids.append(entity_id)
+
+    return entity_ids
+
+
+def _print_summary(results: list[dict[str, Any]]) -> None:
+    """Print one line per scenario."""
+
+    print(
+        f"{'machines':>8} {'entities':>8} {'setup ms':>9} {'refresh p50':>11}"
+        f" {'refresh p95':>11} {'req/refresh':>11} {'vend p50':>9} {'press p50':>9}"
+    )
+
+    for result in results:
+        print(
+            f"{result['machines']:>8} {result['entities']:>8}"
+            f" {result['setup_ms']:>9} {result['refresh_ms']['p50']!s:>11}"
+            f" {result['refresh_ms']['p95']!s:>11}"
+            f" {result['requests_per_refresh']!s:>11}"
+            f" {result['stages_ms']['vend']['p50']!s:>9}"
+            f" {result['press_ms']['p50']!s:>9}"
+        )
+
+
+async def _async_main(args: argparse.Namespace) -> list[dict[str, Any]]:
+    """Run every requested room size in turn."""
+
+    results = []
+
+    for machines in args.machines:
+        log.info("Benchmarking room with %s machines.", machines)
+
+        results.append(
+            await async_run_scenario(
+                room_config_from_args(args, machines=machines),
+                refreshes=args.refreshes,
+                vends=args.vends,
+                rate_limit=args.rate_limit,
+            )
+        )
+
+    return results
+
+
+def main() -> None:
+    """Run load harness from the command line."""
+
+    parser = build_parser()
+    parser.set_defaults(seed=0)
+    parser.add_argument("--machines", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--refreshes", type=int, default=20)
+    parser.add_argument("--vends", type=int, default=5)
+    parser.add_argument(
+        "--rate-limit",
+        action="store_true",
+        help="Keep the integration's request rate limit instead of disabling it.",
+    )
+    parser.add_argument("--output", type=Path, help="Write results to a JSON file.")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    # Warns that cyclepay is a custom integration every time a scenario loads it.
+    logging.getLogger("homeassistant.loader").setLevel(logging.ERROR)
+
+    results = asyncio.run(_async_main(args))
+
+    _print_summary(results)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
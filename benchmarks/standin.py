@@ -0,0 +1,585 @@
+"""
+Offline stand-in for the CyclePay API server.
+
+Implements the requests that pylaundry.Laundry sends (Authenticate2, ConsolidatedRefresh,
+GetVendPrice and VirtualVend) against a simulated laundry room. Requests and responses
+use the same encryption and packing as the real server, so pylaundry runs unmodified
+once pylaundry.API_ENDPOINT_URL points here.
+
+Run standalone with:
+
+    python -m benchmarks.standin --machines 100 --port 8080
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import gzip
+import hashlib
+import json
+import logging
+import math
+import random
+import socket
+from typing import Any
+import uuid
+
+from aiohttp import web
+from pylaundry.const import (
+    AUTH_TOKEN_KEY,
+    EMPTY_AUTH_TOKEN,
+    REFRESH_REQUEST_PREHASH_SUFFIX,
+    ServerResponseCodes,
+)
+from pylaundry.exceptions import MessagePackerError
+from pylaundry.helpers import MessagePacker
+
+log = logging.getLogger(__name__)
+
+LOCATION_ID = "standin-location"
+DATABASE_ID = "standin-db"
+
+# Not in pylaundry's ServerResponseCodes. Any code other than success fails the request.
+RESULT_CODE_DECLINED = 0
+
+
+@dataclass
+class RoomConfig:
+    """Simulated laundry room and server behavior."""
+
+    machines: int = 10
+    # Fraction of machines that are dryers, busy at startup and offline.
+    dryer_ratio: float = 0.5
+    busy_ratio: float = 0.5
+    offline_ratio: float = 0.0
+    # Simulated minutes per base cycle and per dryer topoff.
+    washer_cycle_min: float = 30
+    dryer_cycle_min: float = 45
+    topoff_min: float = 15
+    base_price: float = 2.0
+    topoff_price: float = 0.25
+    balance: float = 1000.0
+    # Password every account must use. None accepts any password.
+    password: str | None = None
+    # Simulated minutes that pass per real minute.
+    time_scale: float = 1.0
+    # Cycles started by other residents per idle machine per simulated hour.
+    arrival_rate: float = 0.0
+    # Seconds added to every response.
+    latency: float = 0.0
+    latency_jitter: float = 0.0
+    # Fraction of requests answered with TRY_AGAIN_LATER and with an HTTP 503.
+    error_rate: float = 0.0
+    drop_rate: float = 0.0
+    seed: int | None = None
+
+
+@dataclass
+class SimulatedMachine:
+    """Washer or dryer in the simulated room."""
+
+    reader_id: str
+    serial: str
+    label: str
+    setup_type: str
+    online: bool
+    # Simulated minute at which the current cycle ends.
+    finishes_at: float = 0.0
+
+
+@dataclass
+class Account:
+    """Virtual laundry card."""
+
+    user_id: str
+    card_serial: str
+    balance: float
+
+
+@dataclass
+class Session:
+    """Logged in client. Keys for later requests are derived from first_request_id."""
+
+    first_request_id: str
+    username: str
+
+
+@dataclass
+class ServerStats:
+    """Counters for requests handled by the stand-in."""
+
+    requests: Counter[str] = field(default_factory=Counter)
+    injected_errors: int = 0
+    dropped: int = 0
+    bytes_sent: int = 0
+
+
+class StandinServer:
+    """aiohttp server that answers pylaundry requests from a simulated room."""
+
+    def __init__(self, config: RoomConfig) -> None:
+        """Initialize server and build simulated room."""
+
+        self.config = config
+        self.stats = ServerStats()
+
+        self._rng = random.Random(config.seed)
+        self._loop_started_at: float | None = None
+        self._advanced_to = 0.0
+
+        self._sessions: dict[str, Session] = {}
+        self._accounts: dict[str, Account] = {}
+
+        self.machines: dict[str, SimulatedMachine] = {}
+        self._by_serial: dict[str, SimulatedMachine] = {}
+        self._build_room()
+
+        self._runner: web.AppRunner | None = None
+
+        self._handlers: dict[str, Callable[[list, Session | None, str], dict]] = {
+            "Authenticate2": self._authenticate,
+            "ConsolidatedRefresh": self._consolidated_refresh,
+            "GetVendPrice": self._get_vend_price,
+            "VirtualVend": self._virtual_vend,
+        }
+
+    async def async_start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving. Returns endpoint URL. Port 0 picks a free port."""
+
+        app = web.Application()
+        app.router.add_post("/AppRequestHandler.aspx", self._async_handle)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+
+        await web.SockSite(self._runner, sock).start()
+
+        self._loop_started_at = asyncio.get_running_loop().time()
+
+        return f"http://{host}:{sock.getsockname()[1]}/AppRequestHandler.aspx"
+
+    async def async_stop(self) -> None:
+        """Stop serving."""
+
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def now(self) -> float:
+        """Return simulated minutes since the server started."""
+
+        if self._loop_started_at is None:
+            return 0.0
+
+        elapsed = asyncio.get_running_loop().time() - self._loop_started_at
+
+        return elapsed / 60 * self.config.time_scale
+
+    def minutes_remaining(self, machine: SimulatedMachine) -> int:
+        """Return whole minutes left in a machine's cycle."""
+
+        return max(0, math.ceil(machine.finishes_at - self.now()))
+
+    #
+    # Simulation
+    #
+
+    def _build_room(self) -> None:
+        """Create machines. Busy machines get a random amount of time left."""
+
+        config = self.config
+
+        for index in range(config.machines):
+            is_dryer = self._rng.random() < config.dryer_ratio
+            cycle_min = config.dryer_cycle_min if is_dryer else config.washer_cycle_min
+
+            machine = SimulatedMachine(
+                reader_id=f"reader-{index:05d}",
+                serial=f"serial-{index:05d}",
+                label=str(index + 1),
+                setup_type="Dryer" if is_dryer else "Washer",
+                online=self._rng.random() >= config.offline_ratio,
+                finishes_at=(
+                    self._rng.uniform(1, cycle_min)
+                    if self._rng.random() < config.busy_ratio
+                    else 0.0
+                ),
+            )
+
+            self.machines[machine.reader_id] = machine
+            self._by_serial[machine.serial] = machine
+
+    def _advance(self) -> None:
+        """Start cycles for other residents on idle machines since the last request."""
+
+        now = self.now()
+        elapsed_hours = (now - self._advanced_to) / 60
+        self._advanced_to = now
+
+        if not self.config.arrival_rate or elapsed_hours <= 0:
+            return
+
+        probability = 1 - math.exp(-self.config.arrival_rate * elapsed_hours)
+
+        for machine in self.machines.values():
+            if (
+                machine.online
+                and machine.finishes_at <= now
+                and self._rng.random() < probability
+            ):
+                machine.finishes_at = now + self._cycle_min(machine)
+
+    def _cycle_min(self, machine: SimulatedMachine) -> float:
+        """Return length of a base cycle for a machine."""
+
+        return (
+            self.config.dryer_cycle_min
+            if machine.setup_type == "Dryer"
+            else self.config.washer_cycle_min
+        )
+
+    def _machines_information(self) -> dict:
+        """Return MachinesInformation object for the whole room."""
+
+        reported_at = datetime.now(timezone.utc).isoformat()
+
+        return {
+            "ResultCode": ServerResponseCodes.SUCCESS,
+            "Machines": [
+                {
+                    "ReaderID": machine.reader_id,
+                    "SetupType": machine.setup_type,
+                    "Label": machine.label,
+                    "MinutesRemaining": self.minutes_remaining(machine),
+                    "StateDateTimeUtc": reported_at,
+                    "BasePrice": self.config.base_price,
+                    "IsOnline": machine.online,
+                    "SerialNumber": machine.serial,
+                }
+                for machine in self.machines.values()
+            ],
+        }
+
+    #
+    # Request handling
+    #
+
+    async def _async_handle(self, request: web.Request) -> web.Response:
+        """Decode request, run its handler and pack the response."""
+
+        config = self.config
+
+        if config.latency or config.latency_jitter:
+            await asyncio.sleep(
+                config.latency + self._rng.uniform(0, config.latency_jitter)
+            )
+
+        if self._rng.random() < config.drop_rate:
+            self.stats.dropped += 1
+            return web.Response(status=503, text="Service Unavailable")
+
+        auth_token = request.headers.get(AUTH_TOKEN_KEY, EMPTY_AUTH_TOKEN)
+        session = self._sessions.get(auth_token)
+
+        body = await request.text()
+
+        if (
+            decoded := self._decode(
+                body.partition("=")[2], request.headers.get("CP_REQ_ID", ""), session
+            )
+        ) is None:
+            # Unknown session or undecryptable body. Clients respond by logging in again.
+            return self._respond({"ResultCode": ServerResponseCodes.INPUT_MALFORMED})
+
+        command, request_id = decoded[0], request.headers["CP_REQ_ID"]
+
+        self.stats.requests[command] += 1
+
+        if self._rng.random() < config.error_rate:
+            self.stats.injected_errors += 1
+            return self._respond(
+                {
+                    "ResultCode": ServerResponseCodes.TRY_AGAIN_LATER_BAD_REQUEST,
+                    "ResultText": "Please try again later.",
+                }
+            )
+
+        if (handler := self._handlers.get(command)) is None:
+            return self._respond({"ResultCode": ServerResponseCodes.INVALID_REQUEST})
+
+        if command != "Authenticate2" and session is None:
+            return self._respond({"ResultCode": ServerResponseCodes.INPUT_MALFORMED})
+
+        self._advance()
+
+        headers: dict[str, str] = {}
+
+        if command == "Authenticate2":
+            headers[AUTH_TOKEN_KEY] = str(uuid.uuid4())
+
+        try:
+            result = handler(decoded, session, request_id)
+        except (IndexError, TypeError):
+            return self._respond({"ResultCode": ServerResponseCodes.INVALID_REQUEST})
+
+        if (
+            command == "Authenticate2"
+            and result["ResultCode"] == ServerResponseCodes.SUCCESS
+        ):
+            self._sessions[headers[AUTH_TOKEN_KEY]] = Session(
+                first_request_id=request_id, username=decoded[2]
+            )
+
+        return self._respond(result, headers)
+
+    def _decode(
+        self, packed: str, request_id: str, session: Session | None
+    ) -> list | None:
+        """Decrypt request body. Tries the session key first, then the login key."""
+
+        first_request_ids = [session.first_request_id] if session else []
+        first_request_ids.append(None)
+
+        for first_request_id in first_request_ids:
+            try:
+                decoded = json.loads(
+                    MessagePacker.unpack_client_request(
+                        packed, request_id, first_request_id
+                    )
+                )
+            except (MessagePackerError, UnicodeDecodeError, ValueError):
+                continue
+
+            if isinstance(decoded, list) and decoded:
+                return decoded
+
+        return None
+
+    def _respond(
+        self, content: dict, headers: dict[str, str] | None = None
+    ) -> web.Response:
+        """Pack content the way CyclePay does: gzipped, base64 encoded and wrapped."""
+
+        packed = base64.standard_b64encode(
+            gzip.compress(json.dumps(content).encode("utf-8"))
+        ).decode("ascii")
+
+        text = json.dumps({"Response": packed})
+        self.stats.bytes_sent += len(text)
+
+        # CyclePay doesn't send a JSON content type either.
+        return web.Response(text=text, content_type="text/html", headers=headers)
+
+    def _account(self, username: str) -> Account:
+        """Return account for username, opening it on first login."""
+
+        if (account := self._accounts.get(username)) is None:
+            user_id = str(uuid.uuid5(uuid.NAMESPACE_URL, username))
+            account = self._accounts[username] = Account(
+                user_id=user_id,
+                card_serial=f"card-{user_id[:8]}",
+                balance=self.config.balance,
+            )
+
+        return account
+
+    def _authenticate(self, request: list, _: Session | None, __: str) -> dict:
+        """Handle Authenticate2. Request: command, app key, username, password, ..."""
+
+        username, password = request[2], request[3]
+
+        if self.config.password is not None and password != self.config.password:
+            return {"ResultCode": ServerResponseCodes.INVALID_CREDENTIALS}
+
+        account = self._account(username)
+
+        return {
+            "ResultCode": ServerResponseCodes.SUCCESS,
+            "UserID": account.user_id,
+            "LocationAddress": "1 Stand-In Street",
+            "LocationID": LOCATION_ID,
+            "DatabaseID": DATABASE_ID,
+            "Bundle": {
+                "CardInformation": {
+                    "Balance": account.balance,
+                    "AccountNumber": account.card_serial,
+                },
+                "MachinesInformation": self._machines_information(),
+            },
+        }
+
+    def _consolidated_refresh(
+        self, request: list, session: Session | None, _: str
+    ) -> dict:
+        """Handle ConsolidatedRefresh. Request: command, user token, user ID."""
+
+        assert session is not None  # nosec
+        account = self._account(session.username)
+
+        user_token = hashlib.md5(  # nosec
+            f"{account.user_id}{REFRESH_REQUEST_PREHASH_SUFFIX}".encode("utf-8")
+        ).hexdigest()
+
+        if request[1] != user_token or request[2] != account.user_id:
+            return {"ResultCode": ServerResponseCodes.INVALID_USER_ID}
+
+        return {
+            "ResultCode": ServerResponseCodes.SUCCESS,
+            "CardInformation": {
+                "Balance": account.balance,
+                "AccountNumber": account.card_serial,
+            },
+            "MachinesInformation": self._machines_information(),
+        }
+
+    def _get_vend_price(self, request: list, _: Session | None, __: str) -> dict:
+        """Handle GetVendPrice. Request: command, user token, database ID, serial."""
+
+        if (machine := self._by_serial.get(request[3])) is None:
+            return {"ResultCode": ServerResponseCodes.TRY_AGAIN_LATER_BAD_REQUEST}
+
+        if not machine.online:
+            return {
+                "ResultCode": ServerResponseCodes.TRY_AGAIN_LATER_SWIPE_FAILED,
+                "ResultText": "Machine is not responding.",
+            }
+
+        return {
+            "ResultCode": ServerResponseCodes.SUCCESS,
+            "TopoffPrice": self.config.topoff_price,
+            "TopoffTime": 0,
+        }
+
+    def _virtual_vend(self, request: list, session: Session | None, _: str) -> dict:
+        """Handle VirtualVend. Request: command, user token, database ID, serial, card."""
+
+        assert session is not None  # nosec
+        account = self._account(session.username)
+
+        if (machine := self._by_serial.get(request[3])) is None:
+            return {"ResultCode": ServerResponseCodes.TRY_AGAIN_LATER_BAD_REQUEST}
+
+        if not machine.online:
+            return {
+                "ResultCode": ServerResponseCodes.TRY_AGAIN_LATER_SWIPE_FAILED,
+                "ResultText": "Machine is not responding.",
+            }
+
+        now = self.now()
+        busy = machine.finishes_at > now
+
+        if busy and machine.setup_type != "Dryer":
+            return {"ResultCode": RESULT_CODE_DECLINED, "ResultText": "Machine in use."}
+
+        price = self.config.topoff_price if busy else self.config.base_price
+
+        if account.balance < price:
+            return {
+                "ResultCode": RESULT_CODE_DECLINED,
+                "ResultText": "Insufficient funds.",
+            }
+
+        account.balance = round(account.balance - price, 2)
+
+        machine.finishes_at = (
+            machine.finishes_at + self.config.topoff_min
+            if busy
+            else now + self._cycle_min(machine)
+        )
+
+        # pylaundry accepts 1 or 161 here, but fails anything but 1 before checking.
+        return {"ResultCode": ServerResponseCodes.SUCCESS}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Return argument parser for room and server settings."""
+
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n", maxsplit=1)[0].strip()
+    )
+    defaults = RoomConfig()
+
+    parser.add_argument("--dryer-ratio", type=float, default=defaults.dryer_ratio)
+    parser.add_argument("--busy-ratio", type=float, default=defaults.busy_ratio)
+    parser.add_argument("--offline-ratio", type=float, default=defaults.offline_ratio)
+    parser.add_argument("--time-scale", type=float, default=defaults.time_scale)
+    parser.add_argument("--arrival-rate", type=float, default=defaults.arrival_rate)
+    parser.add_argument("--latency", type=float, default=defaults.latency)
+    parser.add_argument("--latency-jitter", type=float, default=defaults.latency_jitter)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--drop-rate", type=float, default=defaults.drop_rate)
+    parser.add_argument("--balance", type=float, default=defaults.balance)
+    parser.add_argument("--password", default=defaults.password)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+    return parser
+
+
+def room_config_from_args(args: argparse.Namespace, **overrides: Any) -> RoomConfig:
+    """Build room config from parsed arguments. Room size is passed as an override."""
+
+    return RoomConfig(
+        dryer_ratio=args.dryer_ratio,
+        busy_ratio=args.busy_ratio,
+        offline_ratio=args.offline_ratio,
+        time_scale=args.time_scale,
+        arrival_rate=args.arrival_rate,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        drop_rate=args.drop_rate,
+        balance=args.balance,
+        password=args.password,
+        seed=args.seed,
+        **overrides,
+    )
+
+
+async def _async_serve(config: RoomConfig, host: str, port: int) -> None:
+    """Serve until interrupted."""
+
+    server = StandinServer(config)
+    url = await server.async_start(host, port)
+
+    log.warning("Serving %s machines at %s", config.machines, url)
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.async_stop()
+
+
+def main() -> None:
+    """Run stand-in server from the command line."""
+
+    parser = build_parser()
+    parser.add_argument("--machines", type=int, default=RoomConfig.machines)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    try:
+        asyncio.run(
+            _async_serve(
+                room_config_from_args(args, machines=args.machines),
+                args.host,
+                args.port,
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
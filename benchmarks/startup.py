@@ -0,0 +1,209 @@
+"""
+Cold-start benchmark.
+
+Every sample runs in a fresh interpreter. It measures how long importing the integration
+takes once Home Assistant's core modules are loaded, which third-party packages the
+import pulls in, and the latency from async_setup_entry to the first entity state
+against the offline stand-in. Run from the repository root:
+
+    python -m benchmarks.startup --samples 5
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+from pathlib import Path
+from statistics import median
+import subprocess  # nosec
+import sys
+from time import perf_counter
+from typing import Any
+from unittest.mock import patch
+
+# Nothing from the integration or the other benchmark modules may be imported here.
+# They import the integration, which would leave nothing for the child to measure.
+
+ROOT = Path(__file__).resolve().parents[1]
+PACKAGE = "custom_components.cyclepay"
+PLATFORMS = ["binary_sensor", "sensor", "button"]
+
+# Loaded by Home Assistant before any integration is set up.
+CORE_MODULES = [
+    "homeassistant.components.persistent_notification",
+    "homeassistant.config_entries",
+    "homeassistant.core",
+    "homeassistant.helpers.aiohttp_client",
+    "homeassistant.helpers.config_validation",
+    "homeassistant.helpers.entity_platform",
+    "homeassistant.helpers.update_coordinator",
+]
+
+
+def measure_imports() -> dict[str, Any]:
+    """Time importing the integration and its platforms in a fresh interpreter."""
+
+    for module in CORE_MODULES:
+        importlib.import_module(module)
+
+    before = set(sys.modules)
+
+    started_at = perf_counter()
+    importlib.import_module(PACKAGE)
+    package_s = perf_counter() - started_at
+
+    after_package = set(sys.modules)
+
+    # Includes Home Assistant's sensor, binary_sensor and button components, which are
+    # loaded for the first integration that sets up those platforms.
+    started_at = perf_counter()
+    for platform in PLATFORMS:
+        importlib.import_module(f"{PACKAGE}.{platform}")
+    platforms_s = perf_counter() - started_at
+
+    return {
+        "package_ms": round(package_s * 1000, 3),
+        "platforms_ms": round(platforms_s * 1000, 3),
+        "modules": len(after_package - before),
+        "third_party": sorted(
+            {
+                module.partition(".")[0]
+                for module in after_package - before
+                if not module.startswith(("custom_components", "homeassistant"))
+            }
+        ),
+    }
+
+
+async def async_measure_setup(machines: int, latency: float) -> dict[str, Any]:
+    """Time async_setup_entry to first entity state and to completed setup."""
+
+    # pylint: disable=import-outside-toplevel
+    from homeassistant.const import EVENT_STATE_CHANGED
+    from homeassistant.core import Event, callback
+    from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+    from .common import async_test_instance
+    from .standin import RoomConfig, StandinServer
+
+    server = StandinServer(RoomConfig(machines=machines, latency=latency, seed=0))
+    url = await server.async_start()
+
+    try:
+        async with async_test_instance() as hass:
+            entry = MockConfigEntry(
+                domain="cyclepay",
+                data={"username": "bench@example.com", "password": "bench"},
+            )
+            entry.add_to_hass(hass)
+
+            first_state_at: float | None = None
+
+            @callback  # type: ignore
+            def _async_state_changed(_: Event) -> None:
+                nonlocal first_state_at
+
+                if first_state_at is None:
+                    first_state_at = perf_counter()
+
+            hass.bus.async_listen(EVENT_STATE_CHANGED, _async_state_changed)
+
+            with patch("pylaundry.API_ENDPOINT_URL", url):
+                started_at = perf_counter()
+
+                if not await hass.config_entries.async_setup(entry.entry_id):
+                    raise RuntimeError("Config entry failed to set up.")
+
+                await hass.async_block_till_done()
+
+                setup_s = perf_counter() - started_at
+
+                await hass.config_entries.async_unload(entry.entry_id)
+    finally:
+        await server.async_stop()
+
+    return {
+        "first_state_ms": (
+            round((first_state_at - started_at) * 1000, 3) if first_state_at else None
+        ),
+        "setup_ms": round(setup_s * 1000, 3),
+    }
+
+
+def _run_child(args: argparse.Namespace) -> None:
+    """Take one sample and print it as JSON."""
+
+    sys.path.insert(0, str(ROOT))
+
+    result = measure_imports()
+    result.update(asyncio.run(async_measure_setup(args.machines, args.latency)))
+
+    print(json.dumps(result))
+
+
+def _take_sample(args: argparse.Namespace) -> dict[str, Any]:
+    """Run one sample in a fresh interpreter."""
+
+    completed = subprocess.run(  # nosec
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.startup",
+            "--child",
+            "--machines",
+            str(args.machines),
+            "--latency",
+            str(args.latency),
+        ],
+        cwd=ROOT,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+    result: dict[str, Any] = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    return result
+
+
+def main() -> None:
+    """Run startup benchmark from the command line."""
+
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n", maxsplit=1)[0].strip()
+    )
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--machines", type=int, default=10)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Stand-in response delay in seconds."
+    )
+    parser.add_argument("--output", type=Path, help="Write samples to a JSON file.")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+
+    if args.child:
+        _run_child(args)
+        return
+
+    samples = [_take_sample(args) for _ in range(args.samples)]
+
+    for key in ("package_ms", "platforms_ms", "first_state_ms", "setup_ms"):
+        values = [sample[key] for sample in samples if sample[key] is not None]
+        print(
+            f"{key:>15}: median {median(values):>9.3f}  min {min(values):>9.3f}"
+            f"  max {max(values):>9.3f}"
+        )
+
+    print(f"{'modules':>15}: {samples[-1]['modules']}")
+    print(f"{'third party':>15}: {', '.join(samples[-1]['third_party'])}")
+
+    if args.output:
+        args.output.write_text(json.dumps(samples, indent=2) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
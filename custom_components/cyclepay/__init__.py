@@ -1,15 +1,13 @@
 """The CyclePay integration."""
 from __future__ import annotations
 
-from datetime import timedelta
+import asyncio
 import logging
 
-import async_timeout
 from homeassistant.config_entries import ConfigEntry, device_registry as dr
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from pylaundry import Laundry, MachineType
 from pylaundry.exceptions import (
     AuthenticationError,
@@ -18,7 +16,11 @@ from pylaundry.exceptions import (
     ResponseFormatError,
 )
 
-from .const import DOMAIN, STARTUP_MESSAGE
+from .const import DOMAIN, ISSUE_URL, STARTUP_MESSAGE
+from .coordinator import CyclePayCoordinator
+from .rooms import async_get_room_registry
+from .services import async_setup_services, async_unload_services
+from .store import SnapshotStore
 
 log = logging.getLogger(__name__)
 
@@ -30,7 +32,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     if DOMAIN not in hass.data:
         # Print startup message
-        log.info(STARTUP_MESSAGE)
+        log.info(STARTUP_MESSAGE, DOMAIN, ISSUE_URL)
 
     #
     # Load data from config entry
@@ -40,33 +42,23 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hass.data.setdefault(DOMAIN, {})
 
     laundry = Laundry(async_get_clientsession(hass))
+    snapshot_store = SnapshotStore(hass, entry.entry_id)
 
-    try:
-        await laundry.async_login(
-            username=entry.data["username"], password=entry.data["password"]
-        )
-    except (CommunicationError, ResponseFormatError, Rejected) as err:
-        raise ConfigEntryNotReady from err
-    except AuthenticationError as err:
-        raise ConfigEntryAuthFailed("Invalid username or password.") from err
+    coordinator = CyclePayCoordinator(hass, entry, laundry, snapshot_store)
 
-    async def async_update_data() -> Laundry:
+    # Serve entities from the last known snapshot and defer login to the first refresh.
+    if not (restored := await coordinator.async_restore()):
         try:
-            async with async_timeout.timeout(10):
-                await laundry.async_refresh()
-                return laundry
-        except (CommunicationError, ResponseFormatError, Rejected) as err:
-            raise UpdateFailed("Error communicating with API.") from err
+            await coordinator.async_login()
+        except (
+            asyncio.TimeoutError,
+            CommunicationError,
+            ResponseFormatError,
+            Rejected,
+        ) as err:
+            raise ConfigEntryNotReady from err
         except AuthenticationError as err:
-            raise ConfigEntryAuthFailed from err
-
-    coordinator = DataUpdateCoordinator(
-        hass,
-        log,
-        name=DOMAIN,
-        update_method=async_update_data,
-        update_interval=timedelta(minutes=1),
-    )
+            raise ConfigEntryAuthFailed("Invalid username or password.") from err
 
     device_registry = dr.async_get(hass)
 
@@ -88,14 +80,28 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             suggested_area="Laundry Room",
         )
 
-    # Fetch initial data so we have data when entities subscribe
-    await coordinator.async_config_entry_first_refresh()
+    if restored:
+        coordinator.async_set_updated_data(coordinator.data)
+    else:
+        # Fetch initial data so we have data when entities subscribe
+        await coordinator.async_config_entry_first_refresh()
+
+    # Accounts in the same laundry room share room status fetches.
+    coordinator.async_join_room(async_get_room_registry(hass))
 
     # Store coordinator
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    async_setup_services(hass)
+
+    if restored:
+        # Not awaited by Home Assistant's startup, which shouldn't wait on CyclePay.
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh"
+        )
+
     return True
 
 
@@ -103,6 +109,17 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator: CyclePayCoordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator.topoff_prices.async_cancel()
+        coordinator.vend_executor.async_cancel()
+        coordinator.async_leave_room()
+
+        async_unload_services(hass)
 
     return bool(unload_ok)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove stored data when a config entry is deleted."""
+
+    await SnapshotStore(hass, entry.entry_id).async_remove()
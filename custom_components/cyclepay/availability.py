@@ -0,0 +1,199 @@
+"""Machine availability index shared by availability entities."""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+import logging
+
+from pylaundry import MachineType
+
+from .snapshot import MachineSnapshot
+
+log = logging.getLogger(__name__)
+
+# Machine types are stored in RoomColumns.types as their position in MachineType.
+MACHINE_TYPE_CODES = {
+    machine_type: code for code, machine_type in enumerate(MachineType)
+}
+
+
+class RoomColumns:
+    """
+    Room state in row order with typed columns, rebuilt once per refresh.
+
+    Row i describes machines[i]. Rows are sorted by machine type and then minutes
+    remaining, so each type is a contiguous run with ascending minutes remaining.
+    Only the columns queried on every refresh are built; unknown minutes are stored
+    as 0. Queries used by diagnostics read fields from the rows instead.
+    """
+
+    __slots__ = ("machines", "types", "minutes_remaining")
+
+    def __init__(self, machines: list[MachineSnapshot], types: array) -> None:
+        """Initialize columns from machines in row order and their type codes."""
+
+        self.machines = machines
+        self.types = types
+        self.minutes_remaining = array(
+            "l", [machine.minutes_remaining or 0 for machine in machines]
+        )
+
+    @classmethod
+    def from_machines(cls, machines: Mapping[str, MachineSnapshot]) -> RoomColumns:
+        """Build columns from room snapshot machines."""
+
+        rows: list[MachineSnapshot] = []
+        types = array("B")
+
+        # Grouped by identity because hashing enum members is slow in large rooms.
+        for code, machine_type in enumerate(MachineType):
+            run = sorted(
+                (
+                    machine
+                    for machine in machines.values()
+                    if machine.type is machine_type
+                ),
+                key=_minutes_remaining,
+            )
+            rows.extend(run)
+            types.extend(array("B", [code]) * len(run))
+
+        return cls(rows, types)
+
+    def __len__(self) -> int:
+        """Return number of machines in the laundry room."""
+
+        return len(self.machines)
+
+    def rows(self, machine_type: MachineType) -> tuple[int, int]:
+        """Return start and end of the run of rows for machine type."""
+
+        code = MACHINE_TYPE_CODES[machine_type]
+
+        return bisect_left(self.types, code), bisect_right(self.types, code)
+
+
+def _minutes_remaining(machine: MachineSnapshot) -> int:
+    """Return minutes remaining for sorting, counting unknown as 0."""
+
+    return machine.minutes_remaining or 0
+
+
+class AvailabilityIndex:
+    """
+    Availability queries over a room's columns.
+
+    A machine is counted as available at an offset if its cycle finishes within that
+    many minutes, so every availability query is a single bisect over the machine
+    type's run of rows.
+    """
+
+    def __init__(self, columns: RoomColumns) -> None:
+        """Initialize index."""
+
+        self.columns = columns
+
+        self._rows = {
+            machine_type: rows
+            for machine_type in MachineType
+            if (rows := columns.rows(machine_type))[0] != rows[1]
+        }
+        self._forecasts: dict[tuple[MachineType, int], list[int]] = {}
+
+    @classmethod
+    def from_machines(
+        cls, machines: Mapping[str, MachineSnapshot]
+    ) -> AvailabilityIndex:
+        """Build index from room snapshot machines."""
+
+        return cls(RoomColumns.from_machines(machines))
+
+    @property
+    def machine_types(self) -> list[MachineType]:
+        """Return machine types present in the laundry room."""
+
+        return list(self._rows)
+
+    def total(self, machine_type: MachineType) -> int:
+        """Return number of machines of type in the laundry room."""
+
+        start, end = self._rows.get(machine_type, (0, 0))
+
+        return end - start
+
+    def online(self, machine_type: MachineType) -> int:
+        """Return number of machines of type connected to CyclePay."""
+
+        start, end = self._rows.get(machine_type, (0, 0))
+
+        return sum(1 for machine in self.columns.machines[start:end] if machine.online)
+
+    def busy(self, machine_type: MachineType) -> int:
+        """Return number of machines of type running a cycle."""
+
+        start, end = self._rows.get(machine_type, (0, 0))
+
+        return sum(1 for machine in self.columns.machines[start:end] if machine.busy)
+
+    def available_in(self, machine_type: MachineType, minutes: int) -> int:
+        """Return number of machines of type that will be free in the given minutes."""
+
+        if (rows := self._rows.get(machine_type)) is None:
+            return 0
+
+        start, end = rows
+
+        return bisect_right(self.columns.minutes_remaining, minutes, start, end) - start
+
+    def soonest_free(self, machine_type: MachineType) -> tuple[str, int] | None:
+        """Return ID and minutes left of the first online machine of type to finish.
+
+        Returns None if no machine of type is online.
+        """
+
+        start, end = self._rows.get(machine_type, (0, 0))
+        columns = self.columns
+
+        for row in range(start, end):
+            if columns.machines[row].online:
+                return columns.machines[row].id_, columns.minutes_remaining[row]
+
+        return None
+
+    def price_range(self, machine_type: MachineType) -> tuple[float, float] | None:
+        """Return lowest and highest known base price for machine type."""
+
+        start, end = self._rows.get(machine_type, (0, 0))
+
+        prices = [
+            price
+            for machine in self.columns.machines[start:end]
+            if isinstance(price := machine.base_price, float)
+        ]
+
+        if not prices:
+            return None
+
+        return min(prices), max(prices)
+
+    def forecast(self, machine_type: MachineType, horizon: int) -> list[int]:
+        """Return availability curve for machine type.
+
+        Item i is the number of machines that will be free in i minutes, for i in
+        0..horizon. Computed once per index with one bisect per minute, so the cost
+        grows only logarithmically with the number of machines.
+        """
+
+        if (key := (machine_type, horizon)) in self._forecasts:
+            return self._forecasts[key]
+
+        start, end = self._rows.get(machine_type, (0, 0))
+        minutes_remaining = self.columns.minutes_remaining
+
+        self._forecasts[key] = curve = [
+            bisect_right(minutes_remaining, minutes, start, end) - start
+            for minutes in range(horizon + 1)
+        ]
+
+        return curve
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import logging
+from typing import Any
 
 from homeassistant import core
 from homeassistant.components.binary_sensor import (
@@ -12,13 +13,12 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import callback
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback, DiscoveryInfoType
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-)
-from pylaundry import Laundry, LaundryMachine, MachineType
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from pylaundry import MachineType
 
 from .const import DOMAIN
+from .coordinator import CyclePayCoordinator
+from .snapshot import MachineSnapshot, RoomSnapshot
 
 log = logging.getLogger(__name__)
 
@@ -30,41 +30,41 @@ async def async_setup_entry(
     discovery_info: DiscoveryInfoType | None = None,  # pylint: disable=unused-argument
 ) -> None:
     """Set up entities using the binary sensor platform from this config entry."""
-    coordinator: DataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator: CyclePayCoordinator = hass.data[DOMAIN][entry.entry_id]
 
-    coordinator_data: Laundry = coordinator.data
+    snapshot: RoomSnapshot = coordinator.data
     async_add_entities(
         (
             MachineInUseSensor(
                 coordinator=coordinator,
-                machine_id=machine.id_,
+                machine_id=machine_id,
             )
-            for machine in coordinator_data.machines.values()
-            if isinstance(machine, LaundryMachine)
+            for machine_id in snapshot.machines
         ),
-        True,
     )
 
 
 class MachineInUseSensor(BinarySensorEntity, CoordinatorEntity):  # type: ignore
     """Sensor showing whether a machine is in use."""
 
-    def __init__(self, coordinator: DataUpdateCoordinator, machine_id: str):
+    _attr_extra_state_attributes: dict[str, Any]
+
+    def __init__(self, coordinator: CyclePayCoordinator, machine_id: str):
         """Pass coordinator to CoordinatorEntity."""
-        super().__init__(coordinator=coordinator)
+        super().__init__(coordinator=coordinator, context=machine_id)
 
         self._attr_entity_registry_visible_default = False
 
         self._machine_id = machine_id
 
-        self.laundry: Laundry = coordinator.data
-        machine: LaundryMachine = self.laundry.machines.get(machine_id)
+        snapshot: RoomSnapshot = coordinator.data
+        machine: MachineSnapshot = snapshot.machines[machine_id]
 
         self._machine_type: MachineType = machine.type
 
         machine_type_str = str(machine.type.value).title()
 
-        self._attr_unique_id = f"{self.laundry.profile.user_id}_{machine_id}_running"
+        self._attr_unique_id = f"{snapshot.user_id}_{machine_id}_running"
         self._attr_device_info: DeviceInfo | None = {
             "identifiers": {(DOMAIN, machine_id)},
         }
@@ -83,12 +83,15 @@ class MachineInUseSensor(BinarySensorEntity, CoordinatorEntity):  # type: ignore
     def update_device_data(self) -> None:
         """Update the entity when coordinator is updated."""
 
-        machine: LaundryMachine = self.laundry.machines.get(self._machine_id)
+        machine: MachineSnapshot = self.coordinator.data.machines[self._machine_id]
 
         self._attr_is_on = machine.busy if machine.online else None
 
         self._attr_extra_state_attributes.update(
-            {"minutes_remaining": machine.minutes_remaining}
+            {
+                "minutes_remaining": machine.minutes_remaining,
+                "stale": self.coordinator.stale,
+            }
         )
 
         if self._machine_type in [MachineType.WASHER, MachineType.DRYER]:
@@ -118,3 +121,11 @@ class MachineInUseSensor(BinarySensorEntity, CoordinatorEntity):  # type: ignore
         self.update_device_data()
 
         self.async_write_ha_state()
+
+    async def async_update(self) -> None:
+        """Refresh only this entity's machine when an update is requested."""
+
+        if not self.enabled:
+            return
+
+        await self.coordinator.async_refresh_machine(self._machine_id)
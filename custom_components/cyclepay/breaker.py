@@ -0,0 +1,113 @@
+"""Circuit breaker for CyclePay refreshes."""
+from __future__ import annotations
+
+from enum import Enum
+import logging
+import random
+from time import monotonic
+
+log = logging.getLogger(__name__)
+
+
+class BreakerState(str, Enum):
+    """Circuit breaker state."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Stops refreshing CyclePay after repeated failures.
+
+    The breaker opens after failure_threshold consecutive failures. While open, no
+    requests are allowed. Once the backoff delay passes, the breaker is half open and
+    allows a single trial request. Success closes the breaker. Failure opens it again
+    with twice the delay. Delays are jittered so that instances don't retry in lockstep.
+    """
+
+    def __init__(
+        self, failure_threshold: int, base_delay: float, max_delay: float
+    ) -> None:
+        """Initialize breaker."""
+
+        self._failure_threshold = failure_threshold
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+
+        self._state = BreakerState.CLOSED
+        self._retry_at = 0.0
+        self._trial_in_flight = False
+
+        self.consecutive_failures = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> BreakerState:
+        """Return current state."""
+
+        if self._state is BreakerState.OPEN and monotonic() >= self._retry_at:
+            self._state = BreakerState.HALF_OPEN
+
+        return self._state
+
+    @property
+    def retry_in(self) -> float:
+        """Return seconds until the breaker allows a trial request."""
+
+        return max(0.0, self._retry_at - monotonic())
+
+    def allow_request(self) -> bool:
+        """Return whether a request may be sent now."""
+
+        if (state := self.state) is BreakerState.CLOSED:
+            return True
+
+        if state is BreakerState.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+
+        return False
+
+    def record_success(self) -> None:
+        """Close breaker after a successful request."""
+
+        if self._state is not BreakerState.CLOSED:
+            log.info("CyclePay is reachable again.")
+
+        self._state = BreakerState.CLOSED
+        self._trial_in_flight = False
+        self.consecutive_failures = 0
+
+    def record_cancelled(self) -> None:
+        """Free the trial of a half open breaker for a request that never finished."""
+
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Count a failed request, opening the breaker if needed."""
+
+        self.consecutive_failures += 1
+
+        if (
+            self._state is BreakerState.CLOSED
+            and self.consecutive_failures < self._failure_threshold
+        ):
+            return
+
+        # Consecutive failures since the breaker first opened double the delay.
+        exponent = self.consecutive_failures - self._failure_threshold
+        delay = min(self._max_delay, self._base_delay * 2 ** max(0, exponent))
+        delay *= random.uniform(0.5, 1.0)  # nosec
+
+        self._state = BreakerState.OPEN
+        self._retry_at = monotonic() + delay
+        self._trial_in_flight = False
+        self.times_opened += 1
+
+        log.warning(
+            "CyclePay failed %s times in a row. Retrying in %.0f seconds.",
+            self.consecutive_failures,
+            delay,
+        )
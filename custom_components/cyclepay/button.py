@@ -6,19 +6,24 @@ import logging
 from typing import Literal
 
 from homeassistant import core
+
+# Not deferred. Home Assistant sets up persistent_notification before any integration.
 from homeassistant.components import persistent_notification
 from homeassistant.components.button import ButtonEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback, DiscoveryInfoType
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-)
-from pylaundry import Laundry, LaundryMachine, MachineOffline, MachineType
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from pylaundry import MachineOffline, MachineType
+from pylaundry.exceptions import AuthenticationError, NotLoggedIn, VendFailure
 
-from .const import DOMAIN, EVENT_VEND_BEGIN, OPT_FULL_LOAD
+from .const import DOMAIN, OPT_FULL_LOAD, SIGNAL_VEND_BEGIN, VEND_REQUEST_TIMEOUT
+from .coordinator import CyclePayCoordinator
+from .ledger import Reservation
+from .pricing import vend_cost
+from .snapshot import MachineSnapshot, RoomSnapshot
 
 log = logging.getLogger(__name__)
 
@@ -31,9 +36,9 @@ async def async_setup_entry(
 ) -> None:
     """Set up the button platform."""
 
-    coordinator: DataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator: CyclePayCoordinator = hass.data[DOMAIN][entry.entry_id]
 
-    coordinator_data: Laundry = coordinator.data
+    snapshot: RoomSnapshot = coordinator.data
 
     # Create vend once buttons
     async_add_entities(
@@ -42,10 +47,8 @@ async def async_setup_entry(
                 coordinator=coordinator,
                 machine_id=machine.id_,
             )
-            for machine in coordinator_data.machines.values()
-            if isinstance(machine, LaundryMachine)
+            for machine in snapshot.machines.values()
         ),
-        True,
     )
 
     # Create base + topoff buttons for dryers
@@ -54,45 +57,50 @@ async def async_setup_entry(
             SwipePreferredCycleButton(
                 coordinator=coordinator, machine_id=machine.id_, config_entry=entry
             )
-            for machine in coordinator_data.machines.values()
-            if isinstance(machine, LaundryMachine) and machine.type == MachineType.DRYER
+            for machine in snapshot.machines.values()
+            if machine.type == MachineType.DRYER
         ),
-        True,
     )
 
 
 class BaseButton(ButtonEntity, CoordinatorEntity):  # type: ignore
     """Integration button entity shared functions."""
 
-    coordinator: DataUpdateCoordinator
+    coordinator: CyclePayCoordinator
     _attr_icon = "mdi:currency-usd"
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator,
+        coordinator: CyclePayCoordinator,
         machine_id: str,
         name_suffix: str,
         id_suffix: str,
     ):
         """Pass coordinator to CoordinatorEntity."""
-        super().__init__(coordinator=coordinator)
+        super().__init__(coordinator=coordinator, context=machine_id)
 
         self.machine_id = machine_id
 
-        self.laundry: Laundry = coordinator.data
-        self.machine: LaundryMachine = self.laundry.machines[machine_id]
+        snapshot: RoomSnapshot = coordinator.data
+        machine: MachineSnapshot = snapshot.machines[machine_id]
 
-        self.machine_type: MachineType = self.machine.type
-        machine_type_str = str(self.machine.type.value).title()
+        self.machine_type: MachineType = machine.type
+        machine_type_str = str(machine.type.value).title()
 
-        self._attr_unique_id = (
-            f"{self.laundry.profile.user_id}_{machine_id}_{id_suffix}"
-        )
+        self._attr_unique_id = f"{snapshot.user_id}_{machine_id}_{id_suffix}"
         self._attr_device_info: DeviceInfo | None = {
             "identifiers": {(DOMAIN, machine_id)},
         }
 
-        self._attr_name = f"{machine_type_str} {self.machine.number}: {name_suffix}"
+        self._attr_name = f"{machine_type_str} {machine.number}: {name_suffix}"
+
+    @property
+    def machine(self) -> MachineSnapshot:
+        """Return machine from the latest coordinator data."""
+
+        machine: MachineSnapshot = self.coordinator.data.machines[self.machine_id]
+
+        return machine
 
     def _show_notification(self, msg: str) -> Literal[False]:
         """Show Home Assistant notification to alert user of error."""
@@ -117,80 +125,114 @@ class BaseButton(ButtonEntity, CoordinatorEntity):  # type: ignore
 
         self.async_write_ha_state()
 
-    async def _can_vend(self, num_swipes: int) -> bool:
-        """Determine whether card and machine are able to vend."""
+    async def _async_reserve(self, num_swipes: int) -> Reservation | None:
+        """Check that card and machine are able to vend and hold funds for the vend."""
+
+        topoff_data: dict | None = None
 
-        # Fetch topoff data if we don't already have it.
-        if not self.machine.topoff_price or not self.machine.base_price:
+        if self.machine.type == MachineType.DRYER:
             try:
-                # Use returned instance of topoff data. Update won't be reflected in self.laundry until next coordinator update.
-                topoff_data = await self.laundry.async_get_topoff_data(self.machine.id_)
+                # Served from cache warmed after each refresh. Fetched only on a miss.
+                topoff_data = await self.coordinator.topoff_prices.async_get(
+                    self.machine_id
+                )
             except MachineOffline:
-                return self._show_notification(
+                self._show_notification(
                     "Cannot vend"
                     f" {self.machine.type.name.title()} {self.machine.number}. Machine"
                     " is not connected to CyclePay."
                 )
+                return None
+            except asyncio.TimeoutError:
+                # Left unknown. Starting an idle dryer doesn't need the topoff price.
+                log.debug("Timed out fetching topoff price for %s.", self.machine_id)
 
         log.debug(topoff_data)
 
-        # Make sure we received correct values. Topoff data can be unreliable.
-        if not isinstance(self.machine.base_price, float) or (
-            self.machine.type == MachineType.DRYER
-            and (not topoff_data or not isinstance(topoff_data.get("price"), float))
-        ):
-            return self._show_notification(
-                "Cannot determine whether sufficient funds are available to vend"
-                f" {self.machine.type.name.title()} {self.machine.number}."
-            )
-
         # Make sure we're not requesting a topoff of a washer.
         if num_swipes > 1 and self.machine.type is not MachineType.DRYER:
-            return self._show_notification(
+            self._show_notification(
                 "Cannot topoff"
                 f" {self.machine.type.name.title()} {self.machine.number} because it is"
                 " not a dryer."
             )
+            return None
 
-        vend_cost: float | None = None
-
-        # Calculate cost of vend.
-        if num_swipes == 1 and self.machine.busy:
-            vend_cost = topoff_data.get("price")
-        elif num_swipes == 1 and not self.machine.busy:
-            vend_cost = self.machine.base_price
-        elif num_swipes > 1 and self.machine.busy:
-            vend_cost = self.machine.base_price - (
-                topoff_data.get("price") * (num_swipes - 1)
+        # Topoff data can be unreliable. vend_cost() rejects prices that aren't floats.
+        if (
+            cost := vend_cost(
+                self.machine,
+                num_swipes,
+                topoff_data.get("price") if topoff_data else None,
             )
-
-        if not vend_cost:
-            return self._show_notification(
-                f"""Cannot determine whether sufficient funds are available to vend {self.machine.type.name.title()} {self.machine.number}"""
-                """because cycle price could not be loaded."""
+        ) is None:
+            self._show_notification(
+                "Cannot determine whether sufficient funds are available to vend"
+                f" {self.machine.type.name.title()} {self.machine.number} because cycle"
+                " price could not be loaded."
             )
+            return None
 
-        card_balance = (
-            0
-            if not self.laundry.profile.card_balance
-            else self.laundry.profile.card_balance
-        )
+        ledger = self.coordinator.balance_ledger
+        card_balance = self.coordinator.data.card_balance
 
-        # Check if card has sufficient funds.
-        if card_balance - vend_cost < 0:
-            return self._show_notification(
-                f"Card balance of ${card_balance:.2f} is insufficient for the requested"
-                f" ${vend_cost:.2f} payment. Please add funds to your virtual card"
-                " using the CyclePay app."
+        # Checking and reserving must not be separated by an await. Otherwise, concurrent
+        # presses could both pass the check against the same balance.
+        if (reservation := ledger.try_reserve(card_balance, cost)) is None:
+            self._show_notification(
+                f"Card balance of ${ledger.available(card_balance):.2f} (after pending"
+                f" vends) is insufficient for the requested ${cost:.2f} payment. Please"
+                " add funds to your virtual card using the CyclePay app."
             )
+            return None
+
+        return reservation
+
+    async def _async_vend(self, num_swipes: int, reservation: Reservation) -> None:
+        """Queue swipes with the vend executor and wait for CyclePay to confirm them."""
 
-        return True
+        request = self.coordinator.vend_executor.async_submit(
+            self.machine_id, num_swipes, timeout=VEND_REQUEST_TIMEOUT
+        )
+        failure: Exception | None = None
+
+        try:
+            await request.future
+        except (
+            asyncio.TimeoutError,
+            AuthenticationError,
+            MachineOffline,
+            NotLoggedIn,
+            VendFailure,
+        ) as err:
+            failure = err
+        finally:
+            # Settled on every exit, before the confirming refresh reads the balance.
+            self.coordinator.balance_ledger.close(reservation, request.swipes_sent)
+
+        if failure is None:
+            await self.coordinator.async_confirm_vend(self.machine_id)
+            return
+
+        self._handle_vend_failure(failure)
+
+        await self.coordinator.async_refresh_machine(self.machine_id)
+
+    def _handle_vend_failure(self, err: Exception) -> None:
+        """Alert user that a vend failed."""
+
+        log.error("Failed to vend %s: %s", self.machine_id, err)
+
+        self._attr_available = True
+        self._show_notification(
+            f"Failed to vend {self.machine.type.name.title()} {self.machine.number}."
+        )
 
 
 class SwipeOnceButton(BaseButton):
     """Button entity for swiping virtual card through machine a single time."""
 
-    def __init__(self, coordinator: DataUpdateCoordinator, machine_id: str):
+    def __init__(self, coordinator: CyclePayCoordinator, machine_id: str):
         """Pass coordinator to CoordinatorEntity."""
         super().__init__(
             coordinator=coordinator,
@@ -203,17 +245,13 @@ class SwipeOnceButton(BaseButton):
         """Handle the button press."""
 
         self._attr_available = False
-        self.hass.bus.async_fire(EVENT_VEND_BEGIN, {"machine_id": self.machine_id})
+        async_dispatcher_send(self.hass, SIGNAL_VEND_BEGIN.format(self.machine_id))
 
-        if not await self._can_vend(num_swipes=1):
+        if (reservation := await self._async_reserve(num_swipes=1)) is None:
             self._attr_available = True
             return None
 
-        await self.laundry.async_vend(self.machine_id)
-
-        await asyncio.sleep(5)
-
-        await self.coordinator.async_refresh()
+        await self._async_vend(num_swipes=1, reservation=reservation)
 
 
 class SwipePreferredCycleButton(BaseButton):
@@ -221,7 +259,7 @@ class SwipePreferredCycleButton(BaseButton):
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator,
+        coordinator: CyclePayCoordinator,
         machine_id: str,
         config_entry: ConfigEntry,
     ):
@@ -251,20 +289,10 @@ class SwipePreferredCycleButton(BaseButton):
 
         self._attr_available = False
 
-        self.hass.bus.async_fire(EVENT_VEND_BEGIN, {"machine_id": self.machine_id})
+        async_dispatcher_send(self.hass, SIGNAL_VEND_BEGIN.format(self.machine_id))
 
-        if not await self._can_vend(num_swipes=num_swipes):
+        if (reservation := await self._async_reserve(num_swipes=num_swipes)) is None:
             self._attr_available = True
             return None
 
-        i = 0
-        while i <= num_swipes:
-            # Ensures that the machine state doesn't update while we're vending.
-            self.hass.bus.async_fire(EVENT_VEND_BEGIN, {"machine_id": self.machine_id})
-
-            await self.laundry.async_vend(self.machine_id)
-            i += 1
-
-        await asyncio.sleep(5)
-
-        await self.coordinator.async_refresh()
+        await self._async_vend(num_swipes=num_swipes, reservation=reservation)
@@ -18,7 +18,15 @@ from pylaundry.exceptions import (
 )
 import voluptuous as vol
 
-from .const import DOMAIN, OPT_FULL_LOAD
+from .const import (
+    DEFAULT_POLL_MAX_INTERVAL,
+    DEFAULT_POLL_MIN_INTERVAL,
+    DOMAIN,
+    OPT_FULL_LOAD,
+    OPT_POLL_MAX_INTERVAL,
+    OPT_POLL_MIN_INTERVAL,
+)
+from .ratelimit import Priority, async_get_rate_limiter
 
 log = logging.getLogger(__name__)
 
@@ -34,6 +42,8 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     """
     laundry = Laundry(async_get_clientsession(hass))
 
+    await async_get_rate_limiter(hass).async_acquire(Priority.LOGIN)
+
     try:
         await laundry.async_login(username=data["username"], password=data["password"])
     except (CommunicationError, ResponseFormatError, Rejected) as err:
@@ -104,7 +114,11 @@ class OptionsFlow(config_entries.OptionsFlow):  # type: ignore
 
         if user_input is not None:
             self.options.update(user_input)
-            return self.async_create_entry(title="", data=user_input)
+
+            if user_input[OPT_POLL_MAX_INTERVAL] < user_input[OPT_POLL_MIN_INTERVAL]:
+                errors[OPT_POLL_MAX_INTERVAL] = "max_interval_below_min"
+            else:
+                return self.async_create_entry(title="", data=user_input)
 
         schema = vol.Schema(
             {
@@ -117,7 +131,19 @@ class OptionsFlow(config_entries.OptionsFlow):  # type: ignore
                         )
                         else full_dryer_load_swipes
                     ),
-                ): int
+                ): int,
+                vol.Required(
+                    OPT_POLL_MIN_INTERVAL,
+                    default=self.options.get(
+                        OPT_POLL_MIN_INTERVAL, DEFAULT_POLL_MIN_INTERVAL
+                    ),
+                ): vol.All(int, vol.Range(min=10)),
+                vol.Required(
+                    OPT_POLL_MAX_INTERVAL,
+                    default=self.options.get(
+                        OPT_POLL_MAX_INTERVAL, DEFAULT_POLL_MAX_INTERVAL
+                    ),
+                ): vol.All(int, vol.Range(min=10)),
             }
         )
 
@@ -1,14 +1,94 @@
 """Constants for the CyclePay integration."""
+from datetime import timedelta
 
 DOMAIN = "cyclepay"
 ISSUE_URL = "https://github.com/elahd/ha-cyclepay/issues"
 INTEGRATION_NAME = "CyclePay for ESD/Hercules Laundry Rooms"
 
-EVENT_VEND_BEGIN = "cyclepay_vend_begin"
+# hass.data key for the RoomRegistry shared by all config entries.
+DATA_ROOMS = f"{DOMAIN}_rooms"
+# hass.data key for the RateLimiter shared by all config entries.
+DATA_RATE_LIMITER = f"{DOMAIN}_rate_limiter"
+
+# Dispatcher signal sent before vending a machine. Format with machine ID.
+SIGNAL_VEND_BEGIN = "cyclepay_vend_begin_{}"
+
+STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 30  # seconds
+
+# CyclePay doesn't report token expiry. Cached tokens older than this aren't reused.
+SESSION_TOKEN_LIFETIME = timedelta(hours=12)
+
+# Minutes from now for which machine availability sensors are created.
+AVAILABILITY_OFFSETS = (0, 15, 30, 45, 60)
+
+# Length of the availability curve exposed by forecast sensors, in minutes.
+FORECAST_HORIZON_MIN = 120
+
+# Coordinator listener context for card balance and other account-level data.
+CONTEXT_PROFILE = "profile"
+# Combined with a machine type to form the listener context for forecast sensors.
+CONTEXT_FORECAST = "forecast"
+# Combined with a machine type to form the listener context for next free sensors.
+CONTEXT_NEXT_FREE = "next_free"
+
+# Next free sensors count down locally at this interval between refreshes.
+NEXT_FREE_TICK_INTERVAL = timedelta(seconds=30)
+
+# After vending, poll CyclePay until the machine reflects the vend or this many seconds
+# pass. Polling starts after VEND_CONFIRM_INITIAL_DELAY and backs off exponentially.
+VEND_CONFIRM_TIMEOUT = 30
+VEND_CONFIRM_INITIAL_DELAY = 1
+
+# Vends for different machines run concurrently, up to this many at a time. Vends for
+# the same machine are always serialized.
+VEND_MAX_CONCURRENCY = 4
+# Seconds a queued vend may wait and run before it is abandoned.
+VEND_REQUEST_TIMEOUT = 60
+
+# Seconds a single login, refresh or topoff price request may take, not counting rate
+# limiting.
+REQUEST_TIMEOUT = 10
+
+# All CyclePay requests, across config entries, share a token bucket that refills at
+# this many requests per second and holds up to RATE_LIMIT_BURST requests.
+RATE_LIMIT_PER_SECOND = 1.0
+RATE_LIMIT_BURST = 10
+
+# Latency samples kept per pipeline stage for percentile sensors and diagnostics.
+METRICS_WINDOW = 200
+
+# Seconds a fetched dryer topoff price is reused before it is fetched again.
+TOPOFF_PRICE_TTL = 6 * 60 * 60
 
 OPT_FULL_LOAD = "full_dryer_load_swipes"
+OPT_POLL_MIN_INTERVAL = "poll_min_interval"
+OPT_POLL_MAX_INTERVAL = "poll_max_interval"
+
+DEFAULT_POLL_MIN_INTERVAL = 60  # seconds
+DEFAULT_POLL_MAX_INTERVAL = 900  # seconds
+
+# Accounts in the same laundry room reuse room status fetched by another account within
+# this many seconds instead of fetching it again.
+ROOM_SHARE_WINDOW = 30
+# CyclePay only reports card balance with room status. Accounts fetch room status
+# themselves, rather than reusing it, at least this often to keep balances current.
+BALANCE_REFRESH_INTERVAL = 15 * 60  # seconds
+
+# Refreshes stop after this many consecutive failures and resume after a jittered
+# backoff that starts at BREAKER_BASE_DELAY and doubles up to BREAKER_MAX_DELAY.
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_BASE_DELAY = 60  # seconds
+BREAKER_MAX_DELAY = 30 * 60  # seconds
+
+# Refresh again this long after a predicted finish to confirm the machine freed up.
+FINISH_RECHECK_DELAY = timedelta(seconds=30)
+# Predicted finish times that move by less than this between polls are not rescheduled.
+FINISH_TOLERANCE = timedelta(seconds=90)
 
-STARTUP_MESSAGE = f"""
+# Logged with DOMAIN and ISSUE_URL as arguments, so it is only formatted if INFO
+# logging is enabled.
+STARTUP_MESSAGE = """
 ===================================================================
 
                                        o  @o**o#@@@
@@ -42,9 +122,9 @@ STARTUP_MESSAGE = f"""
          @ *O#***o@ O
         @*ooOOO#@@ *
 
-{DOMAIN}
+%s
 This is a custom component
 If you have any issues with this you need to open an issue here:
-{ISSUE_URL}
+%s
 ===================================================================
 """
@@ -0,0 +1,664 @@
+"""Data update coordinator for the CyclePay integration."""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+from functools import partial
+import logging
+from time import monotonic
+from typing import Any
+
+import async_timeout
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+from pylaundry import Laundry
+from pylaundry.exceptions import (
+    AuthenticationError,
+    CommunicationError,
+    Rejected,
+    ResponseFormatError,
+)
+
+from .availability import AvailabilityIndex
+from .breaker import BreakerState, CircuitBreaker
+from .const import (
+    AVAILABILITY_OFFSETS,
+    BALANCE_REFRESH_INTERVAL,
+    BREAKER_BASE_DELAY,
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_MAX_DELAY,
+    CONTEXT_FORECAST,
+    CONTEXT_NEXT_FREE,
+    CONTEXT_PROFILE,
+    DEFAULT_POLL_MAX_INTERVAL,
+    DEFAULT_POLL_MIN_INTERVAL,
+    DOMAIN,
+    FINISH_RECHECK_DELAY,
+    FINISH_TOLERANCE,
+    FORECAST_HORIZON_MIN,
+    METRICS_WINDOW,
+    OPT_POLL_MAX_INTERVAL,
+    OPT_POLL_MIN_INTERVAL,
+    REQUEST_TIMEOUT,
+    ROOM_SHARE_WINDOW,
+    SESSION_TOKEN_LIFETIME,
+    TOPOFF_PRICE_TTL,
+    VEND_CONFIRM_INITIAL_DELAY,
+    VEND_CONFIRM_TIMEOUT,
+    VEND_MAX_CONCURRENCY,
+)
+from .ledger import BalanceLedger
+from .metrics import PipelineMetrics, Stage
+from .nextfree import NextFreeQueue
+from .pricing import TopoffPriceCache
+from .ratelimit import Priority, async_get_rate_limiter
+from .rooms import RoomRegistry, SharedRoom
+from .scheduler import FinishTimeScheduler
+from .snapshot import RoomSnapshot
+from .store import SnapshotStore
+from .vend import VendExecutor
+
+log = logging.getLogger(__name__)
+
+
+class CyclePayCoordinator(DataUpdateCoordinator):  # type: ignore
+    """Polls CyclePay and adapts the polling interval to laundry room activity."""
+
+    # Latest published room snapshot. Only None before the first restore or refresh,
+    # which happen before any platform is set up.
+    data: RoomSnapshot
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        laundry: Laundry,
+        snapshot_store: SnapshotStore,
+    ):
+        """Initialize coordinator."""
+
+        super().__init__(
+            hass,
+            log,
+            name=DOMAIN,
+            update_interval=timedelta(
+                seconds=entry.options.get(
+                    OPT_POLL_MIN_INTERVAL, DEFAULT_POLL_MIN_INTERVAL
+                )
+            ),
+        )
+
+        self.config_entry = entry
+        self.laundry = laundry
+        self.snapshot_store = snapshot_store
+
+        self.logged_in = False
+        self.session_issued_at: datetime | None = None
+
+        # Set while a cached session token hasn't yet been accepted by CyclePay.
+        self._session_restored = False
+        # Set after a login until the next refresh. Login responses include room status
+        # and card balance, so that refresh doesn't need to fetch them again.
+        self._fresh_login = False
+
+        # Listener contexts (machine IDs, machine types, CONTEXT_PROFILE) whose data
+        # changed in the last refresh. Listeners without a context are always notified.
+        self.changed_contexts: set[Any] = set()
+        self.availability = AvailabilityIndex.from_machines({})
+        self.next_free = NextFreeQueue()
+        self.last_refreshed_at: datetime | None = None
+        # Room snapshot published before the current one in self.data.
+        self.previous_data: RoomSnapshot | None = None
+        self._fingerprints: dict[Any, tuple] = {}
+        # Contexts passed to async_mark_changed that haven't been notified yet.
+        self._forced_contexts: set[Any] = set()
+        self._last_notified_success: bool | None = None
+        self._last_notified_stale: bool | None = None
+
+        # Set while entities serve the last known snapshot because CyclePay can't be
+        # reached.
+        self.stale = False
+        self.breaker = CircuitBreaker(
+            failure_threshold=BREAKER_FAILURE_THRESHOLD,
+            base_delay=BREAKER_BASE_DELAY,
+            max_delay=BREAKER_MAX_DELAY,
+        )
+
+        # Monotonic time at which the fetch that produced the current card balance
+        # started. Vends committed before then are reflected in the balance.
+        self._balance_fetched_at: float | None = None
+
+        # Set while this account shares room status with others in the same room.
+        self.room: SharedRoom | None = None
+        self._leave_room: CALLBACK_TYPE | None = None
+
+        # Shared by all config entries.
+        self.rate_limiter = async_get_rate_limiter(hass)
+
+        self.metrics = PipelineMetrics(METRICS_WINDOW)
+
+        self.topoff_prices = TopoffPriceCache(
+            hass, laundry, self.rate_limiter, self.metrics, ttl=TOPOFF_PRICE_TTL
+        )
+        self.balance_ledger = BalanceLedger()
+        self.vend_executor = VendExecutor(
+            hass,
+            laundry,
+            self.rate_limiter,
+            self.metrics,
+            max_concurrency=VEND_MAX_CONCURRENCY,
+        )
+
+        self.finish_scheduler = FinishTimeScheduler(
+            recheck_delay=FINISH_RECHECK_DELAY, tolerance=FINISH_TOLERANCE
+        )
+
+    @property
+    def poll_min_interval(self) -> timedelta:
+        """Shortest allowed polling interval (floor)."""
+
+        return timedelta(
+            seconds=self.config_entry.options.get(
+                OPT_POLL_MIN_INTERVAL, DEFAULT_POLL_MIN_INTERVAL
+            )
+        )
+
+    @property
+    def poll_max_interval(self) -> timedelta:
+        """Longest allowed polling interval (ceiling)."""
+
+        return max(
+            self.poll_min_interval,
+            timedelta(
+                seconds=self.config_entry.options.get(
+                    OPT_POLL_MAX_INTERVAL, DEFAULT_POLL_MAX_INTERVAL
+                )
+            ),
+        )
+
+    async def async_restore(self) -> bool:
+        """Load last snapshot and, if not yet expired, the cached session token.
+
+        Returns False if there is no usable snapshot, in which case the caller must log
+        in and refresh before creating entities.
+        """
+
+        if not await self.snapshot_store.async_restore(self.laundry):
+            return False
+
+        if issued_at := self.snapshot_store.restore_session(
+            self.laundry, SESSION_TOKEN_LIFETIME
+        ):
+            # pylaundry uses credentials to log back in when a request is malformed.
+            # pylint: disable=protected-access
+            self.laundry._username = self.config_entry.data["username"]
+            self.laundry._password = self.config_entry.data["password"]
+
+            self.session_issued_at = issued_at
+            self.logged_in = True
+            self._session_restored = True
+
+            log.debug("Reusing CyclePay session issued at %s.", issued_at)
+
+        self._process_refreshed_data(dt_util.utcnow())
+
+        return True
+
+    async def async_login(self) -> None:
+        """Log in to CyclePay using config entry credentials."""
+
+        await self.rate_limiter.async_acquire(Priority.LOGIN)
+
+        started_at = monotonic()
+
+        # Started after the rate limiter so that waiting for a token can't time out.
+        async with async_timeout.timeout(REQUEST_TIMEOUT):
+            with self.metrics.measure(Stage.LOGIN):
+                await self.laundry.async_login(
+                    username=self.config_entry.data["username"],
+                    password=self.config_entry.data["password"],
+                )
+
+        self.logged_in = True
+        self.session_issued_at = dt_util.utcnow()
+        self._session_restored = False
+        self._fresh_login = True
+        self._balance_fetched_at = started_at
+
+    @callback  # type: ignore
+    def async_update_listeners(self) -> None:
+        """Notify listeners whose machine, machine type, or profile changed.
+
+        Everyone is notified when availability or staleness flips so that entities can
+        reflect it.
+        """
+
+        notify_all = (
+            self.last_update_success != self._last_notified_success
+            or self.stale != self._last_notified_stale
+        )
+        self._last_notified_success = self.last_update_success
+        self._last_notified_stale = self.stale
+
+        with self.metrics.measure(Stage.FANOUT):
+            for update_callback, context in list(self._listeners.values()):
+                if notify_all or context is None or context in self.changed_contexts:
+                    update_callback()
+
+    @callback  # type: ignore
+    def async_mark_changed(self, context: Any) -> None:
+        """Force listeners for context to be notified after the next refresh."""
+
+        self._forced_contexts.add(context)
+
+    async def async_refresh_machine(self, machine_id: str) -> bool:
+        """Refresh a single machine and notify only its listeners and aggregates.
+
+        Returns False if CyclePay could not be reached.
+        """
+
+        if not await self._async_fetch_room():
+            return False
+
+        self._async_publish_partial({machine_id})
+
+        return True
+
+    async def async_confirm_vend(self, machine_id: str) -> bool:
+        """Poll CyclePay until machine_id reflects a vend, then publish the result.
+
+        Returns whether the vend was confirmed.
+        """
+
+        return machine_id in await self.async_confirm_vends({machine_id})
+
+    async def async_confirm_vends(
+        self, machine_ids: set[str], also_publish: set[str] | None = None
+    ) -> set[str]:
+        """Poll CyclePay until machines reflect their vends, then publish once.
+
+        Polls on an exponential backoff until every machine is running with more time
+        than it had left before its vend, or until VEND_CONFIRM_TIMEOUT passes. Each
+        poll is a single room fetch. Machines in also_publish are published without
+        being waited on. Returns IDs of machines whose vends were confirmed.
+        """
+
+        expected_minutes = {
+            machine_id: self._expected_minutes_remaining(machine_id)
+            for machine_id in machine_ids
+        }
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + VEND_CONFIRM_TIMEOUT
+        delay = VEND_CONFIRM_INITIAL_DELAY
+        confirmed: set[str] = set()
+        refreshed = False
+
+        while confirmed != machine_ids and (remaining := deadline - loop.time()) > 0:
+            await asyncio.sleep(min(delay, remaining))
+            delay *= 2
+
+            if not await self._async_fetch_room(Priority.CONFIRM):
+                continue
+
+            refreshed = True
+
+            for machine_id in machine_ids - confirmed:
+                machine = self.laundry.machines.get(machine_id)
+
+                # Allow a minute of rounding error in CyclePay's minutes remaining.
+                if (
+                    machine
+                    and machine.busy
+                    and (machine.minutes_remaining or 0)
+                    > expected_minutes[machine_id] + 1
+                ):
+                    confirmed.add(machine_id)
+
+        for machine_id in machine_ids - confirmed:
+            log.warning("Could not confirm vend of machine %s.", machine_id)
+
+        if refreshed:
+            self._async_publish_partial(machine_ids | (also_publish or set()))
+
+        return confirmed
+
+    async def _async_fetch_room(self, priority: Priority = Priority.REFRESH) -> bool:
+        """Fetch room status outside of the coordinator's refresh cycle."""
+
+        if not self.breaker.allow_request():
+            return False
+
+        # CyclePay only reports machine status for the whole room.
+        try:
+            await self._async_refresh_laundry(max_age=0, priority=priority)
+        except AuthenticationError as err:
+            # CyclePay answered, so it's reachable. The next coordinator refresh starts
+            # reauthentication.
+            log.debug("Failed to refresh CyclePay room status: %s", err)
+            self.breaker.record_success()
+            return False
+        except (
+            asyncio.TimeoutError,
+            CommunicationError,
+            ResponseFormatError,
+            Rejected,
+        ) as err:
+            log.debug("Failed to refresh CyclePay room status: %s", err)
+            self.breaker.record_failure()
+            return False
+        except asyncio.CancelledError:
+            # Says nothing about CyclePay, but a half-open breaker's trial must be
+            # freed.
+            self.breaker.record_cancelled()
+            raise
+        except Exception:
+            # Settles a half-open breaker's trial request, which would otherwise block
+            # every later request.
+            self.breaker.record_failure()
+            raise
+
+        self.breaker.record_success()
+        self.stale = False
+
+        return True
+
+    async def _async_refresh_laundry(
+        self, max_age: float, priority: Priority = Priority.REFRESH
+    ) -> None:
+        """Refresh laundry, reusing room status up to max_age seconds old if shared."""
+
+        started_at = monotonic()
+
+        if self.room is None:
+            await self._async_send_refresh(priority)
+        elif not await self.room.async_fetch(
+            self.laundry, max_age, partial(self._async_send_refresh, priority)
+        ):
+            return
+
+        self._balance_fetched_at = started_at
+
+    async def _async_send_refresh(self, priority: Priority = Priority.REFRESH) -> None:
+        """Fetch room status and card balance from CyclePay."""
+
+        await self.rate_limiter.async_acquire(priority)
+
+        async with async_timeout.timeout(REQUEST_TIMEOUT):
+            with self.metrics.measure(Stage.REFRESH):
+                await self.laundry.async_refresh()
+
+    @callback  # type: ignore
+    def async_join_room(self, registry: RoomRegistry) -> None:
+        """Share room status with other accounts in this account's laundry room."""
+
+        self.room, self._leave_room = registry.async_join(
+            self.laundry.profile.location_id,
+            self.laundry,
+            self._async_handle_room_update,
+        )
+
+    @callback  # type: ignore
+    def async_leave_room(self) -> None:
+        """Stop sharing room status."""
+
+        if self._leave_room:
+            self._leave_room()
+
+        self.room = self._leave_room = None
+
+    @callback  # type: ignore
+    def _async_handle_room_update(self, machines: dict) -> None:
+        """Publish room status fetched by another account in the same room."""
+
+        self.laundry.machines = dict(machines)
+        self.stale = False
+
+        self._process_refreshed_data(dt_util.utcnow())
+        self.snapshot_store.async_schedule_save(self.laundry, self.session_issued_at)
+
+        # Listeners are notified without rescheduling this account's own refresh, which
+        # reuses the shared status unless the card balance is due.
+        self.async_update_listeners()
+
+    @callback  # type: ignore
+    def _async_publish_partial(self, machine_ids: set[str]) -> None:
+        """Publish fetched data for some machines plus aggregates and profile.
+
+        Other machines keep their previous snapshots, so their entities pick up the
+        fetched data on the next full refresh.
+        """
+
+        now = dt_util.utcnow()
+
+        snapshot = self._process_refreshed_data(now, machine_ids=machine_ids)
+        self.update_interval = self._compute_update_interval(now)
+        self.snapshot_store.async_schedule_save(self.laundry, self.session_issued_at)
+
+        self.async_set_updated_data(snapshot)
+
+    def _expected_minutes_remaining(self, machine_id: str) -> float:
+        """Estimate minutes remaining for machine now, based on the last refresh."""
+
+        if (
+            self.data is None
+            or not (machine := self.data.machines.get(machine_id))
+            or not machine.busy
+            or self.last_refreshed_at is None
+        ):
+            return 0
+
+        elapsed: timedelta = dt_util.utcnow() - self.last_refreshed_at
+
+        return max(0.0, (machine.minutes_remaining or 0) - elapsed.total_seconds() / 60)
+
+    async def _async_update_data(self) -> RoomSnapshot:
+        """Fetch machine status from CyclePay."""
+
+        self.changed_contexts = set()
+
+        if not self.breaker.allow_request():
+            return self._serve_stale(None)
+
+        # Room status fetched by other accounts is reused unless the balance is due.
+        max_age = (
+            ROOM_SHARE_WINDOW
+            if self._balance_fetched_at is not None
+            and monotonic() - self._balance_fetched_at < BALANCE_REFRESH_INTERVAL
+            else 0
+        )
+
+        try:
+            # Setup defers login to here when restoring without a usable session.
+            if not self.logged_in:
+                await self.async_login()
+
+            if not self._fresh_login:
+                try:
+                    await self._async_refresh_laundry(max_age)
+                except (AuthenticationError, Rejected):
+                    if not self._session_restored:
+                        raise
+
+                    log.debug("Cached CyclePay session rejected. Logging in again.")
+
+                    await self.async_login()
+
+            self._fresh_login = False
+            self._session_restored = False
+        except (
+            asyncio.TimeoutError,
+            CommunicationError,
+            ResponseFormatError,
+            Rejected,
+        ) as err:
+            self.breaker.record_failure()
+            return self._serve_stale(err)
+        except AuthenticationError as err:
+            self.breaker.record_success()
+            raise ConfigEntryAuthFailed from err
+        except asyncio.CancelledError:
+            # Says nothing about CyclePay, but a half-open breaker's trial must be
+            # freed.
+            self.breaker.record_cancelled()
+            raise
+        except Exception:
+            # Settles a half-open breaker's trial request, which would otherwise block
+            # every later request.
+            self.breaker.record_failure()
+            raise
+
+        self.breaker.record_success()
+        self.stale = False
+
+        now = dt_util.utcnow()
+
+        snapshot = self._process_refreshed_data(now)
+        self.update_interval = self._compute_update_interval(now)
+
+        log.debug("Next CyclePay refresh in %s.", self.update_interval)
+
+        self.snapshot_store.async_schedule_save(self.laundry, self.session_issued_at)
+
+        self.topoff_prices.async_warm()
+
+        return snapshot
+
+    def _serve_stale(self, err: Exception | None) -> RoomSnapshot:
+        """Keep serving the last known snapshot while CyclePay can't be reached.
+
+        Raises UpdateFailed if there is no snapshot to serve.
+        """
+
+        if self.data is None:
+            raise UpdateFailed("Error communicating with API.") from err
+
+        if err is not None:
+            log.debug("Failed to refresh CyclePay: %s", err)
+
+        if not self.stale:
+            log.warning("Serving last known CyclePay state until CyclePay recovers.")
+
+        self.stale = True
+
+        # Sleep until the breaker allows a trial request instead of polling on the
+        # usual cadence.
+        if self.breaker.state is not BreakerState.CLOSED:
+            self.update_interval = max(
+                self.poll_min_interval, timedelta(seconds=self.breaker.retry_in)
+            )
+
+        data: RoomSnapshot = self.data
+
+        return data
+
+    def _process_refreshed_data(
+        self, now: datetime, machine_ids: set[str] | None = None
+    ) -> RoomSnapshot:
+        """Publish a new room snapshot and rebuild state derived from it.
+
+        If machine_ids is given, only those machines are taken from laundry. Others are
+        carried over from the current snapshot. Returns the new snapshot.
+        """
+
+        previous: RoomSnapshot | None = self.data
+        snapshot = RoomSnapshot.from_laundry(self.laundry, now, previous, machine_ids)
+
+        # Callers notify listeners once the rest of the refresh is done.
+        self.previous_data, self.data = previous, snapshot
+
+        self.last_refreshed_at = now
+        changed_machines = snapshot.changed_machines(previous)
+
+        self.availability = AvailabilityIndex.from_machines(snapshot.machines)
+        self.next_free.update(snapshot, changed_machines)
+        self.changed_contexts = self._diff_snapshots(
+            snapshot, previous, changed_machines, machine_ids
+        )
+        self.finish_scheduler.update(snapshot.machines, now)
+
+        if self._balance_fetched_at is not None:
+            self.balance_ledger.settle(self._balance_fetched_at)
+
+        return snapshot
+
+    def _compute_update_interval(self, now: datetime) -> timedelta:
+        """Determine polling interval from freshly refreshed machine state.
+
+        Refreshes at the next predicted cycle finish (or the recheck just after it)
+        while machines are running and doubles the interval while the room is idle.
+        Result is always clamped to the configured floor and ceiling.
+        """
+
+        floor = self.poll_min_interval
+        ceiling = self.poll_max_interval
+
+        if (next_refresh := self.finish_scheduler.next_refresh(now)) is None:
+            # Idle room. Back off exponentially.
+            interval = (self.update_interval or floor) * 2
+        else:
+            interval = next_refresh - now
+
+        return min(ceiling, max(floor, interval))
+
+    def _diff_snapshots(
+        self,
+        snapshot: RoomSnapshot,
+        previous: RoomSnapshot | None,
+        changed_machines: set[str],
+        machine_ids: set[str] | None = None,
+    ) -> set[Any]:
+        """Compare a new snapshot against the previous one.
+
+        Returns listener contexts whose data changed: changed_machines, machine types
+        whose availability counts changed, (machine type, CONTEXT_FORECAST) for changed
+        availability curves, (machine type, CONTEXT_NEXT_FREE) if the next machine to
+        free up changed, and CONTEXT_PROFILE if the card balance changed. Contexts
+        passed to async_mark_changed are included once their data has been refreshed.
+        """
+
+        changed = set(changed_machines)
+
+        if previous is None or snapshot.card_balance != previous.card_balance:
+            changed.add(CONTEXT_PROFILE)
+
+        fingerprints: dict[Any, tuple] = {}
+        availability = self.availability
+
+        for machine_type in availability.machine_types:
+            fingerprints[machine_type] = (
+                availability.total(machine_type),
+                *(
+                    availability.available_in(machine_type, offset)
+                    for offset in AVAILABILITY_OFFSETS
+                ),
+            )
+            fingerprints[(machine_type, CONTEXT_FORECAST)] = tuple(
+                availability.forecast(machine_type, FORECAST_HORIZON_MIN)
+            )
+            fingerprints[(machine_type, CONTEXT_NEXT_FREE)] = (
+                self.next_free.peek(machine_type),
+            )
+
+        changed.update(
+            context
+            for context, fingerprint in fingerprints.items()
+            if self._fingerprints.get(context) != fingerprint
+        )
+
+        self._fingerprints = fingerprints
+
+        # Machines skipped by a partial refresh stay forced until they're refreshed.
+        forced = {
+            context
+            for context in self._forced_contexts
+            if machine_ids is None
+            or context in machine_ids
+            or context not in snapshot.machines
+        }
+        self._forced_contexts -= forced
+
+        return changed | forced
@@ -0,0 +1,293 @@
+"""Diagnostics for the CyclePay integration."""
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.device_registry import DeviceEntry
+from pylaundry import MachineType
+
+from .const import (
+    CONTEXT_FORECAST,
+    CONTEXT_NEXT_FREE,
+    CONTEXT_PROFILE,
+    DOMAIN,
+    FORECAST_HORIZON_MIN,
+)
+from .coordinator import CyclePayCoordinator
+from .snapshot import MachineSnapshot, RoomSnapshot
+
+TO_REDACT = {
+    "auth_token",
+    "card_serial",
+    "database_id",
+    "first_request_id",
+    "installation_token",
+    "location_address",
+    "password",
+    "reader_serial",
+    "user_id",
+    "user_token",
+    "username",
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+
+    coordinator: CyclePayCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    return {
+        "entry": async_redact_data(
+            {"data": dict(entry.data), "options": dict(entry.options)}, TO_REDACT
+        ),
+        "snapshot": async_redact_data(_snapshot_diagnostics(coordinator), TO_REDACT),
+        "coordinator": _coordinator_diagnostics(coordinator),
+        "timings": _timing_diagnostics(coordinator),
+        "caches": _cache_diagnostics(coordinator),
+        "rate_limiter": _rate_limiter_diagnostics(coordinator),
+        "vends": _vend_diagnostics(coordinator),
+        "listeners": _listener_diagnostics(coordinator),
+        "entities": _entity_diagnostics(hass, entry),
+    }
+
+
+async def async_get_device_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry, device: DeviceEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a device, plus diagnostics for its config entry."""
+
+    coordinator: CyclePayCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    identifier = next(
+        (value for domain, value in device.identifiers if domain == DOMAIN), None
+    )
+
+    device_data: dict[str, Any] = {"identifier": identifier}
+
+    if (
+        isinstance(identifier, str)
+        and (machine := coordinator.data.machines.get(identifier)) is not None
+    ):
+        device_data["machine"] = async_redact_data(
+            _machine_diagnostics(machine), TO_REDACT
+        )
+        device_data["topoff_price_cached"] = (
+            coordinator.topoff_prices.get(machine) is not None
+        )
+        device_data["queued_vends"] = coordinator.vend_executor.queue_depths.get(
+            identifier, 0
+        )
+    elif identifier in {machine_type.value for machine_type in MachineType}:
+        machine_type = MachineType(identifier)
+        availability = coordinator.availability
+        device_data["availability"] = {
+            "total": availability.total(machine_type),
+            "online": availability.online(machine_type),
+            "busy": availability.busy(machine_type),
+            "soonest_free": availability.soonest_free(machine_type),
+            "price_range": availability.price_range(machine_type),
+            "forecast": availability.forecast(machine_type, FORECAST_HORIZON_MIN),
+        }
+        if next_free := coordinator.next_free.peek(machine_type):
+            device_data["next_free"] = {
+                "machine_id": next_free[0],
+                "finishes_at": next_free[1].isoformat(),
+            }
+
+    return {
+        "device": device_data,
+        **await async_get_config_entry_diagnostics(hass, entry),
+    }
+
+
+def _snapshot_diagnostics(coordinator: CyclePayCoordinator) -> dict[str, Any]:
+    """Return the room snapshot last published to entities."""
+
+    snapshot: RoomSnapshot = coordinator.data
+
+    return {
+        **snapshot._asdict(),
+        "machines": [
+            _machine_diagnostics(machine) for machine in snapshot.machines.values()
+        ],
+        "taken_at": snapshot.taken_at.isoformat(),
+        "session_issued_at": (
+            coordinator.session_issued_at.isoformat()
+            if coordinator.session_issued_at
+            else None
+        ),
+    }
+
+
+def _machine_diagnostics(machine: MachineSnapshot) -> dict[str, Any]:
+    """Return machine snapshot as a JSON-serializable dict."""
+
+    return {**machine._asdict(), "type": machine.type.value}
+
+
+def _coordinator_diagnostics(coordinator: CyclePayCoordinator) -> dict[str, Any]:
+    """Return refresh scheduling and health state."""
+
+    return {
+        "last_update_success": coordinator.last_update_success,
+        "last_refreshed_at": (
+            coordinator.last_refreshed_at.isoformat()
+            if coordinator.last_refreshed_at
+            else None
+        ),
+        "update_interval_s": (
+            coordinator.update_interval.total_seconds()
+            if coordinator.update_interval
+            else None
+        ),
+        "stale": coordinator.stale,
+        "breaker": {
+            "state": coordinator.breaker.state.value,
+            "consecutive_failures": coordinator.breaker.consecutive_failures,
+            "times_opened": coordinator.breaker.times_opened,
+            "retry_in_s": round(coordinator.breaker.retry_in, 1),
+        },
+        "pending_refresh_targets": len(coordinator.finish_scheduler),
+        "next_free_entries": len(coordinator.next_free),
+        "machines": len(coordinator.data.machines),
+        "machines_changed": len(
+            coordinator.data.changed_machines(coordinator.previous_data)
+        ),
+        # pylint: disable-next=protected-access
+        "fingerprints": len(coordinator._fingerprints),
+    }
+
+
+def _timing_diagnostics(coordinator: CyclePayCoordinator) -> dict[str, Any]:
+    """Return recent latency samples and percentiles per pipeline stage, in ms."""
+
+    timings: dict[str, Any] = {}
+
+    for stage, histogram in coordinator.metrics.stages.items():
+        p50, p95, p99 = histogram.percentiles(50, 95, 99)
+
+        timings[stage.value] = {
+            "count": histogram.count,
+            "failures": histogram.failures,
+            "p50_ms": _ms(p50),
+            "p95_ms": _ms(p95),
+            "p99_ms": _ms(p99),
+            "recent_ms": [_ms(seconds) for seconds in histogram.samples],
+        }
+
+    return timings
+
+
+def _cache_diagnostics(coordinator: CyclePayCoordinator) -> dict[str, Any]:
+    """Return hit rates for topoff prices and shared room status."""
+
+    topoff = coordinator.topoff_prices
+    room = coordinator.room
+
+    return {
+        "topoff_prices": {
+            "hits": topoff.hits,
+            "misses": topoff.misses,
+            "hit_rate": _rate(topoff.hits, topoff.misses),
+        },
+        "shared_room": (
+            {
+                "accounts": len(room),
+                "fetches": room.fetches,
+                "reuses": room.reuses,
+                "reuse_rate": _rate(room.reuses, room.fetches),
+            }
+            if room is not None
+            else None
+        ),
+    }
+
+
+def _rate_limiter_diagnostics(coordinator: CyclePayCoordinator) -> dict[str, Any]:
+    """Return domain-wide rate limiter state."""
+
+    limiter = coordinator.rate_limiter
+
+    return {
+        "queue_length": limiter.queue_length,
+        "priorities": {
+            priority.name.lower(): {
+                "acquired": stats.acquired,
+                "mean_wait_ms": _ms(stats.mean_wait),
+                "max_wait_ms": _ms(stats.max_wait),
+            }
+            for priority, stats in limiter.stats.items()
+        },
+    }
+
+
+def _vend_diagnostics(coordinator: CyclePayCoordinator) -> dict[str, Any]:
+    """Return vend executor and balance ledger state."""
+
+    executor = coordinator.vend_executor
+
+    return {
+        "completed": executor.stats.completed,
+        "failed": executor.stats.failed,
+        "timed_out": executor.stats.timed_out,
+        "max_queue_depth": executor.stats.max_queue_depth,
+        "in_flight": executor.in_flight,
+        "queue_depths": executor.queue_depths,
+        "reservations": len(coordinator.balance_ledger),
+        "reserved": coordinator.balance_ledger.reserved,
+    }
+
+
+def _listener_diagnostics(coordinator: CyclePayCoordinator) -> dict[str, int]:
+    """Return number of coordinator listeners by context kind."""
+
+    # pylint: disable=protected-access
+    counts: Counter[str] = Counter()
+
+    for _, context in coordinator._listeners.values():
+        if context is None:
+            counts["all_updates"] += 1
+        elif context == CONTEXT_PROFILE:
+            counts["profile"] += 1
+        elif isinstance(context, MachineType):
+            counts["machine_type"] += 1
+        elif isinstance(context, tuple) and CONTEXT_FORECAST in context:
+            counts["forecast"] += 1
+        elif isinstance(context, tuple) and CONTEXT_NEXT_FREE in context:
+            counts["next_free"] += 1
+        else:
+            counts["machine"] += 1
+
+    return dict(counts)
+
+
+def _entity_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return number of registered and disabled entities per platform."""
+
+    entities = er.async_entries_for_config_entry(er.async_get(hass), entry.entry_id)
+
+    return {
+        "total": dict(Counter(entity.domain for entity in entities)),
+        "disabled": dict(
+            Counter(entity.domain for entity in entities if entity.disabled)
+        ),
+    }
+
+
+def _ms(seconds: float | None) -> float | None:
+    """Convert seconds to rounded milliseconds."""
+
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+def _rate(hits: int, misses: int) -> float | None:
+    """Return hits as a fraction of all lookups."""
+
+    return round(hits / (hits + misses), 3) if hits + misses else None
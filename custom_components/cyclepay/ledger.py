@@ -0,0 +1,92 @@
+"""Local reservations against the cached card balance."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import logging
+from time import monotonic
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(eq=False)
+class Reservation:
+    """Funds held for a single vend."""
+
+    amount: float
+    committed_at: float | None = None
+
+
+class BalanceLedger:
+    """
+    Holds funds for in-flight vends so that concurrent presses can't overdraw the card.
+
+    Checking and reserving happen in one synchronous step, so two vends can never both
+    pass the balance check against the same cached balance. A reservation is released
+    if none of its swipes were sent. Otherwise, it's committed and held until CyclePay
+    reports a balance fetched after the vend.
+    """
+
+    def __init__(self) -> None:
+        """Initialize ledger."""
+
+        self._reservations: list[Reservation] = []
+
+    def __len__(self) -> int:
+        """Return number of outstanding reservations."""
+
+        return len(self._reservations)
+
+    @property
+    def reserved(self) -> float:
+        """Return total amount held by outstanding reservations."""
+
+        return sum(reservation.amount for reservation in self._reservations)
+
+    def available(self, balance: float | None) -> float:
+        """Return cached balance minus outstanding reservations."""
+
+        return (balance or 0) - self.reserved
+
+    def try_reserve(self, balance: float | None, amount: float) -> Reservation | None:
+        """Reserve amount against balance. Returns None if funds are insufficient."""
+
+        # Prices are in dollars and cents. Round away float noise before comparing.
+        if round(self.available(balance) - amount, 2) < 0:
+            return None
+
+        reservation = Reservation(amount=amount)
+        self._reservations.append(reservation)
+
+        return reservation
+
+    def release(self, reservation: Reservation) -> None:
+        """Drop reservation for a vend that wasn't sent."""
+
+        if reservation in self._reservations:
+            self._reservations.remove(reservation)
+
+    def commit(self, reservation: Reservation) -> None:
+        """Mark reservation as charged. It's held until the balance catches up."""
+
+        reservation.committed_at = monotonic()
+
+    def close(self, reservation: Reservation, swipes_sent: int) -> None:
+        """Commit reservation if any swipes were sent, otherwise release it.
+
+        A failed swipe doesn't undo earlier ones, so a partly sent vend is committed.
+        """
+
+        if swipes_sent:
+            self.commit(reservation)
+        else:
+            self.release(reservation)
+
+    def settle(self, fetched_at: float) -> None:
+        """Drop committed reservations reflected by a balance fetched at fetched_at."""
+
+        self._reservations = [
+            reservation
+            for reservation in self._reservations
+            if reservation.committed_at is None
+            or reservation.committed_at >= fetched_at
+        ]
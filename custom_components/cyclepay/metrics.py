@@ -0,0 +1,98 @@
+"""Latency and failure metrics for the refresh and vend pipeline."""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from enum import Enum
+import logging
+from time import perf_counter
+
+log = logging.getLogger(__name__)
+
+
+class Stage(str, Enum):
+    """Measured pipeline stage."""
+
+    LOGIN = "login"
+    REFRESH = "refresh"
+    TOPOFF = "topoff"
+    VEND = "vend"
+    FANOUT = "fanout"
+
+
+class RollingHistogram:
+    """Most recent latency samples for one stage, plus lifetime counters."""
+
+    def __init__(self, size: int) -> None:
+        """Initialize histogram."""
+
+        self._samples: deque[float] = deque(maxlen=size)
+
+        self.count = 0
+        self.failures = 0
+
+    @property
+    def samples(self) -> list[float]:
+        """Return retained samples in seconds, oldest first."""
+
+        return list(self._samples)
+
+    def record(self, seconds: float) -> None:
+        """Add a successful sample."""
+
+        self._samples.append(seconds)
+        self.count += 1
+
+    def record_failure(self) -> None:
+        """Count a failed attempt. Failures don't contribute latency samples."""
+
+        self.failures += 1
+
+    def percentiles(self, *percents: float) -> list[float | None]:
+        """Return nearest-rank percentiles of retained samples in seconds."""
+
+        if not self._samples:
+            return [None for _ in percents]
+
+        ordered = sorted(self._samples)
+        last = len(ordered) - 1
+
+        return [
+            ordered[min(last, int(percent / 100 * len(ordered)))]
+            for percent in percents
+        ]
+
+
+class PipelineMetrics:
+    """Rolling histograms for every pipeline stage of a config entry."""
+
+    def __init__(self, size: int) -> None:
+        """Initialize metrics."""
+
+        self.stages: dict[Stage, RollingHistogram] = {
+            stage: RollingHistogram(size) for stage in Stage
+        }
+
+    @contextmanager
+    def measure(self, stage: Stage) -> Iterator[None]:
+        """Time the enclosed block. Exceptions count as failures and are re-raised.
+
+        Cancelled blocks are neither timed nor counted as failures.
+        """
+
+        started_at = perf_counter()
+
+        try:
+            yield
+        except Exception:
+            self.stages[stage].record_failure()
+            raise
+
+        self.stages[stage].record(perf_counter() - started_at)
+
+    @property
+    def failures(self) -> int:
+        """Return failures across all stages."""
+
+        return sum(histogram.failures for histogram in self.stages.values())
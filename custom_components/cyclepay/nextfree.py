@@ -0,0 +1,118 @@
+"""Per-type queue of the machines that free up next."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+import heapq
+import logging
+from math import ceil
+
+from pylaundry import MachineType
+
+from .snapshot import MachineSnapshot, RoomSnapshot
+
+log = logging.getLogger(__name__)
+
+# Heaps are rebuilt once stale entries outnumber live ones by this much.
+COMPACT_SLACK = 64
+
+
+class NextFreeQueue:
+    """
+    Min-heaps of predicted finish times per machine type.
+
+    Only machines reported as changed by a refresh are pushed, so machines that keep
+    running unchanged keep the finish time predicted when they were last seen to change
+    and count down between polls. Idle machines finish at the refresh that saw them.
+    Offline machines are left out. Superseded entries are invalidated lazily.
+    """
+
+    def __init__(self) -> None:
+        """Initialize queue."""
+
+        self._heaps: dict[MachineType, list[tuple[datetime, int, str]]] = {}
+        # Live entry per machine: finish time, sequence number and machine type.
+        self._entries: dict[str, tuple[datetime, int, MachineType]] = {}
+        self._sequence = 0
+        self._machines: Mapping[str, MachineSnapshot] = {}
+
+    def __len__(self) -> int:
+        """Return number of heap entries, including stale ones."""
+
+        return sum(len(heap) for heap in self._heaps.values())
+
+    def update(self, snapshot: RoomSnapshot, changed: set[str]) -> None:
+        """Update finish times for machines that changed in snapshot."""
+
+        self._machines = machines = snapshot.machines
+
+        for machine_id in changed:
+            self._entries.pop(machine_id, None)
+
+            if (machine := machines.get(machine_id)) is None or not machine.online:
+                continue
+
+            finish = snapshot.taken_at
+
+            if machine.busy and machine.minutes_remaining:
+                finish += timedelta(minutes=machine.minutes_remaining)
+
+            self._sequence += 1
+            self._entries[machine_id] = (finish, self._sequence, machine.type)
+
+            heapq.heappush(
+                self._heaps.setdefault(machine.type, []),
+                (finish, self._sequence, machine_id),
+            )
+
+        if len(self) > 2 * len(self._entries) + COMPACT_SLACK:
+            self._compact()
+
+    def peek(self, machine_type: MachineType) -> tuple[str, datetime] | None:
+        """Return ID and predicted finish time of the next machine of type to free up.
+
+        Returns None if no machine of type is online.
+        """
+
+        heap = self._heaps.get(machine_type, [])
+
+        while heap:
+            finish, sequence, machine_id = heap[0]
+
+            # Machines removed from the room are never reported as changed.
+            if (
+                (entry := self._entries.get(machine_id))
+                and entry[1] == sequence
+                and machine_id in self._machines
+            ):
+                return machine_id, finish
+
+            heapq.heappop(heap)
+
+        return None
+
+    def minutes_until(self, machine_type: MachineType, now: datetime) -> int | None:
+        """Return whole minutes until the next machine of type frees up, rounded up."""
+
+        if (next_free := self.peek(machine_type)) is None:
+            return None
+
+        return max(0, ceil((next_free[1] - now).total_seconds() / 60))
+
+    def _compact(self) -> None:
+        """Rebuild heaps from live entries, dropping machines removed from the room."""
+
+        self._entries = {
+            machine_id: entry
+            for machine_id, entry in self._entries.items()
+            if machine_id in self._machines
+        }
+        self._heaps = {}
+
+        for machine_id, (finish, sequence, machine_type) in self._entries.items():
+            self._heaps.setdefault(machine_type, []).append(
+                (finish, sequence, machine_id)
+            )
+
+        for heap in self._heaps.values():
+            heapq.heapify(heap)
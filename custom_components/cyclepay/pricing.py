@@ -0,0 +1,193 @@
+"""Cache for dryer topoff prices."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import logging
+from time import monotonic
+
+import async_timeout
+from homeassistant.core import HomeAssistant
+from pylaundry import Laundry, LaundryMachine, MachineType
+from pylaundry.exceptions import (
+    AuthenticationError,
+    CommunicationError,
+    MachineOffline,
+    Rejected,
+    ResponseFormatError,
+    UnexpectedError,
+)
+
+from .const import DOMAIN, REQUEST_TIMEOUT
+from .metrics import PipelineMetrics, Stage
+from .ratelimit import Priority, RateLimiter
+from .snapshot import MachineSnapshot
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class TopoffPrice:
+    """Topoff data for a single dryer."""
+
+    data: dict
+    base_price: float | None
+    fetched_at: float
+
+
+class TopoffPriceCache:
+    """
+    Per-machine topoff price cache with a TTL.
+
+    Entries expire after ttl seconds or as soon as CyclePay reports a different base
+    price for the machine. The cache is warmed in the background after each refresh so
+    that button presses don't wait on a pricing fetch.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        laundry: Laundry,
+        rate_limiter: RateLimiter,
+        metrics: PipelineMetrics,
+        ttl: float,
+    ) -> None:
+        """Initialize cache."""
+
+        self._hass = hass
+        self._laundry = laundry
+        self._rate_limiter = rate_limiter
+        self._metrics = metrics
+        self._ttl = ttl
+        self._entries: dict[str, TopoffPrice] = {}
+        self._warm_task: asyncio.Task | None = None
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, machine: LaundryMachine | MachineSnapshot) -> dict | None:
+        """Return cached topoff data for machine if still valid."""
+
+        if (entry := self._entries.get(machine.id_)) is None:
+            return None
+
+        if (
+            monotonic() - entry.fetched_at >= self._ttl
+            or entry.base_price != machine.base_price
+        ):
+            del self._entries[machine.id_]
+            return None
+
+        return entry.data
+
+    async def async_get(self, machine_id: str) -> dict | None:
+        """Return topoff data for machine, fetching it on a cache miss.
+
+        Raises MachineOffline if the machine can't be reached by CyclePay and
+        asyncio.TimeoutError if CyclePay doesn't answer within REQUEST_TIMEOUT.
+        """
+
+        machine: LaundryMachine = self._laundry.machines[machine_id]
+
+        if (data := self.get(machine)) is not None:
+            self.hits += 1
+            return data
+
+        self.misses += 1
+
+        return await self._async_fetch(machine)
+
+    def async_warm(self) -> None:
+        """Fetch missing or expired dryer prices in the background."""
+
+        if self._warm_task and not self._warm_task.done():
+            return
+
+        stale = [
+            machine
+            for machine in self._laundry.machines.values()
+            if isinstance(machine, LaundryMachine)
+            and machine.type == MachineType.DRYER
+            and machine.online
+            and self.get(machine) is None
+        ]
+
+        if stale:
+            self._warm_task = self._hass.async_create_background_task(
+                self._async_warm(stale), f"{DOMAIN} topoff price warming"
+            )
+
+    def async_cancel(self) -> None:
+        """Cancel background warming."""
+
+        if self._warm_task:
+            self._warm_task.cancel()
+            self._warm_task = None
+
+    async def _async_warm(self, machines: list[LaundryMachine]) -> None:
+        """Fetch prices one machine at a time to avoid bursts of requests."""
+
+        for machine in machines:
+            try:
+                await self._async_fetch(machine)
+            except (
+                asyncio.TimeoutError,
+                AuthenticationError,
+                CommunicationError,
+                MachineOffline,
+                Rejected,
+                ResponseFormatError,
+                UnexpectedError,
+            ) as err:
+                log.debug(
+                    "Failed to prefetch topoff price for %s: %s", machine.id_, err
+                )
+
+    async def _async_fetch(self, machine: LaundryMachine) -> dict | None:
+        """Fetch topoff data from CyclePay and cache it."""
+
+        await self._rate_limiter.async_acquire(Priority.TOPOFF)
+
+        # Time spent waiting for a rate limiter token doesn't count against the request.
+        async with async_timeout.timeout(REQUEST_TIMEOUT):
+            with self._metrics.measure(Stage.TOPOFF):
+                response = await self._laundry.async_get_topoff_data(machine.id_)
+
+        data = response if isinstance(response, dict) else None
+
+        if data is None or not isinstance(data.get("price"), float):
+            # Don't cache unreliable topoff data.
+            self._entries.pop(machine.id_, None)
+            return data
+
+        if (previous := self._entries.get(machine.id_)) and previous.data != data:
+            log.debug("Topoff price for %s changed to %s.", machine.id_, data)
+
+        self._entries[machine.id_] = TopoffPrice(
+            data=data, base_price=machine.base_price, fetched_at=monotonic()
+        )
+
+        return data
+
+
+def vend_cost(
+    machine: MachineSnapshot, num_swipes: int, topoff_price: float | None
+) -> float | None:
+    """Return cost of swiping card through machine num_swipes times.
+
+    The first swipe of an idle machine starts a cycle at its base price. Every other
+    swipe tops off the running cycle. Returns None if a needed price is unknown.
+    """
+
+    if not isinstance(machine.base_price, float):
+        return None
+
+    start_price = 0.0 if machine.busy else machine.base_price
+
+    if (num_topoffs := num_swipes if machine.busy else num_swipes - 1) == 0:
+        return start_price
+
+    if not isinstance(topoff_price, float):
+        return None
+
+    return start_price + topoff_price * num_topoffs
@@ -0,0 +1,152 @@
+"""Domain-wide rate limiting of outbound CyclePay requests."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from enum import IntEnum
+import heapq
+import logging
+from time import monotonic
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_RATE_LIMITER, RATE_LIMIT_BURST, RATE_LIMIT_PER_SECOND
+
+log = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Request priority. Lower values are served first."""
+
+    VEND = 0
+    # Polls confirming a vend the user is waiting on.
+    CONFIRM = 1
+    LOGIN = 2
+    TOPOFF = 3
+    REFRESH = 4
+
+
+@dataclass
+class WaitStats:
+    """Wait time statistics for one priority."""
+
+    acquired: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def mean_wait(self) -> float:
+        """Return mean seconds waited for a token."""
+
+        return self.total_wait / self.acquired if self.acquired else 0.0
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every CyclePay request from every config entry.
+
+    Tokens refill at rate per second up to burst. Requests that can't get a token right
+    away queue by priority, so a vend waiting behind a backlog of refreshes is sent
+    first.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        """Initialize limiter."""
+
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated_at = monotonic()
+
+        self._waiters: list[tuple[Priority, int, asyncio.Future]] = []
+        self._sequence = 0
+        self._timer: asyncio.TimerHandle | None = None
+
+        self.stats: dict[Priority, WaitStats] = {
+            priority: WaitStats() for priority in Priority
+        }
+
+    @property
+    def queue_length(self) -> int:
+        """Return number of requests waiting for a token."""
+
+        return sum(not future.done() for _, _, future in self._waiters)
+
+    async def async_acquire(self, priority: Priority) -> None:
+        """Wait until a request of the given priority may be sent."""
+
+        started_at = monotonic()
+
+        self._refill()
+
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._sequence += 1
+            heapq.heappush(self._waiters, (priority, self._sequence, future))
+            self._schedule_dispatch()
+
+            await future
+
+        waited = monotonic() - started_at
+
+        stats = self.stats[priority]
+        stats.acquired += 1
+        stats.total_wait += waited
+        stats.max_wait = max(stats.max_wait, waited)
+
+        if waited >= 1:
+            log.debug("Waited %.1fs to send %s request.", waited, priority.name)
+
+    def _refill(self) -> None:
+        """Add tokens accrued since the last refill."""
+
+        now = monotonic()
+
+        self._tokens = min(
+            self._burst, self._tokens + (now - self._updated_at) * self._rate
+        )
+        self._updated_at = now
+
+    def _schedule_dispatch(self) -> None:
+        """Wake up when the next token is available."""
+
+        if self._timer is not None:
+            return
+
+        self._timer = asyncio.get_running_loop().call_later(
+            max(0, (1 - self._tokens) / self._rate), self._dispatch
+        )
+
+    @callback  # type: ignore
+    def _dispatch(self) -> None:
+        """Hand available tokens to the highest priority waiters."""
+
+        self._timer = None
+        self._refill()
+
+        while self._waiters and self._tokens >= 1:
+            _, _, future = heapq.heappop(self._waiters)
+
+            # Waiters that were cancelled don't consume a token.
+            if future.done():
+                continue
+
+            self._tokens -= 1
+            future.set_result(None)
+
+        if self._waiters:
+            self._schedule_dispatch()
+
+
+@callback  # type: ignore
+def async_get_rate_limiter(hass: HomeAssistant) -> RateLimiter:
+    """Return domain-wide rate limiter, creating it on first use."""
+
+    limiter: RateLimiter = hass.data.setdefault(
+        DATA_RATE_LIMITER,
+        RateLimiter(rate=RATE_LIMIT_PER_SECOND, burst=RATE_LIMIT_BURST),
+    )
+
+    return limiter
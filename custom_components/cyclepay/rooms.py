@@ -0,0 +1,190 @@
+"""Room status shared by CyclePay accounts in the same laundry room."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Coroutine
+import logging
+from time import monotonic
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from pylaundry import Laundry
+
+from .const import DATA_ROOMS, DOMAIN
+
+log = logging.getLogger(__name__)
+
+
+class SharedRoom:
+    """
+    Latest machine status for one laundry room, fanned out to every account in it.
+
+    CyclePay only returns room status together with an account's card balance, so
+    each fetch is made through one member account. Concurrent fetches join the one in
+    flight, and a fetch younger than the caller's max_age is reused outright.
+    """
+
+    def __init__(self, hass: HomeAssistant, location_id: str) -> None:
+        """Initialize room."""
+
+        self._hass = hass
+        self.location_id = location_id
+
+        self._members: dict[Laundry, Callable[[dict], None]] = {}
+        self._machines: dict | None = None
+        self._fetched_at: float | None = None
+        self._fetched_by: Laundry | None = None
+        self._inflight: asyncio.Task[None] | None = None
+
+        self.fetches = 0
+        self.reuses = 0
+
+    def __len__(self) -> int:
+        """Return number of member accounts."""
+
+        return len(self._members)
+
+    @callback  # type: ignore
+    def async_join(
+        self, laundry: Laundry, on_update: Callable[[dict], None]
+    ) -> CALLBACK_TYPE:
+        """Add account. on_update receives machines fetched by other members."""
+
+        self._members[laundry] = on_update
+
+        @callback  # type: ignore
+        def _async_leave() -> None:
+            self._members.pop(laundry, None)
+
+            if self._fetched_by is laundry:
+                self._fetched_by = None
+
+        return _async_leave
+
+    async def async_fetch(
+        self,
+        laundry: Laundry,
+        max_age: float,
+        fetch: Callable[[], Coroutine[Any, Any, None]],
+    ) -> bool:
+        """Bring laundry's machines up to date, calling fetch if data can't be reused.
+
+        fetch must refresh laundry from CyclePay. Returns True if it was called, in
+        which case laundry's card balance was refreshed as well.
+        """
+
+        # A fetch already in flight may predate whatever the caller is waiting for, so
+        # it's only joined if the caller accepts reused data.
+        if max_age > 0 and (inflight := self._inflight) is not None:
+            try:
+                await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+            except Exception:  # pylint: disable=broad-except
+                # The member that owns the fetch reports the error. Try on our own.
+                pass
+            else:
+                return self._reuse(laundry)
+
+        # An account's own last fetch is never reused. Its poll schedule already
+        # decided that the data is due.
+        if (
+            self._machines is not None
+            and self._fetched_at is not None
+            and self._fetched_by is not laundry
+            and monotonic() - self._fetched_at < max_age
+        ):
+            return self._reuse(laundry)
+
+        task: asyncio.Task[None] = self._hass.async_create_background_task(
+            self._async_fetch(laundry, fetch), f"{DOMAIN} room {self.location_id} fetch"
+        )
+
+        if self._inflight is None:
+            self._inflight = task
+
+        try:
+            await task
+        finally:
+            if self._inflight is task:
+                self._inflight = None
+
+        for member, on_update in list(self._members.items()):
+            if member is not laundry:
+                on_update(laundry.machines)
+
+        return True
+
+    async def _async_fetch(
+        self, laundry: Laundry, fetch: Callable[[], Coroutine[Any, Any, None]]
+    ) -> None:
+        """Fetch through laundry and record the result.
+
+        Recorded inside the task so that members joining the fetch never resume before
+        the shared machines are updated.
+        """
+
+        await fetch()
+
+        self.fetches += 1
+        self._machines = laundry.machines
+        self._fetched_at = monotonic()
+        self._fetched_by = laundry
+
+    def _reuse(self, laundry: Laundry) -> bool:
+        """Copy shared machines into laundry."""
+
+        self.reuses += 1
+
+        if laundry.machines is not self._machines:
+            laundry.machines = dict(self._machines or {})
+
+        return False
+
+
+class RoomRegistry:
+    """Domain-wide SharedRoom per CyclePay location."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize registry."""
+
+        self._hass = hass
+        self._rooms: dict[str, SharedRoom] = {}
+
+    @property
+    def rooms(self) -> list[SharedRoom]:
+        """Return rooms with at least one member account."""
+
+        return list(self._rooms.values())
+
+    @callback  # type: ignore
+    def async_join(
+        self, location_id: str, laundry: Laundry, on_update: Callable[[dict], None]
+    ) -> tuple[SharedRoom, CALLBACK_TYPE]:
+        """Add account to the room at location_id. Returns room and leave callback."""
+
+        room = self._rooms.setdefault(location_id, SharedRoom(self._hass, location_id))
+        leave_room = room.async_join(laundry, on_update)
+
+        log.debug(
+            "Joined CyclePay room %s. Accounts in room: %s.", location_id, len(room)
+        )
+
+        @callback  # type: ignore
+        def _async_leave() -> None:
+            leave_room()
+
+            if not room:
+                self._rooms.pop(location_id, None)
+
+        return room, _async_leave
+
+
+@callback  # type: ignore
+def async_get_room_registry(hass: HomeAssistant) -> RoomRegistry:
+    """Return domain-wide room registry, creating it on first use."""
+
+    registry: RoomRegistry = hass.data.setdefault(DATA_ROOMS, RoomRegistry(hass))
+
+    return registry
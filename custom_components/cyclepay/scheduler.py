@@ -0,0 +1,82 @@
+"""Predictive refresh scheduling based on machine finish times."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+import heapq
+import logging
+
+from .snapshot import MachineSnapshot
+
+log = logging.getLogger(__name__)
+
+
+class FinishTimeScheduler:
+    """
+    Min-heap of predicted cycle finish times across all machines.
+
+    Each running machine contributes two refresh targets: its predicted finish time and
+    a recheck shortly after, since CyclePay's reported state lags the machine. Entries
+    are invalidated lazily when a machine's prediction moves (e.g. after a topoff).
+    """
+
+    def __init__(self, recheck_delay: timedelta, tolerance: timedelta) -> None:
+        """Initialize scheduler."""
+
+        self._recheck_delay = recheck_delay
+        self._tolerance = tolerance
+
+        self._heap: list[tuple[datetime, int, str]] = []
+        self._predicted: dict[str, datetime] = {}
+        self._generation: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        """Return number of pending refresh targets, including stale entries."""
+
+        return len(self._heap)
+
+    def update(self, machines: Mapping[str, MachineSnapshot], now: datetime) -> None:
+        """Update predicted finish times from freshly refreshed machine state."""
+
+        running: set[str] = set()
+
+        for machine in machines.values():
+            if not machine.online or not machine.busy or not machine.minutes_remaining:
+                continue
+
+            running.add(machine.id_)
+
+            finish = now + timedelta(minutes=machine.minutes_remaining)
+
+            # minutes_remaining is rounded and drifts by up to a minute between polls.
+            if (predicted := self._predicted.get(machine.id_)) and abs(
+                finish - predicted
+            ) <= self._tolerance:
+                continue
+
+            generation = self._generation.get(machine.id_, 0) + 1
+            self._generation[machine.id_] = generation
+            self._predicted[machine.id_] = finish
+
+            heapq.heappush(self._heap, (finish, generation, machine.id_))
+            heapq.heappush(
+                self._heap, (finish + self._recheck_delay, generation, machine.id_)
+            )
+
+        # Machines that stopped running keep their pending recheck so that the flip to
+        # available is confirmed, but no longer hold a prediction.
+        for machine_id in set(self._predicted) - running:
+            del self._predicted[machine_id]
+
+    def next_refresh(self, now: datetime) -> datetime | None:
+        """Return the earliest pending refresh target after now."""
+
+        while self._heap:
+            when, generation, machine_id = self._heap[0]
+
+            if when > now and generation == self._generation.get(machine_id):
+                return when
+
+            heapq.heappop(self._heap)
+
+        return None
@@ -1,21 +1,39 @@
 """Binary sensor API entity."""
 from __future__ import annotations
 
+from datetime import datetime
 import logging
+from typing import Any
 
 from homeassistant import core
-from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import Event, HomeAssistant, callback
-from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import DeviceInfo, EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback, DiscoveryInfoType
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
+from pylaundry import MachineType
+
+from .const import (
+    AVAILABILITY_OFFSETS,
+    CONTEXT_FORECAST,
+    CONTEXT_NEXT_FREE,
+    CONTEXT_PROFILE,
+    DOMAIN,
+    FORECAST_HORIZON_MIN,
+    NEXT_FREE_TICK_INTERVAL,
+    SIGNAL_VEND_BEGIN,
 )
-from pylaundry import Laundry, LaundryMachine, LaundryProfile, MachineType
-
-from .const import DOMAIN, EVENT_VEND_BEGIN
+from .coordinator import CyclePayCoordinator
+from .metrics import Stage
+from .snapshot import MachineSnapshot, RoomSnapshot
 
 log = logging.getLogger(__name__)
 
@@ -27,22 +45,20 @@ async def async_setup_entry(
     discovery_info: DiscoveryInfoType | None = None,  # pylint: disable=unused-argument
 ) -> None:
     """Set up entities using the binary sensor platform from this config entry."""
-    coordinator: DataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator: CyclePayCoordinator = hass.data[DOMAIN][entry.entry_id]
 
     #
     # Minutes Remaining Sensor
     #
 
-    coordinator_data: Laundry = coordinator.data
+    snapshot: RoomSnapshot = coordinator.data
     async_add_entities(
         (
             MachineMinutesRemainingSensor(
-                coordinator=coordinator, machine_id=machine.id_, hass=hass
+                coordinator=coordinator, machine_id=machine_id
             )
-            for machine in coordinator_data.machines.values()
-            if isinstance(machine, LaundryMachine)
+            for machine_id in snapshot.machines
         ),
-        True,
     )
 
     #
@@ -59,7 +75,6 @@ async def async_setup_entry(
                 )
             ]
         ),
-        True,
     )
 
     #
@@ -76,15 +91,56 @@ async def async_setup_entry(
             )
             for machine_type in MachineType
             if machine_type != MachineType.UNKNOWN
-            for time_offset in [  # pylint: disable=consider-using-tuple
-                0,
-                15,
-                30,
-                45,
-                60,
-            ]
+            for time_offset in AVAILABILITY_OFFSETS
+        ),
+    )
+
+    #
+    # Availability Forecast
+    #
+
+    async_add_entities(
+        (
+            AvailabilityForecastSensor(
+                coordinator=coordinator,
+                config_id=entry.entry_id,
+                machine_type=machine_type,
+            )
+            for machine_type in MachineType
+            if machine_type != MachineType.UNKNOWN
         ),
-        True,
+    )
+
+    #
+    # Next Machine Free
+    #
+
+    async_add_entities(
+        (
+            NextMachineFreeSensor(
+                coordinator=coordinator,
+                config_id=entry.entry_id,
+                machine_type=machine_type,
+            )
+            for machine_type in MachineType
+            if machine_type != MachineType.UNKNOWN
+        ),
+    )
+
+    #
+    # Pipeline Diagnostics
+    #
+
+    async_add_entities(
+        [
+            *(
+                PipelineLatencySensor(
+                    coordinator=coordinator, config_id=entry.entry_id, stage=stage
+                )
+                for stage in Stage
+            ),
+            PipelineFailuresSensor(coordinator=coordinator, config_id=entry.entry_id),
+        ]
     )
 
 
@@ -95,39 +151,38 @@ class MachineMinutesRemainingSensor(SensorEntity, CoordinatorEntity):  # type: i
     # _attr_device_class = SensorDeviceClass.DURATION
     # _attr_native_unit_of_measurement = homeassistant.const.TIME_MINUTES
 
-    def __init__(
-        self, coordinator: DataUpdateCoordinator, machine_id: str, hass: HomeAssistant
-    ) -> None:
+    # Minutes remaining, None while offline, or "Vending" while a vend is sent.
+    _attr_native_value: int | str | None
+    _attr_native_unit_of_measurement: str | None
+    _attr_extra_state_attributes: dict[str, Any]
+
+    def __init__(self, coordinator: CyclePayCoordinator, machine_id: str) -> None:
         """Pass coordinator to CoordinatorEntity."""
-        super().__init__(coordinator=coordinator)
+        super().__init__(coordinator=coordinator, context=machine_id)
 
         self._machine_id = machine_id
 
-        self.laundry: Laundry = coordinator.data
-        self.machine: LaundryMachine = self.laundry.machines[machine_id]
+        snapshot: RoomSnapshot = coordinator.data
+        machine: MachineSnapshot = snapshot.machines[machine_id]
 
-        self._machine_type: MachineType = self.machine.type
+        self._machine_type: MachineType = machine.type
 
-        machine_type_str = str(self.machine.type.value).title()
+        machine_type_str = str(machine.type.value).title()
 
-        self._attr_unique_id = (
-            f"{self.laundry.profile.user_id}_{machine_id}_minutes_remaining"
-        )
+        self._attr_unique_id = f"{snapshot.user_id}_{machine_id}_minutes_remaining"
         self._attr_device_info: DeviceInfo | None = {
             "identifiers": {(DOMAIN, machine_id)},
-            "name": f"{machine_type_str} {self.machine.number}",
+            "name": f"{machine_type_str} {machine.number}",
             "suggested_area": "Laundry Room",
         }
 
         self._attr_extra_state_attributes = {
             "machine_type": machine_type_str,
-            "base_price": f"${self.machine.base_price:0,.2f}",
+            "base_price": f"${machine.base_price:0,.2f}",
             "running": None,
         }
 
-        self._attr_name = f"{machine_type_str} {self.machine.number}: Minutes Remaining"
-
-        hass.bus.async_listen(EVENT_VEND_BEGIN, self._trigger_vending_state)
+        self._attr_name = f"{machine_type_str} {machine.number}: Minutes Remaining"
 
         self.update_device_data()
 
@@ -136,16 +191,16 @@ class MachineMinutesRemainingSensor(SensorEntity, CoordinatorEntity):  # type: i
 
         self._attr_native_unit_of_measurement = "min"
 
-        machine: LaundryMachine = self.laundry.machines.get(self._machine_id)
+        machine: MachineSnapshot = self.coordinator.data.machines[self._machine_id]
 
-        if machine.online:
-            self._attr_native_value = (
-                machine.minutes_remaining if machine.minutes_remaining else 0
-            )
-        else:
-            self._attr_native_value = None
+        minutes: int | None = (
+            (machine.minutes_remaining or 0) if machine.online else None
+        )
+        self._attr_native_value = minutes
 
-        self._attr_extra_state_attributes.update({"running": machine.busy})
+        self._attr_extra_state_attributes.update(
+            {"running": machine.busy, "stale": self.coordinator.stale}
+        )
 
         if self._machine_type in [MachineType.WASHER, MachineType.DRYER]:
             icon_prefix = (
@@ -154,9 +209,9 @@ class MachineMinutesRemainingSensor(SensorEntity, CoordinatorEntity):  # type: i
                 else "tumble-dryer"
             )
 
-            if not machine.online:
+            if minutes is None:
                 self._attr_icon = f"mdi:{icon_prefix}-alert"
-            elif self._attr_native_value > 0:
+            elif minutes > 0:
                 self._attr_icon = f"mdi:{icon_prefix}"
             else:
                 self._attr_icon = f"mdi:{icon_prefix}-off"
@@ -165,6 +220,14 @@ class MachineMinutesRemainingSensor(SensorEntity, CoordinatorEntity):  # type: i
         """Register callbacks."""
         await super().async_added_to_hass()
 
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_VEND_BEGIN.format(self._machine_id),
+                self._trigger_vending_state,
+            )
+        )
+
         self.update_device_data()
 
     @callback  # type: ignore
@@ -175,16 +238,26 @@ class MachineMinutesRemainingSensor(SensorEntity, CoordinatorEntity):  # type: i
 
         self.async_write_ha_state()
 
+    async def async_update(self) -> None:
+        """Refresh only this entity's machine when an update is requested."""
+
+        if not self.enabled:
+            return
+
+        await self.coordinator.async_refresh_machine(self._machine_id)
+
     @callback  # type: ignore
-    def _trigger_vending_state(self, event: Event) -> None:
-        if event.data.get("machine_id") != self._machine_id:
-            return None
+    def _trigger_vending_state(self) -> None:
+        """Show that this machine is being vended."""
 
-        self._attr_native_unit_of_measurement = ""
+        self._attr_native_unit_of_measurement = None
         self._attr_native_value = "Vending"
 
         self.async_write_ha_state()
 
+        # Revert from "Vending" on the next refresh even if the vend didn't go through.
+        self.coordinator.async_mark_changed(self._machine_id)
+
 
 class CardBalanceSensor(SensorEntity, CoordinatorEntity):  # type: ignore
     """Sensor showing whether a machine is in use."""
@@ -192,17 +265,13 @@ class CardBalanceSensor(SensorEntity, CoordinatorEntity):  # type: ignore
     _attr_device_class = SensorDeviceClass.MONETARY
     _attr_native_unit_of_measurement = "USD"
 
-    def __init__(
-        self, coordinator: DataUpdateCoordinator, username: str, config_id: str
-    ):
+    def __init__(self, coordinator: CyclePayCoordinator, username: str, config_id: str):
         """Pass coordinator to CoordinatorEntity."""
-        super().__init__(coordinator=coordinator)
+        super().__init__(coordinator=coordinator, context=CONTEXT_PROFILE)
 
-        self.laundry: Laundry = coordinator.data
+        snapshot: RoomSnapshot = coordinator.data
 
-        self._attr_unique_id = (
-            f"{self.laundry.profile.user_id}_{username}_laundry_card_balance"
-        )
+        self._attr_unique_id = f"{snapshot.user_id}_{username}_laundry_card_balance"
 
         self._attr_device_info: DeviceInfo | None = {
             "identifiers": {(DOMAIN, config_id)},
@@ -215,11 +284,11 @@ class CardBalanceSensor(SensorEntity, CoordinatorEntity):  # type: ignore
     def update_device_data(self) -> None:
         """Update the entity when coordinator is updated."""
 
-        profile: LaundryProfile = self.laundry.profile
+        card_balance = self.coordinator.data.card_balance
 
-        self._attr_native_value = (
-            0 if not profile.card_balance else profile.card_balance
-        )
+        self._attr_native_value = 0 if not card_balance else card_balance
+
+        self._attr_extra_state_attributes = {"stale": self.coordinator.stale}
 
         self._attr_icon = "mdi:credit-card-chip-outline"
 
@@ -248,15 +317,13 @@ class AvailableMachines(SensorEntity, CoordinatorEntity):  # type: ignore
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator,
+        coordinator: CyclePayCoordinator,
         machine_type: MachineType,
         config_id: str,
         time_offset: int = 0,
     ):
         """Pass coordinator to CoordinatorEntity."""
-        super().__init__(coordinator=coordinator)
-
-        self.laundry: Laundry = coordinator.data
+        super().__init__(coordinator=coordinator, context=machine_type)
 
         self._machine_type = machine_type
         self._time_offset = time_offset
@@ -274,16 +341,10 @@ class AvailableMachines(SensorEntity, CoordinatorEntity):  # type: ignore
     def update_device_data(self) -> None:
         """Update the entity when coordinator is updated."""
 
-        machines = self.laundry.machines
+        availability = self.coordinator.availability
 
-        self._attr_native_value = len(
-            [
-                machine
-                for machine in machines.values()
-                if isinstance(machine, LaundryMachine)
-                and machine.type == self._machine_type
-                and machine.minutes_remaining <= self._time_offset
-            ]
+        self._attr_native_value = availability.available_in(
+            self._machine_type, self._time_offset
         )
 
         icon_prefix = (
@@ -297,14 +358,7 @@ class AvailableMachines(SensorEntity, CoordinatorEntity):  # type: ignore
         else:
             self._attr_icon = f"mdi:{icon_prefix}-off"
 
-        total_machines_in_room = len(
-            [
-                machines
-                for machine in machines.values()
-                if isinstance(machine, LaundryMachine)
-                and machine.type == self._machine_type
-            ]
-        )
+        total_machines_in_room = availability.total(self._machine_type)
 
         self._attr_extra_state_attributes = {
             "as_percent": (
@@ -313,6 +367,7 @@ class AvailableMachines(SensorEntity, CoordinatorEntity):  # type: ignore
             f"total_{self._machine_type.value.lower()}s_in_laundry_room": (
                 total_machines_in_room
             ),
+            "stale": self.coordinator.stale,
         }
 
     async def async_added_to_hass(self) -> None:
@@ -342,7 +397,7 @@ class AvailableMachines(SensorEntity, CoordinatorEntity):  # type: ignore
 
         if unique_id:
             return (
-                f"{self.laundry.profile.user_id}_{base_return_str}_{time_descriptor}".lower().replace(
+                f"{self.coordinator.data.user_id}_{base_return_str}_{time_descriptor}".lower().replace(
                     " ", "_"
                 )
             )
@@ -352,3 +407,297 @@ class AvailableMachines(SensorEntity, CoordinatorEntity):  # type: ignore
             if self._time_offset == 0
             else f"{base_return_str}utes".title()
         )
+
+
+class AvailabilityForecastSensor(SensorEntity, CoordinatorEntity):  # type: ignore
+    """
+    Sensor showing machine availability over the next two hours.
+
+    State is the number of machines of a specific type available now. The
+    "forecast" attribute holds the number available in 0, 1, 2, ... minutes.
+    """
+
+    _attr_native_unit_of_measurement = "machines"
+
+    def __init__(
+        self,
+        coordinator: CyclePayCoordinator,
+        machine_type: MachineType,
+        config_id: str,
+    ):
+        """Pass coordinator to CoordinatorEntity."""
+        super().__init__(
+            coordinator=coordinator, context=(machine_type, CONTEXT_FORECAST)
+        )
+
+        snapshot: RoomSnapshot = coordinator.data
+
+        self._machine_type = machine_type
+
+        machine_type_str = str(machine_type.value).lower()
+
+        self._attr_unique_id = (
+            f"{snapshot.user_id}_{machine_type_str}s_availability_forecast"
+        )
+
+        self._attr_device_info: DeviceInfo | None = {
+            "identifiers": {(DOMAIN, machine_type.value)},
+        }
+
+        self._attr_name = f"{machine_type_str}s Availability Forecast".title()
+
+        self._attr_icon = (
+            "mdi:washing-machine"
+            if machine_type == MachineType.WASHER
+            else "mdi:tumble-dryer"
+        )
+
+        self.update_device_data()
+
+    def update_device_data(self) -> None:
+        """Update the entity when coordinator is updated."""
+
+        forecast = self.coordinator.availability.forecast(
+            self._machine_type, FORECAST_HORIZON_MIN
+        )
+
+        self._attr_native_value = forecast[0]
+
+        self._attr_extra_state_attributes = {
+            "forecast": forecast,
+            f"total_{self._machine_type.value.lower()}s_in_laundry_room": (
+                self.coordinator.availability.total(self._machine_type)
+            ),
+            "stale": self.coordinator.stale,
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Register callbacks."""
+        await super().async_added_to_hass()
+
+        self.update_device_data()
+
+    @callback  # type: ignore
+    def _handle_coordinator_update(self) -> None:
+        """Update the entity with new REST API data."""
+
+        self.update_device_data()
+
+        self.async_write_ha_state()
+
+
+class NextMachineFreeSensor(SensorEntity, CoordinatorEntity):  # type: ignore
+    """
+    Sensor showing minutes until the next machine of a specific type frees up.
+
+    State is 0 while an online machine is free. Counts down locally between refreshes
+    using finish times predicted by the coordinator, without contacting CyclePay.
+    """
+
+    _attr_native_unit_of_measurement = "min"
+
+    def __init__(
+        self,
+        coordinator: CyclePayCoordinator,
+        machine_type: MachineType,
+        config_id: str,
+    ):
+        """Pass coordinator to CoordinatorEntity."""
+        super().__init__(
+            coordinator=coordinator, context=(machine_type, CONTEXT_NEXT_FREE)
+        )
+
+        snapshot: RoomSnapshot = coordinator.data
+
+        self._machine_type = machine_type
+
+        machine_type_str = str(machine_type.value).lower()
+
+        self._attr_unique_id = f"{snapshot.user_id}_{machine_type_str}s_next_free"
+
+        self._attr_device_info: DeviceInfo | None = {
+            "identifiers": {(DOMAIN, machine_type.value)},
+        }
+
+        self._attr_name = f"{machine_type_str}s Next Free".title()
+
+        self.update_device_data()
+
+    def update_device_data(self) -> None:
+        """Update the entity when coordinator is updated or the countdown ticks."""
+
+        next_free = self.coordinator.next_free
+
+        self._attr_native_value = next_free.minutes_until(
+            self._machine_type, dt_util.utcnow()
+        )
+
+        machine: MachineSnapshot | None = None
+        finishes_at: datetime | None = None
+
+        if peeked := next_free.peek(self._machine_type):
+            machine_id, finishes_at = peeked
+            machine = self.coordinator.data.machines.get(machine_id)
+
+        icon_prefix = (
+            "washing-machine"
+            if self._machine_type == MachineType.WASHER
+            else "tumble-dryer"
+        )
+
+        if self._attr_native_value == 0:
+            self._attr_icon = f"mdi:{icon_prefix}"
+        else:
+            self._attr_icon = f"mdi:{icon_prefix}-off"
+
+        self._attr_extra_state_attributes = {
+            "machine_id": machine.id_ if machine else None,
+            "machine": (
+                f"{str(machine.type.value).title()} {machine.number}"
+                if machine
+                else None
+            ),
+            "finishes_at": finishes_at.isoformat() if finishes_at else None,
+            "stale": self.coordinator.stale,
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Register callbacks."""
+        await super().async_added_to_hass()
+
+        self.async_on_remove(
+            async_track_time_interval(
+                self.hass, self._async_tick, NEXT_FREE_TICK_INTERVAL
+            )
+        )
+
+        self.update_device_data()
+
+    @callback  # type: ignore
+    def _handle_coordinator_update(self) -> None:
+        """Update the entity with new REST API data."""
+
+        self.update_device_data()
+
+        self.async_write_ha_state()
+
+    @callback  # type: ignore
+    def _async_tick(self, _: datetime) -> None:
+        """Count down between refreshes. Writes state only if the minutes changed."""
+
+        previous_value = self._attr_native_value
+
+        self.update_device_data()
+
+        if self._attr_native_value != previous_value:
+            self.async_write_ha_state()
+
+
+class PipelineLatencySensor(SensorEntity, CoordinatorEntity):  # type: ignore
+    """
+    Diagnostic sensor showing latency of one refresh or vend pipeline stage.
+
+    State is the 95th percentile over recent samples. Time spent waiting on the rate
+    limiter isn't included, so this reflects CyclePay's response time (or, for fan-out,
+    the time spent updating entities).
+    """
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = "ms"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_icon = "mdi:timer-outline"
+
+    def __init__(self, coordinator: CyclePayCoordinator, config_id: str, stage: Stage):
+        """Pass coordinator to CoordinatorEntity."""
+        super().__init__(coordinator=coordinator)
+
+        snapshot: RoomSnapshot = coordinator.data
+
+        self._stage = stage
+
+        self._attr_unique_id = f"{snapshot.user_id}_{stage.value}_latency"
+
+        self._attr_device_info: DeviceInfo | None = {
+            "identifiers": {(DOMAIN, config_id)},
+        }
+
+        stage_str = "Fan-out" if stage == Stage.FANOUT else stage.value.title()
+        self._attr_name = f"Laundry Card: {stage_str} Latency"
+
+        self.update_device_data()
+
+    def update_device_data(self) -> None:
+        """Update the entity when coordinator is updated."""
+
+        histogram = self.coordinator.metrics.stages[self._stage]
+
+        p50, p95, p99 = (
+            None if seconds is None else round(seconds * 1000, 1)
+            for seconds in histogram.percentiles(50, 95, 99)
+        )
+
+        self._attr_native_value = p95
+
+        self._attr_extra_state_attributes = {
+            "p50": p50,
+            "p95": p95,
+            "p99": p99,
+            "samples": len(histogram.samples),
+            "count": histogram.count,
+            "failures": histogram.failures,
+        }
+
+    @callback  # type: ignore
+    def _handle_coordinator_update(self) -> None:
+        """Update the entity with new REST API data."""
+
+        self.update_device_data()
+
+        self.async_write_ha_state()
+
+
+class PipelineFailuresSensor(SensorEntity, CoordinatorEntity):  # type: ignore
+    """Diagnostic sensor counting failed CyclePay requests and entity updates."""
+
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_icon = "mdi:alert-circle-outline"
+
+    def __init__(self, coordinator: CyclePayCoordinator, config_id: str):
+        """Pass coordinator to CoordinatorEntity."""
+        super().__init__(coordinator=coordinator)
+
+        snapshot: RoomSnapshot = coordinator.data
+
+        self._attr_unique_id = f"{snapshot.user_id}_pipeline_failures"
+
+        self._attr_device_info: DeviceInfo | None = {
+            "identifiers": {(DOMAIN, config_id)},
+        }
+
+        self._attr_name = "Laundry Card: Request Failures"
+
+        self.update_device_data()
+
+    def update_device_data(self) -> None:
+        """Update the entity when coordinator is updated."""
+
+        metrics = self.coordinator.metrics
+
+        self._attr_native_value = metrics.failures
+
+        self._attr_extra_state_attributes = {
+            stage.value: histogram.failures
+            for stage, histogram in metrics.stages.items()
+        }
+
+    @callback  # type: ignore
+    def _handle_coordinator_update(self) -> None:
+        """Update the entity with new REST API data."""
+
+        self.update_device_data()
+
+        self.async_write_ha_state()
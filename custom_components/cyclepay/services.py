@@ -0,0 +1,238 @@
+"""Services for the CyclePay integration."""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+from pylaundry import MachineOffline, MachineType
+from pylaundry.exceptions import (
+    AuthenticationError,
+    CommunicationError,
+    NotLoggedIn,
+    Rejected,
+    ResponseFormatError,
+    UnexpectedError,
+)
+import voluptuous as vol
+
+from .const import DOMAIN, VEND_REQUEST_TIMEOUT
+from .coordinator import CyclePayCoordinator
+from .pricing import vend_cost
+from .snapshot import MachineSnapshot, RoomSnapshot
+
+log = logging.getLogger(__name__)
+
+SERVICE_VEND = "vend"
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_MACHINES = "machines"
+ATTR_MACHINE_ID = "machine_id"
+ATTR_SWIPES = "swipes"
+
+VEND_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_MACHINES): vol.All(
+            cv.ensure_list,
+            vol.Length(min=1),
+            [
+                {
+                    vol.Required(ATTR_MACHINE_ID): cv.string,
+                    vol.Optional(ATTR_SWIPES, default=1): vol.All(
+                        vol.Coerce(int), vol.Range(min=1)
+                    ),
+                }
+            ],
+        ),
+    }
+)
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register CyclePay services."""
+
+    if hass.services.has_service(DOMAIN, SERVICE_VEND):
+        return
+
+    async def async_handle_vend(call: ServiceCall) -> None:
+        """Vend several machines with one balance check and one confirmation."""
+
+        swipes: dict[str, int] = {}
+
+        for item in call.data[ATTR_MACHINES]:
+            if item[ATTR_MACHINE_ID] in swipes:
+                raise ServiceValidationError(
+                    f"Machine {item[ATTR_MACHINE_ID]} is listed more than once."
+                )
+            swipes[item[ATTR_MACHINE_ID]] = item[ATTR_SWIPES]
+
+        coordinator = _find_coordinator(
+            hass, set(swipes), call.data.get(ATTR_CONFIG_ENTRY_ID)
+        )
+
+        await async_vend_machines(coordinator, swipes)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_VEND, async_handle_vend, schema=VEND_SCHEMA
+    )
+
+
+def async_unload_services(hass: HomeAssistant) -> None:
+    """Remove CyclePay services once the last config entry is unloaded."""
+
+    if not hass.data.get(DOMAIN):
+        hass.services.async_remove(DOMAIN, SERVICE_VEND)
+
+
+def _find_coordinator(
+    hass: HomeAssistant, machine_ids: set[str], entry_id: str | None
+) -> CyclePayCoordinator:
+    """Return coordinator for the account that can vend all machines."""
+
+    coordinators: dict[str, CyclePayCoordinator] = hass.data.get(DOMAIN, {})
+
+    if entry_id is not None:
+        if (coordinator := coordinators.get(entry_id)) is None:
+            raise ServiceValidationError(f"CyclePay account {entry_id} is not loaded.")
+        candidates = [coordinator]
+    else:
+        candidates = list(coordinators.values())
+
+    for coordinator in candidates:
+        if machine_ids <= coordinator.data.machines.keys():
+            return coordinator
+
+    raise ServiceValidationError(
+        f"No CyclePay account has access to all of {', '.join(sorted(machine_ids))}."
+    )
+
+
+async def async_vend_machines(
+    coordinator: CyclePayCoordinator, swipes: dict[str, int]
+) -> None:
+    """Check funds for all vends at once, vend concurrently, then refresh once."""
+
+    snapshot: RoomSnapshot = coordinator.data
+    machines: dict[str, MachineSnapshot] = {
+        machine_id: snapshot.machines[machine_id] for machine_id in swipes
+    }
+
+    for machine_id, machine in machines.items():
+        if swipes[machine_id] > 1 and machine.type is not MachineType.DRYER:
+            raise ServiceValidationError(
+                f"Cannot topoff {_describe(machine)} because it is not a dryer."
+            )
+
+    # Topoffs only exist for dryers. Prices are usually served from cache.
+    dryer_ids = [
+        machine_id
+        for machine_id, machine in machines.items()
+        if machine.type == MachineType.DRYER
+    ]
+
+    try:
+        topoff_data = dict(
+            zip(
+                dryer_ids,
+                await asyncio.gather(
+                    *(
+                        coordinator.topoff_prices.async_get(machine_id)
+                        for machine_id in dryer_ids
+                    )
+                ),
+            )
+        )
+    except MachineOffline as err:
+        raise VendError("Cannot vend. A dryer is not connected to CyclePay.") from err
+    except (
+        asyncio.TimeoutError,
+        AuthenticationError,
+        CommunicationError,
+        NotLoggedIn,
+        Rejected,
+        ResponseFormatError,
+        UnexpectedError,
+    ) as err:
+        raise VendError(
+            f"Cannot vend. Failed to load topoff prices from CyclePay: {err}"
+        ) from err
+
+    total_cost = 0.0
+
+    for machine_id, machine in machines.items():
+        data = topoff_data.get(machine_id)
+
+        if (
+            cost := vend_cost(
+                machine, swipes[machine_id], data.get("price") if data else None
+            )
+        ) is None:
+            raise VendError(
+                "Cannot determine whether sufficient funds are available to vend"
+                f" {_describe(machine)} because cycle price could not be loaded."
+            )
+
+        total_cost += cost
+
+    ledger = coordinator.balance_ledger
+    card_balance = snapshot.card_balance
+
+    if (reservation := ledger.try_reserve(card_balance, total_cost)) is None:
+        raise VendError(
+            f"Card balance of ${ledger.available(card_balance):.2f} (after pending"
+            f" vends) is insufficient for the requested ${total_cost:.2f} payment."
+        )
+
+    requests = {
+        machine_id: coordinator.vend_executor.async_submit(
+            machine_id, num_swipes, timeout=VEND_REQUEST_TIMEOUT
+        )
+        for machine_id, num_swipes in swipes.items()
+    }
+
+    try:
+        results = await asyncio.gather(
+            *(request.future for request in requests.values()),
+            return_exceptions=True,
+        )
+    finally:
+        # One reservation covers every machine. It's held if any swipe went out.
+        ledger.close(
+            reservation, sum(request.swipes_sent for request in requests.values())
+        )
+
+    failed: dict[str, BaseException] = {
+        machine_id: result
+        for machine_id, result in zip(swipes, results)
+        if isinstance(result, BaseException)
+    }
+
+    if succeeded := set(swipes) - set(failed):
+        await coordinator.async_confirm_vends(succeeded, also_publish=set(failed))
+    else:
+        for machine_id in failed:
+            coordinator.async_mark_changed(machine_id)
+        await coordinator.async_refresh()
+
+    for machine_id, failure in failed.items():
+        log.error("Failed to vend %s: %s", machine_id, failure)
+
+    if failed:
+        # CyclePay errors are wrapped so callers see which machines failed.
+        raise VendError(
+            "Failed to vend"
+            f" {', '.join(_describe(machines[machine_id]) for machine_id in failed)}."
+        ) from next(iter(failed.values()))
+
+
+def _describe(machine: MachineSnapshot) -> str:
+    """Return user-facing machine name."""
+
+    return f"{machine.type.name.title()} {machine.number}"
+
+
+class VendError(HomeAssistantError):  # type: ignore
+    """Error to indicate that CyclePay couldn't vend the requested machines."""
@@ -0,0 +1,122 @@
+"""Immutable snapshots of laundry room state published to entities."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from datetime import datetime
+import logging
+from types import MappingProxyType
+from typing import NamedTuple
+
+from pylaundry import Laundry, LaundryMachine, MachineType
+
+log = logging.getLogger(__name__)
+
+
+class MachineSnapshot(NamedTuple):
+    """State of a single washer or dryer at a refresh."""
+
+    id_: str
+    type: MachineType
+    number: str
+    busy: bool | None
+    minutes_remaining: int | None
+    base_price: float | None
+    topoff_price: float | None
+    online: bool | None
+    reader_serial: str | None
+
+    @classmethod
+    def from_machine(cls, machine: LaundryMachine) -> MachineSnapshot:
+        """Copy state from a pylaundry machine."""
+
+        # Positional arguments. Called for every machine on every refresh.
+        return cls(
+            machine.id_,
+            machine.type,
+            machine.number,
+            machine.busy,
+            machine.minutes_remaining,
+            machine.base_price,
+            machine.topoff_price,
+            machine.online,
+            machine.reader_serial,
+        )
+
+
+class RoomSnapshot(NamedTuple):
+    """
+    Room status and card balance published by the coordinator after a refresh.
+
+    pylaundry updates its Laundry object in place while requests are in flight, so
+    entities read from snapshots instead and never see a half-updated room.
+    """
+
+    user_id: str
+    location_id: str
+    card_balance: float | None
+    machines: Mapping[str, MachineSnapshot]
+    taken_at: datetime
+
+    @classmethod
+    def from_laundry(
+        cls,
+        laundry: Laundry,
+        taken_at: datetime,
+        previous: RoomSnapshot | None = None,
+        machine_ids: set[str] | None = None,
+    ) -> RoomSnapshot:
+        """
+        Build snapshot from laundry's current state.
+
+        Machines that didn't change since previous reuse previous's tuples, so changes
+        can be found by identity. If machine_ids is given, other machines are carried
+        over from previous as they were.
+        """
+
+        previous_machines = previous.machines if previous else {}
+
+        machines: dict[str, MachineSnapshot]
+
+        if machine_ids is None or previous is None:
+            machines = {}
+            source = laundry.machines.values()
+        else:
+            machines = dict(previous_machines)
+            source = [
+                machine
+                for machine_id in machine_ids
+                if (machine := laundry.machines.get(machine_id))
+            ]
+
+        for machine in source:
+            if not isinstance(machine, LaundryMachine):
+                continue
+
+            snapshot = MachineSnapshot.from_machine(machine)
+
+            if (unchanged := previous_machines.get(machine.id_)) == snapshot:
+                snapshot = unchanged
+
+            machines[machine.id_] = snapshot
+
+        return cls(
+            user_id=laundry.profile.user_id,
+            location_id=laundry.profile.location_id,
+            card_balance=laundry.profile.card_balance,
+            machines=MappingProxyType(machines),
+            taken_at=taken_at,
+        )
+
+    def changed_machines(self, previous: RoomSnapshot | None) -> set[str]:
+        """Return IDs of machines whose state differs from previous."""
+
+        if previous is None:
+            return set(self.machines)
+
+        previous_machines = previous.machines
+
+        return {
+            machine_id
+            for machine_id, machine in self.machines.items()
+            if previous_machines.get(machine_id) is not machine
+        }
@@ -0,0 +1,156 @@
+"""Persistence of the last known CyclePay state across restarts."""
+from __future__ import annotations
+
+from dataclasses import asdict
+from datetime import datetime, timedelta
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from pylaundry import Laundry, LaundryMachine, LaundryProfile, MachineType
+
+from .const import DOMAIN, SNAPSHOT_SAVE_DELAY, STORAGE_VERSION
+
+log = logging.getLogger(__name__)
+
+
+class SnapshotStore:
+    """Stores the last good snapshot and session token for a config entry."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize store."""
+
+        self._store: Store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
+        self._data: dict[str, Any] | None = None
+
+    async def async_restore(self, laundry: Laundry) -> bool:
+        """Load last snapshot into laundry. Returns False if no usable snapshot exists."""
+
+        if not (data := await self._store.async_load()):
+            return False
+
+        try:
+            restore_snapshot(laundry, data)
+        except (KeyError, TypeError, ValueError):
+            log.warning("Ignoring unreadable CyclePay snapshot.")
+            return False
+
+        self._data = data
+
+        log.debug("Restored CyclePay snapshot saved at %s.", data["saved_at"])
+
+        return True
+
+    def restore_session(self, laundry: Laundry, max_age: timedelta) -> datetime | None:
+        """Load cached session token into laundry if it is younger than max_age.
+
+        Must be called after async_restore(). Returns time the session was issued.
+        """
+
+        if not self._data or not (session := self._data.get("session")):
+            return None
+
+        try:
+            issued_at = restore_session(laundry, session, max_age)
+        except (KeyError, TypeError):
+            log.warning("Ignoring unreadable CyclePay session.")
+            return None
+
+        return issued_at
+
+    @callback  # type: ignore
+    def async_schedule_save(
+        self, laundry: Laundry, session_issued_at: datetime | None
+    ) -> None:
+        """Save snapshot of laundry after a short delay, coalescing rapid updates."""
+
+        self._store.async_delay_save(
+            lambda: serialize_snapshot(laundry, session_issued_at), SNAPSHOT_SAVE_DELAY
+        )
+
+    async def async_remove(self) -> None:
+        """Delete stored snapshot."""
+
+        await self._store.async_remove()
+
+
+def serialize_snapshot(
+    laundry: Laundry, session_issued_at: datetime | None
+) -> dict[str, Any]:
+    """Convert laundry state and session to JSON-serializable dict."""
+
+    # pylaundry doesn't expose its session. pylint: disable=protected-access
+    return {
+        "saved_at": dt_util.utcnow().isoformat(),
+        "profile": asdict(laundry.profile),
+        "machines": [
+            {**asdict(machine), "type": machine.type.value}
+            for machine in laundry.machines.values()
+            if isinstance(machine, LaundryMachine)
+        ],
+        "session": (
+            {
+                "auth_token": laundry._auth_token,
+                "first_request_id": laundry._first_request_id,
+                "installation_token": laundry.installation_token,
+                "issued_at": session_issued_at.isoformat(),
+            }
+            if session_issued_at
+            else None
+        ),
+    }
+
+
+def restore_snapshot(laundry: Laundry, data: dict[str, Any]) -> None:
+    """Populate laundry profile and machines from a serialized snapshot."""
+
+    # Machines keep running while Home Assistant is down. Age minutes remaining the same
+    # way pylaundry ages server-reported state.
+    snapshot_age_min = (
+        dt_util.utcnow() - dt_util.parse_datetime(data["saved_at"])
+    ).total_seconds() / 60
+
+    machines: dict[str, LaundryMachine] = {}
+
+    for machine_data in data["machines"]:
+        minutes_remaining = max(
+            0, round((machine_data["minutes_remaining"] or 0) - snapshot_age_min)
+        )
+
+        machines[machine_data["id_"]] = LaundryMachine(
+            **{
+                **machine_data,
+                "type": MachineType(machine_data["type"]),
+                "busy": minutes_remaining > 0,
+                "minutes_remaining": minutes_remaining,
+            }
+        )
+
+    laundry.profile = LaundryProfile(**data["profile"])
+    laundry.machines = machines
+
+
+def restore_session(
+    laundry: Laundry, session: dict[str, Any], max_age: timedelta
+) -> datetime | None:
+    """Populate laundry session from a serialized snapshot unless it has expired."""
+
+    auth_token, issued_at_str = session["auth_token"], session["issued_at"]
+
+    if not isinstance(auth_token, str) or not isinstance(issued_at_str, str):
+        raise TypeError("Session token and issue time must be strings.")
+
+    issued_at: datetime | None = dt_util.parse_datetime(issued_at_str)
+
+    if issued_at is None or dt_util.utcnow() - issued_at >= max_age:
+        log.debug("Cached CyclePay session issued at %s has expired.", issued_at_str)
+        return None
+
+    # pylaundry doesn't expose its session. pylint: disable=protected-access
+    laundry._auth_token = auth_token
+    laundry._first_request_id = session["first_request_id"]
+    laundry.installation_token = session["installation_token"]
+
+    return issued_at
@@ -0,0 +1,205 @@
+"""Serialized, concurrent execution of vend requests."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+import logging
+
+import async_timeout
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from pylaundry import Laundry
+
+from .const import DOMAIN, SIGNAL_VEND_BEGIN
+from .metrics import PipelineMetrics, Stage
+from .ratelimit import Priority, RateLimiter
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class VendRequest:
+    """Request to swipe the virtual card through a machine one or more times."""
+
+    machine_id: str
+    num_swipes: int
+    deadline: float
+    future: asyncio.Future = field(repr=False)
+    # Swipes sent to CyclePay so far. Each one may have charged the card.
+    swipes_sent: int = 0
+
+
+@dataclass
+class VendStats:
+    """Counters describing vend executor activity."""
+
+    completed: int = 0
+    failed: int = 0
+    timed_out: int = 0
+    max_queue_depth: int = 0
+
+
+class VendExecutor:
+    """
+    Runs vends with one serialized queue per machine and a bounded worker pool.
+
+    Swipes for the same machine never interleave, while vends for different machines
+    run concurrently up to max_concurrency. Requests that can't finish before their
+    deadline fail with asyncio.TimeoutError.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        laundry: Laundry,
+        rate_limiter: RateLimiter,
+        metrics: PipelineMetrics,
+        max_concurrency: int,
+    ) -> None:
+        """Initialize executor."""
+
+        self._hass = hass
+        self._laundry = laundry
+        self._rate_limiter = rate_limiter
+        self._metrics = metrics
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+        self._queues: dict[str, asyncio.Queue[VendRequest]] = {}
+        self._workers: dict[str, asyncio.Task] = {}
+        self._in_flight: set[str] = set()
+
+        self.stats = VendStats()
+
+    @property
+    def queue_depths(self) -> dict[str, int]:
+        """Return number of waiting and running requests per machine."""
+
+        return {
+            machine_id: queue.qsize() + (machine_id in self._in_flight)
+            for machine_id, queue in self._queues.items()
+            if queue.qsize() or machine_id in self._in_flight
+        }
+
+    @property
+    def in_flight(self) -> int:
+        """Return number of machines currently being vended."""
+
+        return len(self._in_flight)
+
+    @callback  # type: ignore
+    def async_submit(
+        self, machine_id: str, num_swipes: int, timeout: float
+    ) -> VendRequest:
+        """Queue swipes for machine. The request's future resolves once they're sent.
+
+        Cancelling the future stops swipes that haven't been sent yet.
+        """
+
+        loop = asyncio.get_running_loop()
+
+        request = VendRequest(
+            machine_id=machine_id,
+            num_swipes=num_swipes,
+            deadline=loop.time() + timeout,
+            future=loop.create_future(),
+        )
+
+        queue = self._queues.setdefault(machine_id, asyncio.Queue())
+        queue.put_nowait(request)
+
+        self.stats.max_queue_depth = max(self.stats.max_queue_depth, queue.qsize())
+
+        if machine_id not in self._workers:
+            self._workers[machine_id] = self._hass.async_create_background_task(
+                self._async_work(machine_id), f"{DOMAIN} vend worker {machine_id}"
+            )
+
+        return request
+
+    def async_cancel(self) -> None:
+        """Cancel all workers and fail pending requests."""
+
+        for worker in self._workers.values():
+            worker.cancel()
+
+        for queue in self._queues.values():
+            while not queue.empty():
+                if not (request := queue.get_nowait()).future.done():
+                    request.future.cancel()
+
+        self._workers.clear()
+        self._queues.clear()
+        self._in_flight.clear()
+
+    async def _async_work(self, machine_id: str) -> None:
+        """Process requests for a single machine until its queue is empty."""
+
+        queue = self._queues[machine_id]
+        loop = asyncio.get_running_loop()
+
+        try:
+            while not queue.empty():
+                request = queue.get_nowait()
+
+                # The caller stopped waiting before the vend started.
+                if request.future.done():
+                    continue
+
+                try:
+                    async with self._semaphore:
+                        if (remaining := request.deadline - loop.time()) <= 0:
+                            raise asyncio.TimeoutError
+
+                        self._in_flight.add(machine_id)
+
+                        async with async_timeout.timeout(remaining):
+                            await self._async_swipe(request)
+                except asyncio.CancelledError:
+                    request.future.cancel()
+                    raise
+                except asyncio.TimeoutError as err:
+                    self.stats.timed_out += 1
+                    log.error("Timed out vending machine %s.", machine_id)
+                    _resolve(request.future, err)
+                except Exception as err:  # pylint: disable=broad-except
+                    self.stats.failed += 1
+                    _resolve(request.future, err)
+                else:
+                    self.stats.completed += 1
+                    _resolve(request.future, None)
+                finally:
+                    self._in_flight.discard(machine_id)
+        finally:
+            self._workers.pop(machine_id, None)
+
+    async def _async_swipe(self, request: VendRequest) -> None:
+        """Swipe card through machine the requested number of times."""
+
+        for _ in range(request.num_swipes):
+            # Ensures that the machine state doesn't update while we're vending.
+            async_dispatcher_send(
+                self._hass, SIGNAL_VEND_BEGIN.format(request.machine_id)
+            )
+
+            await self._rate_limiter.async_acquire(Priority.VEND)
+
+            # The caller gave up while this swipe waited for a token.
+            if request.future.done():
+                return
+
+            request.swipes_sent += 1
+
+            with self._metrics.measure(Stage.VEND):
+                await self._laundry.async_vend(request.machine_id)
+
+
+def _resolve(future: asyncio.Future, err: Exception | None) -> None:
+    """Set vend result unless the caller already cancelled the future."""
+
+    if future.done():
+        return
+
+    if err is None:
+        future.set_result(None)
+    else:
+        future.set_exception(err)
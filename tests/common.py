@@ -0,0 +1,132 @@
+"""Helpers for CyclePay tests."""
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+from pylaundry import LaundryMachine, LaundryProfile, MachineType
+from pylaundry.const import EMPTY_AUTH_TOKEN
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.cyclepay.const import DOMAIN
+from custom_components.cyclepay.coordinator import CyclePayCoordinator
+
+USER_INPUT = {"username": "user@example.com", "password": "password"}
+
+
+class FakeLaundry:
+    """
+    Stand-in for pylaundry's Laundry serving a scripted laundry room.
+
+    Machines m0, m2, ... are washers and m1, m3, ... are dryers. Requests are recorded
+    in calls. Set an exception in errors to make the next matching request raise it.
+    """
+
+    num_machines = 4
+
+    def __init__(self, session: Any = None) -> None:
+        """Initialize laundry room with every machine idle."""
+
+        self._auth_token = EMPTY_AUTH_TOKEN
+        self._first_request_id: str | None = None
+        self.installation_token = "installation"
+
+        self.calls: list[tuple[str, ...]] = []
+        self.errors: dict[str, BaseException] = {}
+        self.minutes_remaining: dict[str, int] = {}
+        self.topoff_price: float | None = 0.25
+        self.blocked: asyncio.Event | None = None
+
+        self.profile = LaundryProfile(
+            "1 Main St", 10.0, "user", "user-token", "location", "db", "card"
+        )
+        self.machines: dict[str, LaundryMachine] = {}
+        self._build()
+
+    def _build(self) -> None:
+        """Rebuild machines from minutes_remaining."""
+
+        self.machines = {}
+
+        for index in range(self.num_machines):
+            machine_id = f"m{index}"
+            minutes = self.minutes_remaining.get(machine_id, 0)
+
+            self.machines[machine_id] = LaundryMachine(
+                machine_id,
+                MachineType.WASHER if index % 2 == 0 else MachineType.DRYER,
+                str(index),
+                minutes > 0,
+                minutes,
+                1.5,
+                None,
+                None,
+                True,
+                f"reader{index}",
+            )
+
+    async def _async_request(self, name: str, *args: str) -> None:
+        """Record request and raise the scripted error for it, if any."""
+
+        self.calls.append((name, *args))
+
+        if self.blocked is not None:
+            await self.blocked.wait()
+
+        if (err := self.errors.pop(name, None)) is not None:
+            raise err
+
+    async def async_login(self, username: str, password: str) -> None:
+        """Log in."""
+
+        await self._async_request("login")
+
+        self._auth_token = "token"
+        self._build()
+
+    async def async_refresh(self) -> None:
+        """Refresh room status."""
+
+        await self._async_request("refresh")
+
+        self._build()
+
+    async def async_get_topoff_data(self, machine_id: str) -> dict | None:
+        """Return topoff price for dryer."""
+
+        await self._async_request("topoff", machine_id)
+
+        return {"price": self.topoff_price, "time": 5}
+
+    async def async_vend(self, machine_id: str) -> None:
+        """Swipe card through machine."""
+
+        await self._async_request("vend", machine_id)
+
+        self.minutes_remaining[machine_id] = (
+            self.minutes_remaining.get(machine_id, 0) + 30
+        )
+
+    def count(self, name: str) -> int:
+        """Return number of requests made by name."""
+
+        return sum(call[0] == name for call in self.calls)
+
+
+async def async_setup_integration(
+    hass: HomeAssistant, options: dict[str, Any] | None = None
+) -> tuple[MockConfigEntry, CyclePayCoordinator]:
+    """Set up a config entry backed by a FakeLaundry."""
+
+    entry = MockConfigEntry(domain=DOMAIN, data=USER_INPUT, options=options or {})
+    entry.add_to_hass(hass)
+
+    with patch("custom_components.cyclepay.Laundry", FakeLaundry):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    coordinator: CyclePayCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    return entry, coordinator
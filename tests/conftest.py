@@ -0,0 +1,14 @@
+"""Fixtures for CyclePay tests."""
+from __future__ import annotations
+
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations: Any) -> Iterator[None]:
+    """Enable custom integrations in every test."""
+
+    yield
@@ -0,0 +1,132 @@
+"""Tests for the machine availability index."""
+from __future__ import annotations
+
+from pylaundry import MachineType
+
+from custom_components.cyclepay.availability import AvailabilityIndex
+from custom_components.cyclepay.snapshot import MachineSnapshot
+
+
+def _machine(
+    machine_id: str,
+    machine_type: MachineType,
+    minutes: int | None,
+    online: bool = True,
+    base_price: float | None = 1.5,
+) -> MachineSnapshot:
+    """Return machine snapshot, busy if minutes is positive."""
+
+    return MachineSnapshot(
+        id_=machine_id,
+        type=machine_type,
+        number=machine_id,
+        busy=bool(minutes),
+        minutes_remaining=minutes,
+        base_price=base_price,
+        topoff_price=None,
+        online=online,
+        reader_serial=None,
+    )
+
+
+def _index(*machines: MachineSnapshot) -> AvailabilityIndex:
+    """Return index over machines."""
+
+    return AvailabilityIndex.from_machines(
+        {machine.id_: machine for machine in machines}
+    )
+
+
+ROOM = _index(
+    _machine("w1", MachineType.WASHER, 0),
+    _machine("w2", MachineType.WASHER, 25),
+    _machine("w3", MachineType.WASHER, 5, online=False),
+    _machine("d1", MachineType.DRYER, 40, base_price=1.25),
+    _machine("d2", MachineType.DRYER, 10, base_price=2.0),
+    _machine("d3", MachineType.DRYER, None, base_price=None),
+)
+
+
+def test_counts_per_type() -> None:
+    """Test totals, online and busy counts per machine type."""
+
+    assert ROOM.machine_types == [MachineType.WASHER, MachineType.DRYER]
+
+    assert ROOM.total(MachineType.WASHER) == 3
+    assert ROOM.online(MachineType.WASHER) == 2
+    assert ROOM.busy(MachineType.WASHER) == 2
+
+    assert ROOM.total(MachineType.DRYER) == 3
+    assert ROOM.online(MachineType.DRYER) == 3
+    assert ROOM.busy(MachineType.DRYER) == 2
+
+
+def test_available_in() -> None:
+    """Test that machines count as available once their cycle finishes."""
+
+    assert ROOM.available_in(MachineType.WASHER, 0) == 1
+    assert ROOM.available_in(MachineType.WASHER, 5) == 2
+    assert ROOM.available_in(MachineType.WASHER, 25) == 3
+
+    # Unknown minutes remaining count as free now.
+    assert ROOM.available_in(MachineType.DRYER, 0) == 1
+    assert ROOM.available_in(MachineType.DRYER, 39) == 2
+
+
+def test_soonest_free_skips_offline() -> None:
+    """Test that the first online machine to finish is returned."""
+
+    room = _index(
+        _machine("w1", MachineType.WASHER, 3, online=False),
+        _machine("w2", MachineType.WASHER, 12),
+    )
+
+    assert room.soonest_free(MachineType.WASHER) == ("w2", 12)
+    assert room.soonest_free(MachineType.DRYER) is None
+
+
+def test_price_range_ignores_unknown() -> None:
+    """Test that unknown base prices are left out of the price range."""
+
+    assert ROOM.price_range(MachineType.DRYER) == (1.25, 2.0)
+    assert (
+        _index(_machine("d", MachineType.DRYER, 0, base_price=None)).price_range(
+            MachineType.DRYER
+        )
+        is None
+    )
+
+
+def test_empty_room() -> None:
+    """Test queries against a room without machines."""
+
+    room = _index()
+
+    assert not room.machine_types
+    assert room.total(MachineType.WASHER) == 0
+    assert room.available_in(MachineType.WASHER, 60) == 0
+    assert room.price_range(MachineType.WASHER) is None
+
+
+def test_forecast_curve() -> None:
+    """Test that item i of the forecast counts machines free in i minutes."""
+
+    curve = ROOM.forecast(MachineType.WASHER, 30)
+
+    assert len(curve) == 31
+    assert curve[0] == 1
+    assert curve[4] == 1
+    assert curve[5] == 2
+    assert curve[24] == 2
+    assert curve[25:] == [3] * 6
+
+
+def test_forecast_cached_per_horizon() -> None:
+    """Test that a curve is computed once per index and horizon."""
+
+    room = _index(_machine("d1", MachineType.DRYER, 10))
+
+    assert room.forecast(MachineType.DRYER, 5) is room.forecast(MachineType.DRYER, 5)
+    assert room.forecast(MachineType.DRYER, 5) == [0] * 6
+    assert room.forecast(MachineType.DRYER, 10)[-1] == 1
+    assert room.forecast(MachineType.WASHER, 3) == [0] * 4
@@ -0,0 +1,153 @@
+"""Tests for the CyclePay circuit breaker."""
+from __future__ import annotations
+
+from collections.abc import Iterator
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.cyclepay.breaker import BreakerState, CircuitBreaker
+
+
+class Clock:
+    """Monotonic clock advanced by hand."""
+
+    def __init__(self) -> None:
+        """Initialize clock."""
+
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        """Return current time."""
+
+        return self.now
+
+
+@pytest.fixture(name="clock")
+def clock_fixture() -> Iterator[Clock]:
+    """Patch the breaker's clock and remove jitter from its delays."""
+
+    clock = Clock()
+
+    with patch("custom_components.cyclepay.breaker.monotonic", clock), patch(
+        "custom_components.cyclepay.breaker.random.uniform", return_value=1.0
+    ):
+        yield clock
+
+
+def _open_breaker(breaker: CircuitBreaker) -> None:
+    """Fail requests until the breaker opens."""
+
+    while breaker.state is BreakerState.CLOSED:
+        assert breaker.allow_request()
+        breaker.record_failure()
+
+
+def test_opens_after_threshold(clock: Clock) -> None:
+    """Test that the breaker opens after consecutive failures."""
+
+    breaker = CircuitBreaker(failure_threshold=3, base_delay=10, max_delay=100)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state is BreakerState.CLOSED
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state is BreakerState.OPEN
+    assert not breaker.allow_request()
+    assert breaker.retry_in == 10
+    assert breaker.times_opened == 1
+
+
+def test_success_resets_failure_count(clock: Clock) -> None:
+    """Test that failures must be consecutive to open the breaker."""
+
+    breaker = CircuitBreaker(failure_threshold=2, base_delay=10, max_delay=100)
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state is BreakerState.CLOSED
+    assert breaker.consecutive_failures == 1
+
+
+def test_half_open_allows_single_trial(clock: Clock) -> None:
+    """Test that only one request is let through once the delay passes."""
+
+    breaker = CircuitBreaker(failure_threshold=1, base_delay=10, max_delay=100)
+    _open_breaker(breaker)
+
+    clock.now += 9.9
+    assert breaker.state is BreakerState.OPEN
+
+    clock.now += 0.1
+    assert breaker.state is BreakerState.HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+
+def test_trial_success_closes(clock: Clock) -> None:
+    """Test open -> half open -> closed."""
+
+    breaker = CircuitBreaker(failure_threshold=1, base_delay=10, max_delay=100)
+    _open_breaker(breaker)
+
+    clock.now += 10
+    assert breaker.allow_request()
+    breaker.record_success()
+
+    assert breaker.state is BreakerState.CLOSED
+    assert breaker.consecutive_failures == 0
+    assert breaker.allow_request()
+    assert breaker.allow_request()
+
+
+def test_trial_failure_reopens_with_backoff(clock: Clock) -> None:
+    """Test that each failed trial doubles the delay, up to max_delay."""
+
+    breaker = CircuitBreaker(failure_threshold=1, base_delay=10, max_delay=30)
+    _open_breaker(breaker)
+
+    delays = []
+
+    for _ in range(3):
+        clock.now += breaker.retry_in
+        assert breaker.allow_request()
+        breaker.record_failure()
+
+        assert breaker.state is BreakerState.OPEN
+        delays.append(breaker.retry_in)
+
+    assert delays == [20, 30, 30]
+    assert breaker.times_opened == 4
+
+
+def test_failure_settles_trial(clock: Clock) -> None:
+    """Test that a failed trial doesn't leave the breaker waiting on it."""
+
+    breaker = CircuitBreaker(failure_threshold=1, base_delay=10, max_delay=100)
+    _open_breaker(breaker)
+
+    clock.now += 10
+    assert breaker.allow_request()
+    breaker.record_failure()
+
+    clock.now += breaker.retry_in
+    assert breaker.allow_request()
+
+
+def test_cancelled_trial_freed(clock: Clock) -> None:
+    """Test that a cancelled trial allows another without counting as a failure."""
+
+    breaker = CircuitBreaker(failure_threshold=1, base_delay=10, max_delay=100)
+    _open_breaker(breaker)
+
+    clock.now += 10
+    assert breaker.allow_request()
+    breaker.record_cancelled()
+
+    assert breaker.state is BreakerState.HALF_OPEN
+    assert breaker.consecutive_failures == 1
+    assert breaker.allow_request()
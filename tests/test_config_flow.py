@@ -0,0 +1,48 @@
+"""Tests for the CyclePay config and options flows."""
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.cyclepay.const import (
+    DOMAIN,
+    OPT_FULL_LOAD,
+    OPT_POLL_MAX_INTERVAL,
+    OPT_POLL_MIN_INTERVAL,
+)
+
+
+async def test_options_saved(hass: HomeAssistant) -> None:
+    """Test that valid polling intervals are saved."""
+
+    entry = MockConfigEntry(domain=DOMAIN, data={"username": "u", "password": "p"})
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    assert result["type"] == FlowResultType.FORM
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {OPT_FULL_LOAD: 7, OPT_POLL_MIN_INTERVAL: 30, OPT_POLL_MAX_INTERVAL: 30},
+    )
+
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    assert entry.options[OPT_POLL_MAX_INTERVAL] == 30
+
+
+async def test_max_interval_below_min_rejected(hass: HomeAssistant) -> None:
+    """Test that a maximum polling interval below the minimum is rejected."""
+
+    entry = MockConfigEntry(domain=DOMAIN, data={"username": "u", "password": "p"})
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {OPT_FULL_LOAD: 0, OPT_POLL_MIN_INTERVAL: 600, OPT_POLL_MAX_INTERVAL: 60},
+    )
+
+    assert result["type"] == FlowResultType.FORM
+    assert result["errors"] == {OPT_POLL_MAX_INTERVAL: "max_interval_below_min"}
+    assert not entry.options
@@ -0,0 +1,119 @@
+"""Tests for the CyclePay coordinator."""
+from __future__ import annotations
+
+import asyncio
+from time import monotonic
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+from pylaundry.exceptions import CommunicationError
+import pytest
+
+from custom_components.cyclepay.breaker import BreakerState
+from custom_components.cyclepay.const import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_MAX_DELAY,
+)
+from custom_components.cyclepay.ratelimit import Priority
+
+from .common import async_setup_integration
+
+
+async def test_confirm_vend(hass: HomeAssistant) -> None:
+    """Test that a vend is confirmed once the machine shows the added time."""
+
+    entry, coordinator = await async_setup_integration(hass)
+    laundry = coordinator.laundry
+
+    with patch("custom_components.cyclepay.coordinator.VEND_CONFIRM_INITIAL_DELAY", 0):
+        await laundry.async_vend("m1")
+        laundry.calls.clear()
+
+        assert await coordinator.async_confirm_vend("m1")
+
+    assert laundry.count("refresh") == 1
+    assert coordinator.data.machines["m1"].minutes_remaining == 30
+    # Confirmation polls are queued ahead of routine refreshes.
+    assert coordinator.rate_limiter.stats[Priority.CONFIRM].acquired == 1
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_unconfirmed_vend_times_out(hass: HomeAssistant) -> None:
+    """Test that confirmation gives up if the machine never shows the vend."""
+
+    entry, coordinator = await async_setup_integration(hass)
+    laundry = coordinator.laundry
+
+    with patch(
+        "custom_components.cyclepay.coordinator.VEND_CONFIRM_INITIAL_DELAY", 0.01
+    ), patch("custom_components.cyclepay.coordinator.VEND_CONFIRM_TIMEOUT", 0.1):
+        laundry.calls.clear()
+
+        assert not await coordinator.async_confirm_vend("m1")
+
+    # Polls back off instead of hammering CyclePay for the whole timeout.
+    assert 1 <= laundry.count("refresh") <= 4
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_failures_serve_stale_until_recovery(hass: HomeAssistant) -> None:
+    """Test that failed refreshes keep the last snapshot and back off CyclePay."""
+
+    entry, coordinator = await async_setup_integration(hass)
+    laundry = coordinator.laundry
+    snapshot = coordinator.data
+
+    for _ in range(BREAKER_FAILURE_THRESHOLD):
+        laundry.errors["refresh"] = CommunicationError()
+        await coordinator.async_refresh()
+
+        assert coordinator.last_update_success
+        assert coordinator.stale
+        assert coordinator.data is snapshot
+
+    assert coordinator.breaker.state is BreakerState.OPEN
+    assert coordinator.update_interval.total_seconds() >= coordinator.breaker.retry_in
+
+    # No requests while the breaker is open.
+    laundry.calls.clear()
+    await coordinator.async_refresh()
+
+    assert laundry.count("refresh") == 0
+
+    with patch(
+        "custom_components.cyclepay.breaker.monotonic",
+        return_value=monotonic() + BREAKER_MAX_DELAY,
+    ):
+        await coordinator.async_refresh()
+
+    assert laundry.count("refresh") == 1
+    assert not coordinator.stale
+    assert coordinator.breaker.state is BreakerState.CLOSED
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_cancelled_refresh_not_a_failure(hass: HomeAssistant) -> None:
+    """Test that a refresh cancelled mid-request doesn't count against CyclePay."""
+
+    entry, coordinator = await async_setup_integration(hass)
+    laundry = coordinator.laundry
+    laundry.blocked = asyncio.Event()
+    laundry.calls.clear()
+
+    refresh = asyncio.create_task(coordinator.async_refresh())
+
+    while not laundry.count("refresh"):
+        await asyncio.sleep(0)
+
+    refresh.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await refresh
+
+    assert coordinator.breaker.consecutive_failures == 0
+
+    laundry.blocked = None
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,64 @@
+"""Tests for CyclePay diagnostics."""
+from __future__ import annotations
+
+from homeassistant.components.diagnostics import REDACTED
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+
+from custom_components.cyclepay.const import DOMAIN
+from custom_components.cyclepay.diagnostics import (
+    async_get_config_entry_diagnostics,
+    async_get_device_diagnostics,
+)
+
+from .common import async_setup_integration
+
+
+async def test_entry_diagnostics_from_published_snapshot(hass: HomeAssistant) -> None:
+    """Test that entry diagnostics show what entities see, with secrets redacted."""
+
+    entry, coordinator = await async_setup_integration(hass)
+
+    # Updated in place by pylaundry, but not yet published.
+    coordinator.laundry.machines.pop("m0")
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    snapshot = diagnostics["snapshot"]
+
+    assert diagnostics["entry"]["data"]["password"] == REDACTED
+    assert snapshot["user_id"] == REDACTED
+    assert snapshot["card_balance"] == 10.0
+    assert [machine["id_"] for machine in snapshot["machines"]] == [
+        "m0",
+        "m1",
+        "m2",
+        "m3",
+    ]
+    assert all(machine["reader_serial"] == REDACTED for machine in snapshot["machines"])
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_device_diagnostics(hass: HomeAssistant) -> None:
+    """Test diagnostics for machine devices and devices without a machine."""
+
+    entry, _ = await async_setup_integration(hass)
+    device_registry = dr.async_get(hass)
+
+    machine_device = device_registry.async_get_device(identifiers={(DOMAIN, "m1")})
+    assert machine_device is not None
+
+    device = (await async_get_device_diagnostics(hass, entry, machine_device))["device"]
+
+    assert device["machine"]["type"] == "Dryer"
+    assert device["queued_vends"] == 0
+
+    other_device = device_registry.async_get_or_create(
+        config_entry_id=entry.entry_id, identifiers={("other", "m1")}
+    )
+
+    device = (await async_get_device_diagnostics(hass, entry, other_device))["device"]
+
+    assert device == {"identifier": None}
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,68 @@
+"""Tests for CyclePay setup and unload."""
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.cyclepay.const import DOMAIN, STORAGE_VERSION
+from custom_components.cyclepay.store import serialize_snapshot
+
+from .common import USER_INPUT, FakeLaundry, async_setup_integration
+
+
+async def test_setup_and_unload(hass: HomeAssistant) -> None:
+    """Test that setup without a snapshot logs in and fetches the room."""
+
+    entry, coordinator = await async_setup_integration(hass)
+
+    assert entry.state is ConfigEntryState.LOADED
+    assert coordinator.laundry.calls[0] == ("login",)
+    assert hass.states.get("sensor.laundry_card_balance").state == "10.0"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    assert entry.state is ConfigEntryState.NOT_LOADED
+
+
+async def test_restored_setup_does_not_wait_for_refresh(
+    hass: HomeAssistant, hass_storage: dict[str, Any]
+) -> None:
+    """Test that entities are served from the snapshot while CyclePay is slow."""
+
+    entry = MockConfigEntry(domain=DOMAIN, data=USER_INPUT)
+    entry.add_to_hass(hass)
+
+    hass_storage[f"{DOMAIN}.{entry.entry_id}"] = {
+        "version": STORAGE_VERSION,
+        "key": f"{DOMAIN}.{entry.entry_id}",
+        "data": serialize_snapshot(FakeLaundry(), None),
+    }
+
+    class SlowLaundry(FakeLaundry):
+        """Laundry whose requests never finish."""
+
+        def __init__(self, session: Any = None) -> None:
+            """Initialize laundry with requests blocked."""
+
+            super().__init__(session)
+            self.blocked = asyncio.Event()
+
+    with patch("custom_components.cyclepay.Laundry", SlowLaundry):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+
+        # Returns while the first refresh is still waiting on CyclePay.
+        await asyncio.wait_for(hass.async_block_till_done(), 1)
+
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    assert entry.state is ConfigEntryState.LOADED
+    assert coordinator.laundry.count("login") == 1
+    assert coordinator.laundry.count("refresh") == 0
+    assert hass.states.get("sensor.laundry_card_balance").state == "10.0"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
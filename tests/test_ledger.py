@@ -0,0 +1,97 @@
+"""Tests for the balance ledger."""
+from __future__ import annotations
+
+from unittest.mock import patch
+
+from custom_components.cyclepay.ledger import BalanceLedger
+
+
+def test_reserve_holds_funds() -> None:
+    """Test that reservations reduce the available balance."""
+
+    ledger = BalanceLedger()
+
+    assert ledger.try_reserve(5.0, 3.0) is not None
+    assert ledger.available(5.0) == 2.0
+    assert ledger.try_reserve(5.0, 2.5) is None
+    assert ledger.try_reserve(5.0, 2.0) is not None
+    assert len(ledger) == 2
+    assert ledger.reserved == 5.0
+
+
+def test_reserve_ignores_float_noise() -> None:
+    """Test that an exact cents match isn't rejected by float rounding."""
+
+    ledger = BalanceLedger()
+
+    assert ledger.try_reserve(0.3, 0.1) is not None
+    assert ledger.try_reserve(0.3, 0.2) is not None
+
+
+def test_unknown_balance_counts_as_zero() -> None:
+    """Test that nothing can be reserved before the balance is known."""
+
+    ledger = BalanceLedger()
+
+    assert ledger.try_reserve(None, 0.25) is None
+    assert ledger.try_reserve(None, 0) is not None
+
+
+def test_release_frees_funds() -> None:
+    """Test that releasing a reservation returns its funds right away."""
+
+    ledger = BalanceLedger()
+    reservation = ledger.try_reserve(1.0, 1.0)
+    assert reservation is not None
+
+    ledger.release(reservation)
+    ledger.release(reservation)
+
+    assert len(ledger) == 0
+    assert ledger.available(1.0) == 1.0
+
+
+def test_committed_held_until_newer_balance() -> None:
+    """Test that committed funds are held until a balance fetched afterwards."""
+
+    ledger = BalanceLedger()
+    reservation = ledger.try_reserve(1.0, 1.0)
+    assert reservation is not None
+
+    with patch("custom_components.cyclepay.ledger.monotonic", return_value=100.0):
+        ledger.commit(reservation)
+
+    ledger.settle(fetched_at=99.0)
+    assert len(ledger) == 1
+
+    ledger.settle(fetched_at=100.0)
+    assert len(ledger) == 1
+
+    ledger.settle(fetched_at=100.5)
+    assert len(ledger) == 0
+
+
+def test_settle_keeps_uncommitted() -> None:
+    """Test that vends still in flight keep their funds when the balance updates."""
+
+    ledger = BalanceLedger()
+    assert ledger.try_reserve(1.0, 0.5) is not None
+
+    ledger.settle(fetched_at=float("inf"))
+
+    assert len(ledger) == 1
+
+
+def test_close_by_swipes_sent() -> None:
+    """Test that only reservations without sent swipes are released on close."""
+
+    ledger = BalanceLedger()
+    unsent = ledger.try_reserve(2.0, 1.0)
+    partly_sent = ledger.try_reserve(2.0, 1.0)
+    assert unsent is not None and partly_sent is not None
+
+    ledger.close(unsent, swipes_sent=0)
+    ledger.close(partly_sent, swipes_sent=1)
+
+    assert len(ledger) == 1
+    assert partly_sent.committed_at is not None
@@ -0,0 +1,47 @@
+"""Tests for pipeline metrics."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from custom_components.cyclepay.metrics import PipelineMetrics, Stage
+
+
+def test_measure_records_outcome() -> None:
+    """Test that successes add samples and errors count as failures."""
+
+    metrics = PipelineMetrics(10)
+
+    with metrics.measure(Stage.REFRESH):
+        pass
+
+    with pytest.raises(ValueError), metrics.measure(Stage.REFRESH):
+        raise ValueError
+
+    histogram = metrics.stages[Stage.REFRESH]
+
+    assert (histogram.count, histogram.failures) == (1, 1)
+    assert len(histogram.samples) == 1
+    assert metrics.failures == 1
+
+
+async def test_measure_ignores_cancellation() -> None:
+    """Test that a cancelled request is neither a sample nor a failure."""
+
+    metrics = PipelineMetrics(10)
+    started = asyncio.Event()
+
+    async def _async_request() -> None:
+        with metrics.measure(Stage.VEND):
+            started.set()
+            await asyncio.Event().wait()
+
+    task = asyncio.create_task(_async_request())
+    await started.wait()
+    task.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert (metrics.stages[Stage.VEND].count, metrics.failures) == (0, 0)
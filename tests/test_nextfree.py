@@ -0,0 +1,151 @@
+"""Tests for the next free machine queue."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from types import MappingProxyType
+
+from pylaundry import MachineType
+
+from custom_components.cyclepay.nextfree import COMPACT_SLACK, NextFreeQueue
+from custom_components.cyclepay.snapshot import MachineSnapshot, RoomSnapshot
+
+NOW = datetime(2023, 7, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _machine(
+    machine_id: str,
+    minutes: int,
+    machine_type: MachineType = MachineType.DRYER,
+    online: bool = True,
+) -> MachineSnapshot:
+    """Return machine snapshot, busy if minutes is positive."""
+
+    return MachineSnapshot(
+        machine_id,
+        machine_type,
+        machine_id,
+        minutes > 0,
+        minutes,
+        1.0,
+        None,
+        online,
+        "",
+    )
+
+
+def _snapshot(taken_at: datetime, *machines: MachineSnapshot) -> RoomSnapshot:
+    """Return room snapshot of machines."""
+
+    return RoomSnapshot(
+        user_id="user",
+        location_id="location",
+        card_balance=10.0,
+        machines=MappingProxyType({machine.id_: machine for machine in machines}),
+        taken_at=taken_at,
+    )
+
+
+def _update(queue: NextFreeQueue, snapshot: RoomSnapshot) -> None:
+    """Push every machine in snapshot."""
+
+    queue.update(snapshot, set(snapshot.machines))
+
+
+def test_soonest_per_type() -> None:
+    """Test that each machine type has its own queue ordered by finish time."""
+
+    queue = NextFreeQueue()
+    _update(
+        queue,
+        _snapshot(
+            NOW,
+            _machine("d1", 30),
+            _machine("d2", 12),
+            _machine("w1", 40, MachineType.WASHER),
+        ),
+    )
+
+    assert queue.peek(MachineType.DRYER) == ("d2", NOW + timedelta(minutes=12))
+    assert queue.peek(MachineType.WASHER) == ("w1", NOW + timedelta(minutes=40))
+
+
+def test_idle_free_now_and_offline_skipped() -> None:
+    """Test that idle machines are free now and offline machines never are."""
+
+    queue = NextFreeQueue()
+    _update(queue, _snapshot(NOW, _machine("d1", 0), _machine("d2", 0, online=False)))
+
+    assert queue.peek(MachineType.DRYER) == ("d1", NOW)
+    assert queue.minutes_until(MachineType.WASHER, NOW) is None
+
+
+def test_unchanged_machines_count_down() -> None:
+    """Test that machines not reported as changed keep their predicted finish."""
+
+    queue = NextFreeQueue()
+    _update(queue, _snapshot(NOW, _machine("d1", 10)))
+
+    later = NOW + timedelta(minutes=4, seconds=30)
+    queue.update(_snapshot(later, _machine("d1", 10)), set())
+
+    assert queue.minutes_until(MachineType.DRYER, NOW) == 10
+    assert queue.minutes_until(MachineType.DRYER, later) == 6
+    assert queue.minutes_until(MachineType.DRYER, NOW + timedelta(hours=1)) == 0
+
+
+def test_changed_machine_reordered() -> None:
+    """Test that a machine that starts a longer cycle gives up its place."""
+
+    queue = NextFreeQueue()
+    _update(queue, _snapshot(NOW, _machine("d1", 5), _machine("d2", 20)))
+
+    later = NOW + timedelta(minutes=1)
+    queue.update(_snapshot(later, _machine("d1", 60), _machine("d2", 20)), {"d1"})
+
+    assert queue.peek(MachineType.DRYER) == ("d2", NOW + timedelta(minutes=20))
+
+    queue.update(_snapshot(later, _machine("d1", 60), _machine("d2", 0)), {"d2"})
+
+    assert queue.peek(MachineType.DRYER) == ("d2", later)
+
+
+def test_machine_going_offline_removed() -> None:
+    """Test that a machine reported offline drops out of its queue."""
+
+    queue = NextFreeQueue()
+    _update(queue, _snapshot(NOW, _machine("d1", 5), _machine("d2", 20)))
+
+    queue.update(
+        _snapshot(NOW, _machine("d1", 5, online=False), _machine("d2", 20)), {"d1"}
+    )
+
+    assert queue.peek(MachineType.DRYER) == ("d2", NOW + timedelta(minutes=20))
+
+
+def test_machine_removed_from_room() -> None:
+    """Test that a machine missing from the latest snapshot is never returned."""
+
+    queue = NextFreeQueue()
+    _update(queue, _snapshot(NOW, _machine("d1", 5), _machine("d2", 20)))
+
+    queue.update(_snapshot(NOW, _machine("d2", 20)), set())
+
+    assert queue.peek(MachineType.DRYER) == ("d2", NOW + timedelta(minutes=20))
+
+
+def test_stale_entries_compacted() -> None:
+    """Test that repeated changes don't grow the heaps without bound."""
+
+    queue = NextFreeQueue()
+
+    for minute in range(10 * COMPACT_SLACK):
+        snapshot = _snapshot(
+            NOW + timedelta(minutes=minute), _machine("d1", 30), _machine("d2", 45)
+        )
+        _update(queue, snapshot)
+
+    assert len(queue) <= 2 * 2 + COMPACT_SLACK
+    assert queue.peek(MachineType.DRYER) == (
+        "d1",
+        snapshot.taken_at + timedelta(minutes=30),
+    )
@@ -0,0 +1,127 @@
+"""Tests for the topoff price cache."""
+from __future__ import annotations
+
+from dataclasses import replace
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+from custom_components.cyclepay.metrics import PipelineMetrics
+from custom_components.cyclepay.pricing import TopoffPriceCache
+from custom_components.cyclepay.ratelimit import Priority, RateLimiter
+
+from .common import FakeLaundry
+
+TTL = 60.0
+
+
+def _cache(hass: HomeAssistant, laundry: FakeLaundry) -> TopoffPriceCache:
+    """Return cache over laundry with an unlimited request rate."""
+
+    return TopoffPriceCache(
+        hass, laundry, RateLimiter(rate=1000, burst=1000), PipelineMetrics(10), TTL
+    )
+
+
+async def _async_warm(cache: TopoffPriceCache) -> None:
+    """Warm cache and wait for the background fetches to finish."""
+
+    cache.async_warm()
+
+    # pylint: disable-next=protected-access
+    if (task := cache._warm_task) is not None:
+        await task
+
+
+async def test_hit_after_miss(hass: HomeAssistant) -> None:
+    """Test that a fetched price is served from the cache."""
+
+    laundry = FakeLaundry()
+    cache = _cache(hass, laundry)
+
+    assert await cache.async_get("m1") == {"price": 0.25, "time": 5}
+    assert await cache.async_get("m1") == {"price": 0.25, "time": 5}
+
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert laundry.count("topoff") == 1
+
+
+async def test_entry_expires(hass: HomeAssistant) -> None:
+    """Test that entries older than the TTL are fetched again."""
+
+    laundry = FakeLaundry()
+    cache = _cache(hass, laundry)
+
+    with patch("custom_components.cyclepay.pricing.monotonic", return_value=0.0):
+        await cache.async_get("m1")
+
+    with patch("custom_components.cyclepay.pricing.monotonic", return_value=TTL - 1):
+        assert cache.get(laundry.machines["m1"]) is not None
+
+    laundry.topoff_price = 0.5
+
+    with patch("custom_components.cyclepay.pricing.monotonic", return_value=TTL):
+        assert cache.get(laundry.machines["m1"]) is None
+        assert await cache.async_get("m1") == {"price": 0.5, "time": 5}
+
+    assert laundry.count("topoff") == 2
+
+
+async def test_base_price_change_invalidates(hass: HomeAssistant) -> None:
+    """Test that a new base price drops the cached topoff price."""
+
+    laundry = FakeLaundry()
+    cache = _cache(hass, laundry)
+    await cache.async_get("m1")
+
+    repriced = replace(laundry.machines["m1"], base_price=2.0)
+
+    assert cache.get(repriced) is None
+
+
+async def test_unreliable_data_not_cached(hass: HomeAssistant) -> None:
+    """Test that responses without a usable price are returned but not cached."""
+
+    laundry = FakeLaundry()
+    cache = _cache(hass, laundry)
+    laundry.topoff_price = None
+
+    assert await cache.async_get("m1") == {"price": None, "time": 5}
+    assert cache.get(laundry.machines["m1"]) is None
+
+    await cache.async_get("m1")
+
+    assert laundry.count("topoff") == 2
+
+
+async def test_warm_fetches_dryers(hass: HomeAssistant) -> None:
+    """Test that warming fetches missing dryer prices in the background."""
+
+    laundry = FakeLaundry()
+    cache = _cache(hass, laundry)
+
+    await _async_warm(cache)
+
+    assert sorted(call[1] for call in laundry.calls) == ["m1", "m3"]
+    assert cache.get(laundry.machines["m1"]) is not None
+    assert cache.get(laundry.machines["m3"]) is not None
+
+    # Warm prices aren't fetched again.
+    await _async_warm(cache)
+
+    assert laundry.count("topoff") == 2
+
+
+async def test_rate_limit_wait_not_timed(hass: HomeAssistant) -> None:
+    """Test that waiting for a rate limiter token doesn't count toward the timeout."""
+
+    laundry = FakeLaundry()
+    rate_limiter = RateLimiter(rate=10, burst=1)
+    cache = TopoffPriceCache(hass, laundry, rate_limiter, PipelineMetrics(10), TTL)
+
+    with patch("custom_components.cyclepay.pricing.REQUEST_TIMEOUT", 0.05):
+        # Each fetch waits about 0.1 seconds for a token.
+        await rate_limiter.async_acquire(Priority.REFRESH)
+        await _async_warm(cache)
+
+    assert cache.get(laundry.machines["m1"]) is not None
+    assert cache.get(laundry.machines["m3"]) is not None
@@ -0,0 +1,101 @@
+"""Tests for the domain-wide rate limiter."""
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import patch
+
+from custom_components.cyclepay.ratelimit import Priority, RateLimiter
+
+
+async def test_burst_then_refill() -> None:
+    """Test that a full bucket is spent without waiting and refills over time."""
+
+    now = [1000.0]
+
+    with patch("custom_components.cyclepay.ratelimit.monotonic", lambda: now[0]):
+        limiter = RateLimiter(rate=1, burst=2)
+
+        await asyncio.wait_for(limiter.async_acquire(Priority.REFRESH), 0.1)
+        await asyncio.wait_for(limiter.async_acquire(Priority.REFRESH), 0.1)
+
+        now[0] += 1
+        await asyncio.wait_for(limiter.async_acquire(Priority.REFRESH), 0.1)
+
+        # Idle time never fills the bucket past burst.
+        now[0] += 60
+        for _ in range(2):
+            await asyncio.wait_for(limiter.async_acquire(Priority.REFRESH), 0.1)
+
+    assert limiter.queue_length == 0
+    assert limiter.stats[Priority.REFRESH].acquired == 5
+
+
+async def test_waits_for_token() -> None:
+    """Test that requests beyond the burst wait for the bucket to refill."""
+
+    limiter = RateLimiter(rate=50, burst=1)
+    loop = asyncio.get_running_loop()
+
+    await limiter.async_acquire(Priority.REFRESH)
+
+    started_at = loop.time()
+    await limiter.async_acquire(Priority.REFRESH)
+
+    assert loop.time() - started_at >= 0.015
+
+
+async def test_priority_order() -> None:
+    """Test that waiting requests are served by priority, then in arrival order."""
+
+    # Slow enough that no token is refilled before every request is queued.
+    limiter = RateLimiter(rate=20, burst=1)
+    await limiter.async_acquire(Priority.REFRESH)
+
+    served: list[tuple[Priority, int]] = []
+
+    async def acquire(priority: Priority, index: int) -> None:
+        """Wait for a token and record the order it was granted in."""
+
+        await limiter.async_acquire(priority)
+        served.append((priority, index))
+
+    queued = [
+        (Priority.REFRESH, 0),
+        (Priority.TOPOFF, 0),
+        (Priority.REFRESH, 1),
+        (Priority.VEND, 0),
+        (Priority.LOGIN, 0),
+        (Priority.VEND, 1),
+    ]
+    tasks = [asyncio.create_task(acquire(*item)) for item in queued]
+
+    await asyncio.sleep(0)
+    assert limiter.queue_length == len(queued)
+
+    await asyncio.wait_for(asyncio.gather(*tasks), 1)
+
+    assert served == [
+        (Priority.VEND, 0),
+        (Priority.VEND, 1),
+        (Priority.LOGIN, 0),
+        (Priority.TOPOFF, 0),
+        (Priority.REFRESH, 0),
+        (Priority.REFRESH, 1),
+    ]
+
+
+async def test_cancelled_waiter_skipped() -> None:
+    """Test that a cancelled request doesn't hold up or consume a token."""
+
+    limiter = RateLimiter(rate=50, burst=1)
+    await limiter.async_acquire(Priority.REFRESH)
+
+    cancelled = asyncio.create_task(limiter.async_acquire(Priority.VEND))
+    waiting = asyncio.create_task(limiter.async_acquire(Priority.REFRESH))
+    await asyncio.sleep(0)
+
+    cancelled.cancel()
+    await asyncio.wait_for(waiting, 0.1)
+
+    assert limiter.queue_length == 0
+    assert limiter.stats[Priority.VEND].acquired == 0
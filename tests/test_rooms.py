@@ -0,0 +1,64 @@
+"""Tests for room status shared between accounts."""
+from __future__ import annotations
+
+import asyncio
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.cyclepay.rooms import async_get_room_registry
+
+from .common import FakeLaundry
+
+
+async def test_concurrent_fetch_joined(hass: HomeAssistant) -> None:
+    """Test that a fetch in flight is shared with other accounts in the room."""
+
+    registry = async_get_room_registry(hass)
+    first, second = FakeLaundry(), FakeLaundry()
+    updates: list[dict] = []
+
+    room, leave_first = registry.async_join("location", first, lambda machines: None)
+    _, leave_second = registry.async_join("location", second, updates.append)
+
+    first.blocked = asyncio.Event()
+    first.minutes_remaining["m1"] = 20
+
+    first_fetch = asyncio.create_task(room.async_fetch(first, 60, first.async_refresh))
+    await asyncio.sleep(0)
+    second_fetch = asyncio.create_task(
+        room.async_fetch(second, 60, second.async_refresh)
+    )
+
+    first.blocked.set()
+
+    assert await first_fetch
+    assert not await second_fetch
+
+    assert second.count("refresh") == 0
+    assert second.machines["m1"].minutes_remaining == 20
+    assert updates == [first.machines]
+    assert (room.fetches, room.reuses) == (1, 1)
+
+    leave_first()
+    leave_second()
+
+    assert not registry.rooms
+
+
+async def test_own_fetch_not_reused(hass: HomeAssistant) -> None:
+    """Test that an account refetches instead of reusing its own last fetch."""
+
+    registry = async_get_room_registry(hass)
+    first, second = FakeLaundry(), FakeLaundry()
+
+    room, _ = registry.async_join("location", first, lambda machines: None)
+    registry.async_join("location", second, lambda machines: None)
+
+    assert await room.async_fetch(first, 60, first.async_refresh)
+    assert await room.async_fetch(first, 60, first.async_refresh)
+    assert not await room.async_fetch(second, 60, second.async_refresh)
+
+    # A max_age of zero always fetches.
+    assert await room.async_fetch(second, 0, second.async_refresh)
+
+    assert (first.count("refresh"), second.count("refresh")) == (2, 1)
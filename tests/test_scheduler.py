@@ -0,0 +1,105 @@
+"""Tests for the finish time scheduler."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from pylaundry import MachineType
+
+from custom_components.cyclepay.scheduler import FinishTimeScheduler
+from custom_components.cyclepay.snapshot import MachineSnapshot
+
+NOW = datetime(2023, 7, 1, 12, 0, tzinfo=timezone.utc)
+RECHECK = timedelta(minutes=1)
+
+
+def _machine(
+    machine_id: str, minutes: int, busy: bool = True, online: bool = True
+) -> MachineSnapshot:
+    """Return dryer snapshot with minutes_remaining."""
+
+    return MachineSnapshot(
+        machine_id, MachineType.DRYER, machine_id, busy, minutes, 1.0, 0.25, online, ""
+    )
+
+
+def _scheduler() -> FinishTimeScheduler:
+    """Return scheduler with a one minute recheck and tolerance."""
+
+    return FinishTimeScheduler(recheck_delay=RECHECK, tolerance=timedelta(minutes=1))
+
+
+def test_earliest_finish_first() -> None:
+    """Test that the soonest finishing machine is refreshed first, then rechecked."""
+
+    scheduler = _scheduler()
+    scheduler.update({"a": _machine("a", 30), "b": _machine("b", 10)}, NOW)
+
+    assert scheduler.next_refresh(NOW) == NOW + timedelta(minutes=10)
+
+    after_b = NOW + timedelta(minutes=10)
+    assert scheduler.next_refresh(after_b) == after_b + RECHECK
+
+    after_recheck = after_b + RECHECK
+    assert scheduler.next_refresh(after_recheck) == NOW + timedelta(minutes=30)
+
+
+def test_idle_and_offline_ignored() -> None:
+    """Test that only running, online machines are scheduled."""
+
+    scheduler = _scheduler()
+    scheduler.update(
+        {
+            "idle": _machine("idle", 0, busy=False),
+            "offline": _machine("offline", 20, online=False),
+            "unknown": _machine("unknown", 0),
+        },
+        NOW,
+    )
+
+    assert scheduler.next_refresh(NOW) is None
+    assert len(scheduler) == 0
+
+
+def test_drift_within_tolerance_kept() -> None:
+    """Test that rounding drift between polls doesn't reschedule a machine."""
+
+    scheduler = _scheduler()
+    scheduler.update({"a": _machine("a", 30)}, NOW)
+
+    later = NOW + timedelta(minutes=5, seconds=30)
+    scheduler.update({"a": _machine("a", 25)}, later)
+
+    assert len(scheduler) == 2
+    assert scheduler.next_refresh(later) == NOW + timedelta(minutes=30)
+
+
+def test_moved_prediction_replaces_entries() -> None:
+    """Test that a topoff moves the machine's refresh targets."""
+
+    scheduler = _scheduler()
+    scheduler.update({"a": _machine("a", 10), "b": _machine("b", 20)}, NOW)
+    scheduler.update({"a": _machine("a", 40), "b": _machine("b", 20)}, NOW)
+
+    # Entries for the old prediction are dropped as they reach the top of the heap.
+    assert scheduler.next_refresh(NOW) == NOW + timedelta(minutes=20)
+    assert len(scheduler) == 4
+
+    after_b = NOW + timedelta(minutes=21)
+    assert scheduler.next_refresh(after_b) == NOW + timedelta(minutes=40)
+
+
+def test_stopped_machine_keeps_recheck() -> None:
+    """Test that a machine that stops early is still rechecked once."""
+
+    scheduler = _scheduler()
+    scheduler.update({"a": _machine("a", 10)}, NOW)
+
+    later = NOW + timedelta(minutes=10)
+    scheduler.update({"a": _machine("a", 0, busy=False)}, later)
+
+    assert scheduler.next_refresh(later) == later + RECHECK
+
+    # Starting again predicts a new finish and supersedes the old recheck.
+    scheduler.update({"a": _machine("a", 30)}, later)
+
+    assert scheduler.next_refresh(later) == later + timedelta(minutes=30)
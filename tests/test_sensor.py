@@ -0,0 +1,29 @@
+"""Tests for CyclePay sensors."""
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.cyclepay.const import FORECAST_HORIZON_MIN
+
+from .common import async_setup_integration
+
+
+async def test_availability_forecast_sensor(hass: HomeAssistant) -> None:
+    """Test that the forecast sensor follows running cycles."""
+
+    entry, coordinator = await async_setup_integration(hass)
+
+    coordinator.laundry.minutes_remaining.update({"m1": 20, "m3": 45})
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    state = hass.states.get("sensor.dryers_availability_forecast")
+    forecast = state.attributes["forecast"]
+
+    assert state.state == "0"
+    assert len(forecast) == FORECAST_HORIZON_MIN + 1
+    assert forecast[19] == 0
+    assert forecast[20] == 1
+    assert forecast[-1] == (2 if FORECAST_HORIZON_MIN >= 45 else 1)
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,92 @@
+"""Tests for CyclePay services."""
+from __future__ import annotations
+
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+from pylaundry import MachineOffline
+import pytest
+
+from custom_components.cyclepay.const import DOMAIN
+from custom_components.cyclepay.services import SERVICE_VEND, VendError
+
+from .common import async_setup_integration
+
+
+async def _async_vend(hass: HomeAssistant, *machines: dict[str, Any]) -> None:
+    """Call the vend service for machines."""
+
+    await hass.services.async_call(
+        DOMAIN, SERVICE_VEND, {"machines": list(machines)}, blocking=True
+    )
+
+
+async def test_vend_machines(hass: HomeAssistant) -> None:
+    """Test that every listed machine is vended and confirmed."""
+
+    entry, coordinator = await async_setup_integration(hass)
+    laundry = coordinator.laundry
+    laundry.calls.clear()
+
+    with patch("custom_components.cyclepay.coordinator.VEND_CONFIRM_INITIAL_DELAY", 0):
+        await _async_vend(hass, {"machine_id": "m0"}, {"machine_id": "m1", "swipes": 2})
+
+    assert laundry.count("vend") == 3
+    assert coordinator.data.machines["m0"].minutes_remaining == 30
+    assert coordinator.data.machines["m1"].minutes_remaining == 60
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+@pytest.mark.parametrize(
+    "machines",
+    [
+        [{"machine_id": "m0"}, {"machine_id": "m0"}],
+        [{"machine_id": "m0", "swipes": 2}],
+        [{"machine_id": "unknown"}],
+    ],
+)
+async def test_invalid_request(
+    hass: HomeAssistant, machines: list[dict[str, Any]]
+) -> None:
+    """Test that requests that can't be vended are rejected before any swipe."""
+
+    entry, coordinator = await async_setup_integration(hass)
+
+    with pytest.raises(ServiceValidationError):
+        await _async_vend(hass, *machines)
+
+    assert coordinator.laundry.count("vend") == 0
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_insufficient_funds(hass: HomeAssistant) -> None:
+    """Test that funds held for pending vends count against the balance."""
+
+    entry, coordinator = await async_setup_integration(hass)
+    coordinator.balance_ledger.try_reserve(coordinator.data.card_balance, 9.0)
+
+    with pytest.raises(VendError, match="insufficient"):
+        await _async_vend(hass, {"machine_id": "m0"})
+
+    assert coordinator.laundry.count("vend") == 0
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_failed_vend_wrapped(hass: HomeAssistant) -> None:
+    """Test that CyclePay errors during a vend are reported as a vend failure."""
+
+    entry, coordinator = await async_setup_integration(hass)
+    coordinator.laundry.errors["vend"] = MachineOffline()
+
+    with pytest.raises(VendError, match="Washer 0") as err:
+        await _async_vend(hass, {"machine_id": "m0"})
+
+    assert isinstance(err.value.__cause__, MachineOffline)
+    assert len(coordinator.balance_ledger) == 0
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,57 @@
+"""Tests for room snapshots."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from custom_components.cyclepay.snapshot import RoomSnapshot
+
+from .common import FakeLaundry
+
+NOW = datetime(2023, 7, 1, 12, 0, tzinfo=timezone.utc)
+LATER = NOW + timedelta(minutes=1)
+
+
+async def test_unchanged_machines_reused() -> None:
+    """Test that unchanged machines keep their tuples, so changes show by identity."""
+
+    laundry = FakeLaundry()
+    previous = RoomSnapshot.from_laundry(laundry, NOW)
+
+    laundry.minutes_remaining["m1"] = 20
+    await laundry.async_refresh()
+    snapshot = RoomSnapshot.from_laundry(laundry, LATER, previous)
+
+    assert snapshot.machines["m0"] is previous.machines["m0"]
+    assert snapshot.machines["m1"] is not previous.machines["m1"]
+    assert snapshot.changed_machines(previous) == {"m1"}
+    assert snapshot.changed_machines(None) == {"m0", "m1", "m2", "m3"}
+    assert snapshot.taken_at == LATER
+
+
+async def test_partial_snapshot_carries_over() -> None:
+    """Test that machines left out of machine_ids keep their previous state."""
+
+    laundry = FakeLaundry()
+    previous = RoomSnapshot.from_laundry(laundry, NOW)
+
+    laundry.minutes_remaining.update({"m1": 20, "m2": 30})
+    await laundry.async_refresh()
+    snapshot = RoomSnapshot.from_laundry(laundry, LATER, previous, {"m1"})
+
+    assert snapshot.machines["m1"].minutes_remaining == 20
+    assert snapshot.machines["m2"] is previous.machines["m2"]
+    assert snapshot.changed_machines(previous) == {"m1"}
+
+
+async def test_snapshot_isolated_from_laundry() -> None:
+    """Test that later updates to laundry don't change a published snapshot."""
+
+    laundry = FakeLaundry()
+    snapshot = RoomSnapshot.from_laundry(laundry, NOW)
+
+    laundry.minutes_remaining["m1"] = 20
+    await laundry.async_refresh()
+    laundry.machines.pop("m0")
+
+    assert snapshot.machines["m1"].minutes_remaining == 0
+    assert "m0" in snapshot.machines
@@ -0,0 +1,81 @@
+"""Tests for snapshot and session persistence."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from homeassistant.util import dt as dt_util
+from pylaundry.const import EMPTY_AUTH_TOKEN
+import pytest
+
+from custom_components.cyclepay.store import (
+    restore_session,
+    restore_snapshot,
+    serialize_snapshot,
+)
+
+from .common import FakeLaundry
+
+MAX_AGE = timedelta(hours=1)
+
+
+def _session(issued_at: str, auth_token: object = "token") -> dict:
+    """Return serialized session."""
+
+    return {
+        "auth_token": auth_token,
+        "first_request_id": "request",
+        "installation_token": "installation",
+        "issued_at": issued_at,
+    }
+
+
+def test_snapshot_round_trip() -> None:
+    """Test that a saved snapshot restores profile, machines and session."""
+
+    source = FakeLaundry()
+    source.minutes_remaining["m1"] = 20
+    source._build()  # pylint: disable=protected-access
+    source._auth_token = "token"  # pylint: disable=protected-access
+
+    issued_at = dt_util.utcnow()
+    data = serialize_snapshot(source, issued_at)
+
+    laundry = FakeLaundry()
+    laundry.machines = {}
+    restore_snapshot(laundry, data)
+
+    assert laundry.profile == source.profile
+    assert laundry.machines["m1"].busy
+    assert laundry.machines["m1"].minutes_remaining in (19, 20)
+
+    assert restore_session(laundry, data["session"], MAX_AGE) == issued_at
+    assert laundry._auth_token == "token"  # pylint: disable=protected-access
+
+
+def test_expired_session_ignored() -> None:
+    """Test that a session older than max_age isn't loaded."""
+
+    laundry = FakeLaundry()
+    issued_at = (dt_util.utcnow() - MAX_AGE).isoformat()
+
+    assert restore_session(laundry, _session(issued_at), MAX_AGE) is None
+    assert laundry._auth_token == EMPTY_AUTH_TOKEN  # pylint: disable=protected-access
+
+
+@pytest.mark.parametrize(
+    "session",
+    [
+        _session(dt_util.utcnow().isoformat(), auth_token=None),
+        _session(dt_util.utcnow().isoformat(), auth_token=123),
+        {**_session(""), "issued_at": 0},
+    ],
+)
+def test_malformed_session_rejected(session: dict) -> None:
+    """Test that a session with a token or issue time that isn't a string is rejected."""
+
+    laundry = FakeLaundry()
+
+    with pytest.raises(TypeError):
+        restore_session(laundry, session, MAX_AGE)
+
+    assert laundry._auth_token == EMPTY_AUTH_TOKEN  # pylint: disable=protected-access
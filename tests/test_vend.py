@@ -0,0 +1,194 @@
+"""Tests for vend execution and the swipe buttons."""
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import patch
+
+from homeassistant.components.button import DOMAIN as BUTTON_DOMAIN, SERVICE_PRESS
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant
+from pylaundry import MachineOffline
+from pylaundry.exceptions import VendFailure
+import pytest
+
+from custom_components.cyclepay.metrics import PipelineMetrics
+from custom_components.cyclepay.ratelimit import RateLimiter
+from custom_components.cyclepay.vend import VendExecutor
+
+from .common import FakeLaundry, async_setup_integration
+
+
+class TrackingLaundry(FakeLaundry):
+    """Laundry room that records which machines are being vended at once."""
+
+    def __init__(self) -> None:
+        """Initialize tracking."""
+
+        super().__init__()
+
+        self.vending: list[str] = []
+        self.max_vending = 0
+        self.overlapped = False
+
+    async def async_vend(self, machine_id: str) -> None:
+        """Swipe card, taking long enough for other vends to start."""
+
+        self.overlapped |= machine_id in self.vending
+        self.vending.append(machine_id)
+        self.max_vending = max(self.max_vending, len(self.vending))
+
+        try:
+            await asyncio.sleep(0.01)
+            await super().async_vend(machine_id)
+        finally:
+            self.vending.remove(machine_id)
+
+
+def _executor(
+    hass: HomeAssistant, laundry: FakeLaundry, max_concurrency: int = 2
+) -> VendExecutor:
+    """Return executor over laundry with an unlimited request rate."""
+
+    return VendExecutor(
+        hass,
+        laundry,
+        RateLimiter(rate=1000, burst=1000),
+        PipelineMetrics(10),
+        max_concurrency=max_concurrency,
+    )
+
+
+async def test_swipes_serialized_per_machine(hass: HomeAssistant) -> None:
+    """Test that one machine's swipes never interleave while machines run at once."""
+
+    laundry = TrackingLaundry()
+    executor = _executor(hass, laundry)
+
+    requests = [
+        executor.async_submit("m1", 2, timeout=5),
+        executor.async_submit("m1", 1, timeout=5),
+        executor.async_submit("m3", 2, timeout=5),
+    ]
+    await asyncio.gather(*(request.future for request in requests))
+
+    assert not laundry.overlapped
+    assert laundry.max_vending == 2
+    assert laundry.count("vend") == 5
+    assert [request.swipes_sent for request in requests] == [2, 1, 2]
+    assert executor.stats.completed == 3
+    assert not executor.queue_depths
+
+
+async def test_concurrency_bounded(hass: HomeAssistant) -> None:
+    """Test that no more than max_concurrency machines are vended at once."""
+
+    laundry = TrackingLaundry()
+    executor = _executor(hass, laundry, max_concurrency=1)
+
+    await asyncio.gather(
+        *(
+            executor.async_submit(machine_id, 1, timeout=5).future
+            for machine_id in ("m0", "m1", "m2")
+        )
+    )
+
+    assert laundry.max_vending == 1
+
+
+async def test_vend_failure_resolves_request(hass: HomeAssistant) -> None:
+    """Test that a failed swipe fails only its own request."""
+
+    laundry = FakeLaundry()
+    laundry.errors["vend"] = VendFailure()
+    executor = _executor(hass, laundry)
+
+    failed = executor.async_submit("m1", 2, timeout=5)
+    queued = executor.async_submit("m1", 1, timeout=5)
+
+    with pytest.raises(VendFailure):
+        await failed.future
+
+    await queued.future
+
+    assert (failed.swipes_sent, queued.swipes_sent) == (1, 1)
+    assert (executor.stats.failed, executor.stats.completed) == (1, 1)
+
+
+async def test_request_times_out(hass: HomeAssistant) -> None:
+    """Test that a vend that outlives its deadline fails with a timeout."""
+
+    laundry = FakeLaundry()
+    laundry.blocked = asyncio.Event()
+    executor = _executor(hass, laundry)
+
+    request = executor.async_submit("m1", 2, timeout=0.05)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await request.future
+
+    assert request.swipes_sent == 1
+    assert executor.stats.timed_out == 1
+
+
+async def test_cancel_stops_unsent_swipes(hass: HomeAssistant) -> None:
+    """Test that cancelling a request stops swipes that haven't been sent."""
+
+    laundry = FakeLaundry()
+    laundry.blocked = asyncio.Event()
+    executor = _executor(hass, laundry)
+
+    request = executor.async_submit("m1", 3, timeout=5)
+
+    while not laundry.count("vend"):
+        await asyncio.sleep(0)
+
+    request.future.cancel()
+    laundry.blocked.set()
+    await hass.async_block_till_done()
+
+    assert laundry.count("vend") == 1
+    assert request.swipes_sent == 1
+
+
+async def test_press_vends_machine(hass: HomeAssistant) -> None:
+    """Test that pressing a swipe button vends and confirms the machine."""
+
+    entry, coordinator = await async_setup_integration(hass)
+
+    with patch("custom_components.cyclepay.coordinator.VEND_CONFIRM_INITIAL_DELAY", 0):
+        await hass.services.async_call(
+            BUTTON_DOMAIN,
+            SERVICE_PRESS,
+            {ATTR_ENTITY_ID: "button.washer_0_swipe_card_once"},
+            blocking=True,
+        )
+
+    assert coordinator.laundry.count("vend") == 1
+    assert coordinator.data.machines["m0"].minutes_remaining == 30
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_press_offline_machine(hass: HomeAssistant) -> None:
+    """Test that a machine going offline mid-vend is reported and refreshed."""
+
+    entry, coordinator = await async_setup_integration(hass)
+    laundry = coordinator.laundry
+    laundry.errors["vend"] = MachineOffline()
+    laundry.calls.clear()
+
+    with patch(
+        "custom_components.cyclepay.button.persistent_notification.async_create"
+    ) as notify:
+        await hass.services.async_call(
+            BUTTON_DOMAIN,
+            SERVICE_PRESS,
+            {ATTR_ENTITY_ID: "button.washer_0_swipe_card_once"},
+            blocking=True,
+        )
+
+    notify.assert_called_once()
+    assert len(coordinator.balance_ledger) == 0
+    assert laundry.count("refresh") == 1
+
+    assert await hass.config_entries.async_unload(entry.entry_id)